@@ -0,0 +1,163 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import anyio.to_thread
+from anyio import CapacityLimiter
+from anyio.lowlevel import RunVar
+
+from app.settings import STORE_EXECUTOR_THREADS
+from app.store import (
+    NewDoc,
+    RankKey,
+    RetrievalStore,
+    ScopedView,
+    SearchHit,
+    StoredDocument,
+    TenantStats,
+)
+
+# One limiter per event loop (anyio limiters belong to the loop they run in).
+_LIMITER: RunVar[CapacityLimiter] = RunVar("store_executor_limiter")
+
+
+def _limiter() -> CapacityLimiter:
+    try:
+        return _LIMITER.get()
+    except LookupError:
+        limiter = CapacityLimiter(STORE_EXECUTOR_THREADS)
+        _LIMITER.set(limiter)
+        return limiter
+
+
+async def run_offloaded(fn: Callable[..., Any], *args: Any) -> Any:
+    """
+    Run blocking or CPU-heavy `fn(*args)` on a worker thread, at most
+    STORE_EXECUTOR_THREADS at a time; further calls wait their turn without
+    holding a thread. Context variables (request_id) carry over.
+    """
+    return await anyio.to_thread.run_sync(fn, *args, limiter=_limiter())
+
+
+class AsyncScopedView(ABC):
+    """Async counterpart of ScopedView."""
+
+    @abstractmethod
+    async def asearch(
+        self, query: str, limit: Optional[int] = None, after: Optional[RankKey] = None
+    ) -> List[SearchHit]:
+        pass
+
+
+class AsyncRetrievalStore(ABC):
+    """
+    Async counterpart of RetrievalStore, for route handlers running on the
+    event loop. The security contract is the same: every read is scoped to
+    (tenant_id, allowed_classifications) inside the store.
+    """
+
+    async def aput(
+        self, tenant_id: str, classification: str, title: str, body: str
+    ) -> StoredDocument:
+        return (await self.aput_many(tenant_id, [(classification, title, body)]))[0]
+
+    @abstractmethod
+    async def aput_many(
+        self, tenant_id: str, items: Sequence[NewDoc]
+    ) -> List[StoredDocument]:
+        pass
+
+    @abstractmethod
+    async def alist_scoped(
+        self, tenant_id: str, allowed_classifications: List[str]
+    ) -> List[StoredDocument]:
+        pass
+
+    async def asearch_scoped(
+        self,
+        tenant_id: str,
+        allowed_classifications: List[str],
+        query: str,
+        limit: Optional[int] = None,
+        after: Optional[RankKey] = None,
+    ) -> List[SearchHit]:
+        view = await self.ascoped(tenant_id, allowed_classifications)
+        return await view.asearch(query, limit, after)
+
+    @abstractmethod
+    async def ascoped(
+        self, tenant_id: str, allowed_classifications: List[str]
+    ) -> AsyncScopedView:
+        pass
+
+    @abstractmethod
+    async def ageneration(
+        self, tenant_id: str, allowed_classifications: List[str]
+    ) -> Tuple[int, ...]:
+        pass
+
+    @abstractmethod
+    async def atenant_stats(self, tenant_id: str) -> TenantStats:
+        pass
+
+
+class _OffloadedView(AsyncScopedView):
+    def __init__(self, view: ScopedView):
+        self.view = view
+
+    async def asearch(
+        self, query: str, limit: Optional[int] = None, after: Optional[RankKey] = None
+    ) -> List[SearchHit]:
+        # Ranking scores every candidate: CPU-bound, so off the event loop.
+        return await run_offloaded(self.view.search, query, limit, after)
+
+
+class SyncStoreAdapter(AsyncRetrievalStore):
+    """
+    AsyncRetrievalStore over a sync RetrievalStore. Writes, listings and
+    searches run through run_offloaded(). Cheap reads (scoped views,
+    generations, stats) stay on the event loop when the store answers them
+    from memory (`nonblocking_reads`), and are offloaded otherwise.
+    """
+
+    def __init__(self, store: RetrievalStore):
+        self.store = store
+
+    async def _read(self, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.store.nonblocking_reads:
+            return fn(*args)
+        return await run_offloaded(fn, *args)
+
+    async def aput_many(
+        self, tenant_id: str, items: Sequence[NewDoc]
+    ) -> List[StoredDocument]:
+        return await run_offloaded(self.store.put_many, tenant_id, items)
+
+    async def alist_scoped(
+        self, tenant_id: str, allowed_classifications: List[str]
+    ) -> List[StoredDocument]:
+        return await run_offloaded(
+            self.store.list_scoped, tenant_id, allowed_classifications
+        )
+
+    async def ascoped(
+        self, tenant_id: str, allowed_classifications: List[str]
+    ) -> AsyncScopedView:
+        view = await self._read(self.store.scoped, tenant_id, allowed_classifications)
+        return _OffloadedView(view)
+
+    async def ageneration(
+        self, tenant_id: str, allowed_classifications: List[str]
+    ) -> Tuple[int, ...]:
+        return await self._read(
+            self.store.generation, tenant_id, allowed_classifications
+        )
+
+    async def atenant_stats(self, tenant_id: str) -> TenantStats:
+        return await self._read(self.store.tenant_stats, tenant_id)
+
+
+def as_async(store: Any) -> AsyncRetrievalStore:
+    """The async interface of `store`: itself if native, else an adapter."""
+    if isinstance(store, AsyncRetrievalStore):
+        return store
+    return SyncStoreAdapter(store)
@@ -0,0 +1,121 @@
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Union
+
+from app.settings import BODY_CACHE_ENTRIES, BODY_COMPRESS_MIN_BYTES
+
+
+class CompressedBody:
+    """A zlib-compressed body; text() goes through its owner's LRU."""
+
+    __slots__ = ("digest", "data", "owner")
+
+    def __init__(self, digest: bytes, data: bytes, owner: "BodyStore"):
+        self.digest = digest
+        self.data = data
+        self.owner = owner
+
+    def text(self) -> str:
+        return self.owner._decompressed(self)
+
+
+# What a document holds: the shared str itself, or a compressed handle.
+BodyRef = Union[str, CompressedBody]
+
+
+def body_text(ref: BodyRef) -> str:
+    return ref if type(ref) is str else ref.text()
+
+
+@dataclass(frozen=True)
+class BodyStats:
+    body_refs: int = 0  # documents referencing a body
+    unique_bodies: int = 0
+    logical_bytes: int = 0  # UTF-8 bytes of every document's body
+    unique_bytes: int = 0  # UTF-8 bytes of each distinct body once
+    stored_bytes: int = 0  # bytes held after compression
+
+    @property
+    def dedup_ratio(self) -> float:
+        return self.logical_bytes / self.unique_bytes if self.unique_bytes else 1.0
+
+    @property
+    def compression_ratio(self) -> float:
+        return self.unique_bytes / self.stored_bytes if self.stored_bytes else 1.0
+
+
+class BodyStore:
+    """
+    Content-addressed bodies for ONE tenant: identical bodies are stored once
+    (keyed by SHA-256), and bodies of at least `compress_min_bytes` are
+    zlib-compressed when that saves space.
+
+    Append-only, like the documents that reference it: stores never delete
+    or replace a document, and clear() drops the tenant's BodyStore whole.
+
+    Dedup never spans tenants, so neither a hash collision nor ingest timing
+    can reveal another tenant's content.
+    """
+
+    def __init__(
+        self,
+        compress_min_bytes: int = BODY_COMPRESS_MIN_BYTES,
+        cache_entries: int = BODY_CACHE_ENTRIES,
+    ):
+        self.compress_min_bytes = compress_min_bytes
+        self.cache_entries = cache_entries
+        # {sha256: ref}
+        self._blobs: Dict[bytes, BodyRef] = {}
+        # Hot decompressed bodies, {sha256: text}. Queries read concurrently.
+        self._cache: "OrderedDict[bytes, str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._refs = self._logical = self._unique = self._stored = 0
+
+    def add(self, body: str) -> BodyRef:
+        """Reference `body`, storing it if this tenant hasn't yet."""
+        raw = body.encode("utf-8")
+        digest = hashlib.sha256(raw).digest()
+        self._refs += 1
+        self._logical += len(raw)
+
+        found = self._blobs.get(digest)
+        if found is not None:
+            return found
+
+        ref: BodyRef = body
+        stored = len(raw)
+        if self.compress_min_bytes and len(raw) >= self.compress_min_bytes:
+            packed = zlib.compress(raw)
+            if len(packed) < len(raw):
+                ref, stored = CompressedBody(digest, packed, self), len(packed)
+        self._blobs[digest] = ref
+        self._unique += len(raw)
+        self._stored += stored
+        return ref
+
+    def _decompressed(self, handle: CompressedBody) -> str:
+        key = handle.digest
+        with self._cache_lock:
+            text = self._cache.get(key)
+            if text is not None:
+                self._cache.move_to_end(key)
+                return text
+        text = zlib.decompress(handle.data).decode("utf-8")
+        if self.cache_entries > 0:
+            with self._cache_lock:
+                self._cache[key] = text
+                if len(self._cache) > self.cache_entries:
+                    self._cache.popitem(last=False)
+        return text
+
+    def stats(self) -> BodyStats:
+        return BodyStats(
+            body_refs=self._refs,
+            unique_bodies=len(self._blobs),
+            logical_bytes=self._logical,
+            unique_bytes=self._unique,
+            stored_bytes=self._stored,
+        )
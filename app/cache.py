@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+from dataclasses import dataclass, fields
+from operator import itemgetter
+from typing import Any, Callable, DefaultDict, Hashable, Optional, Tuple
+
+from app.settings import (
+    QUERY_CACHE_MAX_BYTES,
+    QUERY_CACHE_MAX_ENTRIES,
+    QUERY_CACHE_TTL_SECONDS,
+)
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0  # dropped to stay within max_entries / max_bytes
+    expirations: int = 0  # dropped because the TTL ran out
+    invalidations: int = 0  # dropped because a write changed their scope
+    entries: int = 0
+    bytes: int = 0
+
+
+_FIELDS = tuple(f.name for f in fields(CacheStats))
+_ALL = object()
+
+
+class QueryCache:
+    """
+    Bounded LRU + TTL cache of projected (already redacted) query pages.
+
+    Callers key entries on the full authorization scope, and pass a
+    `generation` token for that scope with every get/put. An entry is only
+    served while its token is unchanged, so a write into one
+    (tenant, classification) partition invalidates exactly the entries whose
+    scope includes it.
+
+    Counters are kept per `partition(key)` as well as in total, so callers
+    can report one partition's numbers without revealing the others'.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+        partition: Callable[[Hashable], Hashable] = lambda key: None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._partition = partition
+        self._lock = threading.Lock()
+        # {key: (generation, expires_at, size, value)}, least recently used first
+        self._entries: "OrderedDict[Hashable, Tuple[Hashable, float, int, Any]]" = (
+            OrderedDict()
+        )
+        self._bytes = 0
+        # {partition: CacheStats field -> count}
+        self._counts: DefaultDict[Hashable, Counter] = defaultdict(Counter)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, key: Hashable, generation: Hashable) -> Optional[Any]:
+        with self._lock:
+            counts = self._counts[self._partition(key)]
+            entry = self._entries.get(key)
+            if entry is None:
+                counts["misses"] += 1
+                return None
+
+            entry_gen, expires_at, _, value = entry
+            if entry_gen != generation:
+                counts["invalidations"] += 1
+            elif expires_at <= self._clock():
+                counts["expirations"] += 1
+            else:
+                self._entries.move_to_end(key)
+                counts["hits"] += 1
+                return value
+
+            self._drop(key)
+            counts["misses"] += 1
+            return None
+
+    def put(self, key: Hashable, generation: Hashable, value: Any, size: int) -> None:
+        if not self.enabled or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (
+                generation,
+                self._clock() + self.ttl_seconds,
+                size,
+                value,
+            )
+            self._bytes += size
+            counts = self._counts[self._partition(key)]
+            counts["entries"] += 1
+            counts["bytes"] += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._counts[self._partition(oldest)]["evictions"] += 1
+
+    def _drop(self, key: Hashable) -> None:
+        size = self._entries.pop(key)[2]
+        self._bytes -= size
+        counts = self._counts[self._partition(key)]
+        counts["entries"] -= 1
+        counts["bytes"] -= size
+
+    def stats(self, partition: Hashable = _ALL) -> CacheStats:
+        """Counters for one `partition`, or for the whole cache."""
+        with self._lock:
+            if partition is _ALL:
+                counts = sum(self._counts.values(), Counter())
+            else:
+                counts = self._counts.get(partition, Counter())
+            return CacheStats(**{name: counts[name] for name in _FIELDS})
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters (Test/Dev only)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._counts.clear()
+
+
+# ------------------------------------------------------------------------------
+# Singleton for /query and /query/batch
+# ------------------------------------------------------------------------------
+QUERY_CACHE = QueryCache(
+    max_entries=QUERY_CACHE_MAX_ENTRIES,
+    max_bytes=QUERY_CACHE_MAX_BYTES,
+    ttl_seconds=QUERY_CACHE_TTL_SECONDS,
+    # Keys start with the tenant id (app.main._cache_slot).
+    partition=itemgetter(0),
+)
@@ -0,0 +1,208 @@
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Iterator, List, Optional, Sequence
+
+from app.settings import STORE_WAL_COMPACT_BYTES
+from app.store import InMemoryStore, NewDoc, Projection, Record, StoredDocument
+from app.wal import (
+    WriteAheadLog,
+    list_segments,
+    read_segment,
+    read_snapshot,
+    write_snapshot,
+)
+
+logger = logging.getLogger("app.store")
+
+# Snapshot rows are applied in batches of consecutive same-tenant documents.
+_RESTORE_BATCH = 1000
+
+
+class LogReplayStore(InMemoryStore):
+    """
+    InMemoryStore rebuilt from a log of WAL records (see app.wal):
+    `{"op": "put", "tenant": ..., "docs": [Record, ...]}` or `{"op": "clear"}`.
+    Tracks the highest seq applied, so new writes continue after it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._max_seq = -1
+
+    def _replay(self, record: dict) -> None:
+        if record["op"] == "put":
+            records = [tuple(r) for r in record["docs"]]
+            self._apply(record["tenant"], records)
+            if records:
+                self._max_seq = max(self._max_seq, records[-1][1])
+        elif record["op"] == "clear":
+            # The base clear: subclasses override clear() to log it.
+            InMemoryStore.clear(self)
+
+
+class DurableInMemoryStore(LogReplayStore):
+    """
+    InMemoryStore whose writes survive restarts.
+
+    put_many() appends one WAL record per batch, applies it in memory, then
+    waits for the group-committed fsync before returning: an acknowledged
+    write is durable. (Readers may see a batch up to one fsync earlier.)
+    Once the current WAL segment passes `compact_bytes`, a background
+    compaction rotates the log, writes the store to a snapshot and deletes
+    the segments it covers. recover() loads the snapshot and replays the
+    remaining segments; it runs once, at startup, and writes before it or
+    after close() raise RuntimeError. Reads never touch the disk.
+    """
+
+    def __init__(self, directory: str, compact_bytes: int = STORE_WAL_COMPACT_BYTES):
+        super().__init__()
+        self.directory = directory
+        self.compact_bytes = compact_bytes
+        self._wal: Optional[WriteAheadLog] = None
+        self._closed = False
+        # Orders WAL appends with in-memory applies, so a compaction's view
+        # of memory matches exactly the segments it replaces.
+        self._write_lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+
+    def recover(self) -> None:
+        with self._write_lock:
+            if self._closed:
+                raise RuntimeError("store is closed")
+            if self._wal is not None:
+                return
+            started = time.perf_counter()
+            os.makedirs(self.directory, exist_ok=True)
+            InMemoryStore.clear(self)
+
+            header, rows = read_snapshot(self.directory)
+            next_segment = header["next_segment"] if header else 0
+            restored = self._restore(rows)
+
+            replayed = 0
+            segments = list_segments(self.directory)
+            for n, path in segments:
+                if n < next_segment:
+                    # Already in the snapshot (a compaction stopped short of
+                    # deleting it).
+                    os.remove(path)
+                    continue
+                for record in read_segment(path, last=(n == segments[-1][0])):
+                    self._replay(record)
+                    replayed += 1
+
+            self._seq = itertools.count(self._max_seq + 1)
+            last = segments[-1][0] + 1 if segments else next_segment
+            self._wal = WriteAheadLog(self.directory, max(last, next_segment))
+            logger.info(
+                "store_recovered",
+                extra={
+                    "props": {
+                        "event": "store_recovered",
+                        "snapshot_docs": restored,
+                        "wal_records": replayed,
+                        "duration_ms": int((time.perf_counter() - started) * 1000),
+                    }
+                },
+            )
+
+    def _restore(self, rows: Iterator[list]) -> int:
+        count = 0
+        tenant_id = None
+        records: List[Record] = []
+        projections: List[Projection] = []
+        for row in rows:
+            tenant, doc_id, seq, classification, title, body, rs, rtitle, spans = row
+            if tenant != tenant_id or len(records) >= _RESTORE_BATCH:
+                if records:
+                    self._apply(tenant_id, records, projections)
+                tenant_id, records, projections = tenant, [], []
+            records.append((doc_id, seq, classification, title, body))
+            projections.append(
+                Projection(rs, rtitle, tuple(tuple(span) for span in spans))
+            )
+            self._max_seq = max(self._max_seq, seq)
+            count += 1
+        if records:
+            self._apply(tenant_id, records, projections)
+        return count
+
+    def _log(self) -> WriteAheadLog:
+        """The open WAL. Caller holds self._write_lock."""
+        if self._closed:
+            raise RuntimeError("store is closed")
+        if self._wal is None:
+            raise RuntimeError("recover() must run before writes")
+        return self._wal
+
+    def put_many(self, tenant_id: str, items: Sequence[NewDoc]) -> List[StoredDocument]:
+        with self._write_lock:
+            wal = self._log()
+            records = self._new_records(items)
+            lsn = wal.append({"op": "put", "tenant": tenant_id, "docs": records})
+            docs = self._apply(tenant_id, records)
+        # Outside the lock: concurrent writers share one fsync.
+        wal.wait_durable(lsn)
+        if wal.segment_bytes >= self.compact_bytes:
+            self._compact_in_background()
+        return docs
+
+    def clear(self):
+        with self._write_lock:
+            wal = self._log()
+            lsn = wal.append({"op": "clear"})
+            InMemoryStore.clear(self)
+        wal.wait_durable(lsn)
+
+    def _compact_in_background(self) -> None:
+        if self._compact_lock.locked():
+            return
+        threading.Thread(target=self.compact, name="store-compact", daemon=True).start()
+
+    def compact(self) -> None:
+        """Snapshot the store and drop the WAL segments the snapshot covers."""
+        if not self._compact_lock.acquire(blocking=False):
+            return
+        try:
+            with self._write_lock:
+                if self._closed:
+                    return  # a background compaction outlived the store
+                next_segment = self._log().rotate()
+                # Documents are immutable once applied, so a list of
+                # references is a consistent snapshot.
+                docs = [
+                    (tenant_id, doc)
+                    for tenant_id, parts in self.partitions.items()
+                    for part in parts.values()
+                    for doc in part.iter_docs()
+                ]
+            rows = (
+                [
+                    tenant_id,
+                    doc.doc_id,
+                    doc.seq,
+                    doc.classification,
+                    doc.title,
+                    doc.body,
+                    doc.projection.ruleset_id,
+                    doc.projection.title,
+                    doc.projection.spans,
+                ]
+                for tenant_id, doc in docs
+            )
+            write_snapshot(self.directory, {"next_segment": next_segment}, rows)
+            for n, path in list_segments(self.directory):
+                if n < next_segment:
+                    os.remove(path)
+        finally:
+            self._compact_lock.release()
+
+    def close(self) -> None:
+        with self._write_lock:
+            self._closed = True
+            if self._wal is not None:
+                self._wal.close()
+                self._wal = None
@@ -1,20 +1,46 @@
-import json
+import atexit
 import logging
+import queue
 import sys
+import threading
 from contextvars import ContextVar
 from datetime import datetime, timezone
-from typing import Any
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
 from app.security.log_safety import scrub_recursive, is_sensitive_value
+from app.serialization import dumps
 
 request_id_ctx: ContextVar[str] = ContextVar("request_id", default="-")
 
+# Loggers whose records are dropped (and counted) when the async queue is
+# full. Every other record, audit events above all, blocks the caller instead.
+DROPPABLE_LOGGERS = frozenset({"app.access"})
+
+
+# (epoch second, its "YYYY-MM-DDTHH:MM:SS" rendering): log lines within one
+# second only format the millisecond part.
+_ts_cache = (-1, "")
+
+
+def format_timestamp(created: float) -> str:
+    """UTC ISO-8601 timestamp at millisecond granularity."""
+    global _ts_cache
+    sec = int(created)
+    cached_sec, prefix = _ts_cache
+    if sec != cached_sec:
+        prefix = datetime.fromtimestamp(sec, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+        _ts_cache = (sec, prefix)
+    return f"{prefix}.{int((created - sec) * 1000):03d}+00:00"
+
 
 class JsonFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         rid = getattr(record, "request_id", None) or request_id_ctx.get()
 
         log_record: dict[str, Any] = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            # Creation time, not write time: records may be written later by
+            # the async log worker.
+            "timestamp": format_timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "request_id": rid,
@@ -28,7 +54,7 @@ class JsonFormatter(logging.Formatter):
         if isinstance(props, dict):
             log_record.update(props)
 
-        return json.dumps(log_record, default=str)
+        return dumps(log_record)
 
 
 class SafeLogFilter(logging.Filter):
@@ -58,17 +84,102 @@ class SafeLogFilter(logging.Filter):
         return True
 
 
-def setup_logging(level: int = logging.INFO) -> None:
+class _CaptureHandler(QueueHandler):
+    """
+    Hot-path half of the async pipeline: pins request context onto the record
+    and enqueues it. Scrubbing, formatting and the stdout write happen on the
+    QueueListener thread.
+    """
+
+    def __init__(self, q: "queue.Queue[logging.LogRecord]"):
+        super().__init__(q)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # ContextVars don't follow the record into the worker thread.
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_ctx.get()
+        # Freeze %-args now; the caller may mutate them after returning.
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        # Don't keep request frames alive in the queue (tracebacks aren't
+        # part of the JSON output).
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if record.name not in DROPPABLE_LOGGERS:
+            self.queue.put(record)  # block: never lose an audit event
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+_listener: Optional[QueueListener] = None
+_capture: Optional[_CaptureHandler] = None
+
+
+def _safe_stream_handler() -> logging.Handler:
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter())
+    handler.addFilter(SafeLogFilter())
+    return handler
+
+
+def setup_logging(level: int = logging.INFO, queue_size: int = 0) -> None:
+    """
+    Route all logs through SafeLogFilter + JsonFormatter to stdout.
+    With `queue_size` > 0, records are only captured on the calling thread
+    and written by a background worker (see shutdown_logging()).
+    """
+    shutdown_logging()
+
     root = logging.getLogger()
     root.setLevel(level)
     for h in list(root.handlers):
         root.removeHandler(h)
 
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(JsonFormatter())
-    handler.addFilter(SafeLogFilter())
+    handler = _safe_stream_handler()
+    if queue_size > 0:
+        global _listener, _capture
+        _capture = _CaptureHandler(queue.Queue(maxsize=queue_size))
+        _listener = QueueListener(_capture.queue, handler)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        handler = _capture
     root.addHandler(handler)
 
     for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
         logging.getLogger(name).handlers = []
         logging.getLogger(name).propagate = True
+
+
+def shutdown_logging() -> None:
+    """
+    Flush and stop the async log worker, then fall back to synchronous
+    logging. Safe to call more than once, or when async mode is off.
+    """
+    global _listener, _capture
+    listener, capture = _listener, _capture
+    if listener is None or capture is None:
+        return
+    _listener = _capture = None
+
+    root = logging.getLogger()
+    root.removeHandler(capture)
+    listener.stop()  # drains everything enqueued so far
+    for h in listener.handlers:
+        root.addHandler(h)
+
+    if capture.dropped:
+        logging.getLogger("app.logging").warning(
+            "log_records_dropped",
+            extra={
+                "props": {"event": "log_records_dropped", "dropped": capture.dropped}
+            },
+        )
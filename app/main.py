@@ -1,45 +1,91 @@
 import logging
 import os
 import sys
-import time
-import uuid
 from contextlib import asynccontextmanager
+from dataclasses import asdict
+from functools import partial
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from mangum import Mangum
 
 # 1. Configure logging immediately
-from app.json_logger import request_id_ctx, setup_logging
+from app.json_logger import setup_logging, shutdown_logging
+from app.settings import LOG_ASYNC, LOG_QUEUE_SIZE
 
-setup_logging()
+setup_logging(queue_size=LOG_QUEUE_SIZE if LOG_ASYNC else 0)
 
 # 2. Late imports to avoid circular deps or logging issues
+from app.async_store import (  # noqa: E402
+    AsyncRetrievalStore,
+    AsyncScopedView,
+    as_async,
+    run_offloaded,
+)
+from app.cache import QUERY_CACHE  # noqa: E402
+from app.middleware import RequestContextMiddleware  # noqa: E402
+from app.singleflight import QUERY_FLIGHTS  # noqa: E402
 from app.models import (  # noqa: E402
+    Highlight,
+    IngestBatchRequest,
+    IngestBatchResponse,
     IngestRequest,
     IngestResponse,
+    QueryBatchRequest,
+    QueryBatchResponse,
+    QueryBatchResult,
     QueryRequest,
     QueryResult,
     QueryResponse,
 )
-from app.security.audit import audit, sha256_hex  # noqa: E402
+from app.security.audit import audit, close_audit_sink, sha256_hex  # noqa: E402
+from app.security.audit_sinks import AUDIT_SINK_KINDS  # noqa: E402
+from app.security.cursor import (  # noqa: E402
+    InvalidCursor,
+    StaleCursor,
+    cursor_binding,
+    decode_cursor,
+    encode_cursor,
+)
 from app.security.jwt_claims import get_jwt_claims_from_asgi_scope  # noqa: E402
 from app.security.policy import (  # noqa: E402
+    REASON_ADMIN_REQUIRED,
+    REASON_CURSOR_INVALID,
+    REASON_CURSOR_STALE,
     REASON_ROLE_UNKNOWN,
     authorize_ingest,
+    authorize_ingest_batch,
     deny,
     get_allowed_classifications,
 )
+from app.security.redact import ruleset_id  # noqa: E402
+from app.serialization import FastJSONResponse  # noqa: E402
 from app.security.principal import (  # noqa: E402
+    Principal,
     resolve_principal_from_headers,
     resolve_principal_from_jwt_claims,
 )
-from app.security.redact import redact_text  # noqa: E402
-from app.settings import ALLOW_INSECURE_HEADERS, AUTH_MODE  # noqa: E402
-from app.store import STORE  # noqa: E402
+from app.settings import ALLOW_INSECURE_HEADERS, AUDIT_SINK, AUTH_MODE  # noqa: E402
+from app.search import make_snippet, normalize_query  # noqa: E402
+from app.store import STORE, ReadOnlyStoreError, SearchHit  # noqa: E402
 from app.version import __version__ as version  # noqa: E402
 
 logger = logging.getLogger("app.main")
-access_logger = logging.getLogger("app.access")
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
 
 # -----------------------------------------------------------------------------
@@ -62,28 +108,248 @@ async def lifespan(app: FastAPI):
         logger.critical(f"FATAL: Unknown AUTH_MODE '{AUTH_MODE}'")
         sys.exit(1)
 
+    if AUDIT_SINK not in AUDIT_SINK_KINDS:
+        logger.critical(f"FATAL: Unknown AUDIT_SINK '{AUDIT_SINK}'")
+        sys.exit(1)
+
+    # Persistent stores load their data before the first request; a store
+    # that cannot be recovered intact must not serve a partial corpus.
+    try:
+        STORE.recover()
+    except (OSError, ValueError) as e:
+        logger.critical(f"FATAL: store recovery failed: {e}")
+        sys.exit(1)
+
     logger.info(f"startup_check_passed mode={AUTH_MODE}")
 
     yield
-    # (Cleanup logic would go here)
+
+    # Seal pending audit batches, then flush queued log records (audit
+    # events included) before exit.
+    STORE.close()
+    close_audit_sink()
+    shutdown_logging()
 
 
 app = FastAPI(title="Compliance-Aligned Data Access Gateway", lifespan=lifespan)
 
 
+@app.exception_handler(ReadOnlyStoreError)
+async def read_only_store(request: Request, exc: ReadOnlyStoreError):
+    # A mapped corpus is rebuilt offline: ingest is refused (after the usual
+    # authorization), never silently dropped.
+    return FastJSONResponse(status_code=503, content={"detail": "Store is read-only"})
+
+
 # -----------------------------------------------------------------------------
 # Utilities
 # -----------------------------------------------------------------------------
-def _derive_request_id(request: Request) -> str:
-    """Prefer a safe upstream X-Request-Id; otherwise generate a UUID4."""
-    # Simple alphanumeric + symbols check to prevent log injection via header
-    raw = request.headers.get("X-Request-Id", "").strip()
+def _store() -> AsyncRetrievalStore:
+    """
+    The store as awaited by the routes. Resolved per request (the adapter is
+    a thin wrapper), so a swapped STORE takes effect immediately.
+    """
+    return as_async(STORE)
+
+
+def _to_result(hit: SearchHit, terms: Sequence[str]) -> QueryResult:
+    """Project a hit for the response: ingest-time redacted title + snippet."""
+    snippet, highlights = make_snippet(hit.doc.body, hit.projection.spans, terms)
+    return QueryResult(
+        doc_id=hit.doc.doc_id,
+        title=hit.projection.title,
+        snippet=snippet,
+        highlights=[Highlight(start=s, end=e) for s, e in highlights],
+    )
+
+
+class _Page(NamedTuple):
+    hits: List[SearchHit]
+    terms: Tuple[str, ...]
+    next_cursor: Optional[str]
+
+
+async def _query_page(
+    view: AsyncScopedView,
+    payload: QueryRequest,
+    p: Principal,
+    allowed: Set[str],
+    request: Request,
+    generation: Tuple[int, ...],
+) -> _Page:
+    """
+    Rank one page within an already-authorized view.
+    The incoming cursor must verify against this principal's scope and query
+    (tampered or replayed cursors fail closed) and against the scope
+    `generation` (cursors issued before a write are stale); the next one is
+    signed here.
+    """
+    q = normalize_query(payload.query)
+    binding = cursor_binding(p.tenant_id, allowed, q)
+
+    after = None
+    if payload.cursor:
+        try:
+            after = decode_cursor(payload.cursor, binding, generation)
+        except InvalidCursor as exc:
+            deny(
+                principal=p,
+                request_id=request.state.request_id,
+                path=str(request.url.path),
+                reason_code=(
+                    REASON_CURSOR_STALE
+                    if isinstance(exc, StaleCursor)
+                    else REASON_CURSOR_INVALID
+                ),
+            )
+
+    # One extra hit tells us whether another page exists.
+    limit = payload.page_size or payload.top_k
+    hits = await view.asearch(q, limit=limit + 1, after=after)
+    next_cursor = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        next_cursor = encode_cursor(binding, hits[-1].rank_key, generation)
+    return _Page(hits=hits, terms=tuple(q.split()), next_cursor=next_cursor)
+
+
+def _iter_results(
+    page: _Page,
+    memo: Optional[Dict[Tuple[str, Tuple[str, ...]], QueryResult]] = None,
+) -> Iterator[QueryResult]:
+    """
+    Lazily project a page of hits (Redact-Before-Return).
+    `memo` lets a batch reuse projections across identical (doc, terms) pairs.
+    """
+    memo = {} if memo is None else memo
+    for h in page.hits:
+        key = (h.doc.doc_id, page.terms)
+        if key not in memo:
+            memo[key] = _to_result(h, page.terms)
+        yield memo[key]
+
+
+def _project_page(
+    page: _Page, memo: Optional[Dict[Tuple[str, Tuple[str, ...]], QueryResult]]
+) -> Tuple[QueryResult, ...]:
+    return tuple(_iter_results(page, memo))
+
+
+# A cached page: its projected (already redacted) results and next cursor.
+CachedPage = Tuple[Tuple[QueryResult, ...], Optional[str]]
+
+
+class CacheSlot(NamedTuple):
+    """Cache key and (scope generation, ruleset id) for one page request."""
 
-    # CRITICAL FIX: Ensure 'raw' is not empty before returning it.
-    if raw and len(raw) < 64 and all(c.isalnum() or c in "-_." for c in raw):
-        return raw
+    key: Hashable
+    generation: Tuple[Tuple[int, ...], str]
 
-    return str(uuid.uuid4())
+
+async def _cache_slot(
+    p: Principal, allowed: Set[str], payload: QueryRequest
+) -> CacheSlot:
+    # The authorization scope is part of the key, so a page cached for one
+    # (tenant, role scope) can never be served to another. The cursor was
+    # verified against that same scope before its page was cached.
+    key = (
+        p.tenant_id,
+        frozenset(allowed),
+        normalize_query(payload.query),
+        payload.page_size or payload.top_k,
+        payload.cursor,
+    )
+    # Taken before ranking: a write racing the computation leaves the entry
+    # stale (dropped on next read) rather than serving pre-write results.
+    generation = (await _store().ageneration(p.tenant_id, list(allowed)), ruleset_id())
+    return CacheSlot(key, generation)
+
+
+def _page_bytes(results: Sequence[QueryResult]) -> int:
+    """Approximate memory held by a cached page."""
+    return sum(
+        256 + len(r.doc_id) + len(r.title) + len(r.snippet) + 64 * len(r.highlights)
+        for r in results
+    )
+
+
+def _remember(
+    slot: CacheSlot, results: Sequence[QueryResult], next_cursor: Optional[str]
+) -> None:
+    QUERY_CACHE.put(*slot, (tuple(results), next_cursor), _page_bytes(results))
+
+
+async def _page_results(
+    view: AsyncScopedView,
+    payload: QueryRequest,
+    p: Principal,
+    allowed: Set[str],
+    request: Request,
+    memo: Optional[Dict[Tuple[str, Tuple[str, ...]], QueryResult]] = None,
+) -> CachedPage:
+    """
+    One fully projected page, served from QUERY_CACHE when still valid.
+    On a miss, concurrent identical requests (same cache slot) share a single
+    computation; each caller still audits under its own request_id.
+    """
+    slot = await _cache_slot(p, allowed, payload)
+    cached = QUERY_CACHE.get(*slot)
+    if cached is not None:
+        return cached
+
+    async def compute() -> CachedPage:
+        page = await _query_page(view, payload, p, allowed, request, slot.generation[0])
+        # Snippets and highlights for every hit: CPU-bound, off the loop.
+        results = await run_offloaded(_project_page, page, memo)
+        _remember(slot, results, page.next_cursor)
+        return results, page.next_cursor
+
+    computed, _ = await QUERY_FLIGHTS.do(slot, compute)
+    return computed
+
+
+def _audit_query(
+    p: Principal, request_id: str, payload: QueryRequest, doc_ids: List[str]
+) -> None:
+    audit(
+        "query_allowed",
+        tenant_id=p.tenant_id,
+        role=p.role,
+        user_id=p.user_id,
+        request_id=request_id,
+        query_sha256=sha256_hex(payload.query),
+        query_len=len(payload.query),
+        results_count=len(doc_ids),
+        doc_ids=doc_ids,
+    )
+
+
+def _wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _stream_query(
+    results: Iterable[QueryResult],
+    payload: QueryRequest,
+    p: Principal,
+    request_id: str,
+    on_complete: Optional[Callable[[List[QueryResult]], None]] = None,
+) -> Iterator[str]:
+    """
+    Generator pipeline: redact -> serialize, one NDJSON line per ranked hit.
+    The audit event is written when the stream ends (or the client goes
+    away), with the count of results actually sent. `on_complete` only runs
+    if the whole page was sent.
+    """
+    sent: List[QueryResult] = []
+    try:
+        for result in results:
+            yield result.model_dump_json() + "\n"
+            sent.append(result)
+        if on_complete:
+            on_complete(sent)
+    finally:
+        _audit_query(p, request_id, payload, [r.doc_id for r in sent])
 
 
 def resolve_principal(request: Request):
@@ -110,59 +376,19 @@ def resolve_principal(request: Request):
 
 
 # -----------------------------------------------------------------------------
-# Middleware: Request ID + Access Logging
+# Middleware: Request ID + Access Logging (pure ASGI, see app/middleware.py)
 # -----------------------------------------------------------------------------
-@app.middleware("http")
-async def request_context(request: Request, call_next):
-    rid = _derive_request_id(request)
-
-    # 1. Set ContextVar for correlation in deep calls (e.g. audit logs)
-    token = request_id_ctx.set(rid)
-    request.state.request_id = rid
-
-    start = time.perf_counter()
-    status_code = 500
-
-    try:
-        response = await call_next(request)
-        status_code = response.status_code
-
-        # ---------------------------------------------------------
-        # TRACE CORRELATION SIGNAL
-        # ---------------------------------------------------------
-        response.headers["X-Request-Id"] = rid
-        response.headers["X-Trace-Id"] = rid  # Alias for client correlation
-
-        return response
-    except Exception:
-        status_code = 500
-        raise
-    finally:
-        duration_ms = int((time.perf_counter() - start) * 1000)
-
-        # 2. Structured Access Log
-        access_logger.info(
-            "request_complete",
-            extra={
-                "props": {
-                    "event": "request_complete",
-                    "method": request.method,
-                    "path": request.url.path,
-                    "status": status_code,
-                    "duration_ms": duration_ms,
-                }
-            },
-        )
-
-        # 3. Cleanup ContextVar
-        request_id_ctx.reset(token)
+app.add_middleware(RequestContextMiddleware)
 
 
 # -----------------------------------------------------------------------------
 # Routes
+# Routes with a response_model are serialized straight to JSON bytes by
+# pydantic-core; routes returning plain dicts use FastJSONResponse (orjson
+# when installed).
 # -----------------------------------------------------------------------------
-@app.get("/health")
-def health(request: Request):
+@app.get("/health", response_class=FastJSONResponse)
+async def health(request: Request):
     return {
         "ok": True,
         "version": version,
@@ -170,8 +396,8 @@ def health(request: Request):
     }
 
 
-@app.get("/whoami")
-def whoami(request: Request):
+@app.get("/whoami", response_class=FastJSONResponse)
+async def whoami(request: Request):
     p = resolve_principal(request)
     audit(
         "identity_resolved",
@@ -190,7 +416,7 @@ def whoami(request: Request):
 
 
 @app.post("/ingest", response_model=IngestResponse)
-def ingest(payload: IngestRequest, request: Request):
+async def ingest(payload: IngestRequest, request: Request):
     p = resolve_principal(request)
 
     authorize_ingest(
@@ -200,7 +426,7 @@ def ingest(payload: IngestRequest, request: Request):
         path=str(request.url.path),
     )
 
-    doc = STORE.put(
+    doc = await _store().aput(
         tenant_id=p.tenant_id,
         classification=payload.classification,
         title=payload.title,
@@ -216,11 +442,36 @@ def ingest(payload: IngestRequest, request: Request):
     return IngestResponse(doc_id=doc.doc_id, request_id=request.state.request_id)
 
 
-@app.post("/query", response_model=QueryResponse)
-def query(payload: QueryRequest, request: Request):
+@app.post("/ingest/batch", response_model=IngestBatchResponse)
+async def ingest_batch(payload: IngestBatchRequest, request: Request):
     p = resolve_principal(request)
 
-    # 1) Scope calculation (Auth-Before-Retrieval)
+    # Every item is authorized before anything is written (fail-closed).
+    authorize_ingest_batch(
+        principal=p,
+        classifications=[d.classification for d in payload.documents],
+        request_id=request.state.request_id,
+        path=str(request.url.path),
+    )
+
+    docs = await _store().aput_many(
+        tenant_id=p.tenant_id,
+        items=[(d.classification, d.title, d.body) for d in payload.documents],
+    )
+    doc_ids = [d.doc_id for d in docs]
+
+    audit(
+        "docs_ingested",
+        tenant_id=p.tenant_id,
+        doc_count=len(doc_ids),
+        doc_ids=doc_ids,
+        request_id=request.state.request_id,
+    )
+    return IngestBatchResponse(doc_ids=doc_ids, request_id=request.state.request_id)
+
+
+def _authorized_scope(p: Principal, request: Request) -> Set[str]:
+    """Scope calculation (Auth-Before-Retrieval); unknown roles fail closed."""
     allowed = get_allowed_classifications(p.role)
 
     if not allowed:
@@ -231,42 +482,151 @@ def query(payload: QueryRequest, request: Request):
             path=str(request.url.path),
             reason_code=REASON_ROLE_UNKNOWN,
         )
+    return allowed
+
+
+@app.post("/query", response_model=QueryResponse)
+async def query(payload: QueryRequest, request: Request):
+    p = resolve_principal(request)
+
+    # 1) Scope calculation (Auth-Before-Retrieval)
+    allowed = _authorized_scope(p, request)
+
+    if not payload.query.strip():
+        return QueryResponse(results=[], request_id=request.state.request_id)
+
+    # 2) Retrieval + Ranking (BM25 top-k, scoped inside the store)
+    # 3) Projection (Redact-Before-Return): top-k hits only, windowed snippets
+    view = await _store().ascoped(p.tenant_id, list(allowed))
+
+    if _wants_ndjson(request):
+        # Cache hits replay the stored page; misses stream lazily (projected
+        # in the threadpool as the response is sent) and are cached only once
+        # the full page has been sent.
+        slot = await _cache_slot(p, allowed, payload)
+        cached = QUERY_CACHE.get(*slot)
+        if cached is not None:
+            results, next_cursor = cached
+            on_complete = None
+        else:
+            page = await _query_page(
+                view, payload, p, allowed, request, slot.generation[0]
+            )
+            results, next_cursor = _iter_results(page), page.next_cursor
+            on_complete = partial(_remember, slot, next_cursor=next_cursor)
+        headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+        return StreamingResponse(
+            _stream_query(results, payload, p, request.state.request_id, on_complete),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers=headers,
+        )
+
+    results, next_cursor = await _page_results(view, payload, p, allowed, request)
+    _audit_query(p, request.state.request_id, payload, [r.doc_id for r in results])
+
+    return QueryResponse(
+        results=list(results),
+        request_id=request.state.request_id,
+        next_cursor=next_cursor,
+    )
+
 
-    candidates = STORE.list_scoped(
+@app.post("/query/batch", response_model=QueryBatchResponse)
+async def query_batch(payload: QueryBatchRequest, request: Request):
+    # Principal and scope are resolved once for the whole fan-out.
+    p = resolve_principal(request)
+    allowed = _authorized_scope(p, request)
+
+    # Every sub-query runs against one scoped view; identical (doc, terms)
+    # projections are built once and shared.
+    view = await _store().ascoped(p.tenant_id, list(allowed))
+    memo: Dict[Tuple[str, Tuple[str, ...]], QueryResult] = {}
+    pages = [
+        await _page_results(view, q, p, allowed, request, memo) for q in payload.queries
+    ]
+    per_query = [results for results, _ in pages]
+
+    doc_ids = list(dict.fromkeys(r.doc_id for results in per_query for r in results))
+    audit(
+        "query_batch_allowed",
         tenant_id=p.tenant_id,
-        allowed_classifications=list(allowed),
+        role=p.role,
+        user_id=p.user_id,
+        request_id=request.state.request_id,
+        query_count=len(payload.queries),
+        query_sha256s=[sha256_hex(q.query) for q in payload.queries],
+        results_count=sum(len(results) for results in per_query),
+        doc_ids=doc_ids,
     )
 
-    # 2) Ranking (Simple Keyword Match)
-    q = payload.query.strip().lower()
-    if not q:
-        return QueryResponse(results=[], request_id=request.state.request_id)
+    return QueryBatchResponse(
+        request_id=request.state.request_id,
+        queries=[
+            QueryBatchResult(results=list(results), next_cursor=next_cursor)
+            for results, next_cursor in pages
+        ],
+    )
 
-    ranked = [d for d in candidates if q in d.body.lower()]
 
-    # 3) Projection & Redaction (Redact-Before-Return)
-    results = [
-        QueryResult(
-            doc_id=d.doc_id,
-            title=redact_text(d.title),
-            snippet=redact_text(d.body)[:160],
+def _require_admin(request: Request) -> Principal:
+    """Resolve the principal; anything but an admin gets a deny receipt."""
+    p = resolve_principal(request)
+    if p.role != "admin":
+        deny(
+            principal=p,
+            request_id=request.state.request_id,
+            path=str(request.url.path),
+            reason_code=REASON_ADMIN_REQUIRED,
         )
-        for d in ranked
-    ]
+    return p
 
+
+@app.get("/admin/query-cache", response_class=FastJSONResponse)
+async def query_cache_stats(request: Request):
+    """
+    Query cache counters for sizing, for the caller's own tenant: the cache
+    is shared, and process-wide numbers would reveal other tenants' query
+    activity. Aggregates only: no keys or queries are exposed.
+    """
+    p = _require_admin(request)
     audit(
-        "query_allowed",
+        "query_cache_stats_read",
         tenant_id=p.tenant_id,
         role=p.role,
         user_id=p.user_id,
         request_id=request.state.request_id,
-        query_sha256=sha256_hex(payload.query),
-        query_len=len(payload.query),
-        results_count=len(results),
-        doc_ids=[r.doc_id for r in results],
     )
+    return {
+        **asdict(QUERY_CACHE.stats(p.tenant_id)),
+        "coalesced": QUERY_FLIGHTS.coalesced_in(p.tenant_id),
+        "request_id": request.state.request_id,
+    }
 
-    return QueryResponse(results=results, request_id=request.state.request_id)
+
+@app.get("/admin/storage", response_class=FastJSONResponse)
+async def storage_stats(request: Request):
+    """Storage footprint of the caller's own tenant, incl. body dedup."""
+    p = _require_admin(request)
+    audit(
+        "storage_stats_read",
+        tenant_id=p.tenant_id,
+        role=p.role,
+        user_id=p.user_id,
+        request_id=request.state.request_id,
+    )
+    stats = await _store().atenant_stats(p.tenant_id)
+    bodies = stats.bodies
+    return {
+        "doc_count": stats.doc_count,
+        "bytes": stats.bytes,
+        "unique_bodies": bodies.unique_bodies,
+        "body_bytes": bodies.logical_bytes,
+        "unique_body_bytes": bodies.unique_bytes,
+        "stored_body_bytes": bodies.stored_bytes,
+        "dedup_ratio": round(bodies.dedup_ratio, 3),
+        "compression_ratio": round(bodies.compression_ratio, 3),
+        "request_id": request.state.request_id,
+    }
 
 
 # -----------------------------------------------------------------------------
@@ -0,0 +1,458 @@
+"""
+Read-only corpus snapshots opened with mmap.
+
+File layout (native byte order, every section 8-byte aligned):
+
+    header   magic (8 bytes), table offset (u64), table length (u64)
+    per partition, for N documents and T terms:
+      seqs          i64[N]    insertion seq (rank tiebreak)
+      lengths       u32[N]    token counts (BM25 length normalization)
+      records       u64[N]    offset of each document record
+      term_offsets  u64[T+1]  into the sorted, concatenated UTF-8 terms
+      postings      u64[T]    offset of each term's postings:
+                              u32 count, u32 doc index[count] (ascending),
+                              u32 tf[count]
+    per tenant: deduplicated UTF-8 bodies
+    records: u32 lengths of doc_id / title / redacted title, u32 span count,
+             u64 body offset, u32 body length, then the strings and spans
+    table    JSON: ruleset id, byte order, and per (tenant, classification)
+             the section offsets and counts above
+
+Opening reads only the header and the table, so startup cost does not grow
+with the corpus; documents are decoded when a query returns them. Pages are
+shared through the OS page cache by every process mapping the file.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.body_store import BodyStats
+from app.search import bm25_idf, bm25_score, query_terms, top_ranked
+from app.store import (
+    InMemoryStore,
+    NewDoc,
+    Projection,
+    RankKey,
+    ReadOnlyStoreError,
+    RetrievalStore,
+    ScopedView,
+    SearchHit,
+    StoredDocument,
+    TenantStats,
+    current_projection,
+)
+
+MAGIC = b"GWMAP001"
+_HEADER = struct.Struct("<8sQQ")
+_RECORD = struct.Struct("<IIIIQI")
+
+
+# ------------------------------------------------------------------------------
+# Build
+# ------------------------------------------------------------------------------
+class _Writer:
+    def __init__(self, f):
+        self.f = f
+        self.pos = f.tell()
+
+    def align(self) -> None:
+        pad = -self.pos % 8
+        if pad:
+            self.write(b"\0" * pad)
+
+    def write(self, data: bytes) -> int:
+        at = self.pos
+        self.f.write(data)
+        self.pos += len(data)
+        return at
+
+    def array(self, typecode: str, values) -> int:
+        self.align()
+        return self.write(array(typecode, values).tobytes())
+
+
+def write_mapped_store(store: InMemoryStore, path: str) -> None:
+    """Serialize `store` (documents, projections, index) to `path` atomically."""
+    tmp = path + ".tmp"
+    table: Dict[str, Any] = {
+        "ruleset_id": None,
+        "byteorder": sys.byteorder,
+        "tenants": {},
+    }
+    with open(tmp, "wb") as f:
+        w = _Writer(f)
+        w.write(_HEADER.pack(MAGIC, 0, 0))
+        for tenant_id in sorted(store.partitions):
+            tenant = store.partitions[tenant_id]
+            # Bodies are deduplicated per tenant, as in BodyStore.
+            bodies: Dict[bytes, Tuple[int, int]] = {}
+            entry: Dict[str, Any] = {"partitions": {}}
+            logical = unique = 0
+            for classification in sorted(tenant):
+                part = tenant[classification]
+                merged = part.merged()
+                docs = list(merged.docs.values())
+                index = {doc.doc_id: i for i, doc in enumerate(docs)}
+                record_offsets = []
+                for doc in docs:
+                    proj = current_projection(doc)
+                    table["ruleset_id"] = proj.ruleset_id
+                    raw = doc.body.encode("utf-8")
+                    digest = hashlib.sha256(raw).digest()
+                    logical += len(raw)
+                    if digest not in bodies:
+                        bodies[digest] = (w.write(raw), len(raw))
+                        unique += len(raw)
+                    body_off, body_len = bodies[digest]
+                    doc_id = doc.doc_id.encode("utf-8")
+                    title = doc.title.encode("utf-8")
+                    rtitle = proj.title.encode("utf-8")
+                    w.align()
+                    record_offsets.append(
+                        w.write(
+                            _RECORD.pack(
+                                len(doc_id),
+                                len(title),
+                                len(rtitle),
+                                len(proj.spans),
+                                body_off,
+                                body_len,
+                            )
+                            + doc_id
+                            + title
+                            + rtitle
+                            + array("I", [x for s in proj.spans for x in s]).tobytes()
+                        )
+                    )
+
+                terms = sorted(merged.postings)
+                term_blob = [t.encode("utf-8") for t in terms]
+                term_offsets = [0]
+                for t in term_blob:
+                    term_offsets.append(term_offsets[-1] + len(t))
+                postings = []
+                for t in terms:
+                    # Sorted by doc index, so readers can bisect a posting list.
+                    plist = sorted(
+                        (index[d], tf) for d, tf in merged.postings[t].items()
+                    )
+                    w.align()
+                    postings.append(
+                        w.write(
+                            array("I", [len(plist)]).tobytes()
+                            + array("I", [d for d, _ in plist]).tobytes()
+                            + array("I", [tf for _, tf in plist]).tobytes()
+                        )
+                    )
+
+                entry["partitions"][classification] = {
+                    "doc_count": len(docs),
+                    "total_length": part.total_length,
+                    "bytes": part.bytes,
+                    "term_count": len(terms),
+                    "seqs": w.array("q", [d.seq for d in docs]),
+                    "lengths": w.array("I", [d.length for d in docs]),
+                    "records": w.array("Q", record_offsets),
+                    "term_offsets": w.array("Q", term_offsets),
+                    "terms": w.write(b"".join(term_blob)),
+                    "postings": w.array("Q", postings),
+                }
+            entry["bodies"] = {
+                "unique": len(bodies),
+                "logical_bytes": logical,
+                "unique_bytes": unique,
+            }
+            table["tenants"][tenant_id] = entry
+
+        w.align()
+        blob = json.dumps(table).encode("utf-8")
+        table_at = w.write(blob)
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, table_at, len(blob)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+# ------------------------------------------------------------------------------
+# Read
+# ------------------------------------------------------------------------------
+class _MappedPartition:
+    """Zero-copy views over one partition's arrays."""
+
+    __slots__ = (
+        "tenant_id",
+        "mm",
+        "doc_count",
+        "total_length",
+        "seqs",
+        "lengths",
+        "records",
+        "term_offsets",
+        "terms_at",
+        "postings",
+        "ruleset_id",
+    )
+
+    def __init__(
+        self, tenant_id: str, mm: mmap.mmap, meta: Dict[str, Any], ruleset_id: str
+    ):
+        n, t = meta["doc_count"], meta["term_count"]
+        view = memoryview(mm)
+        self.tenant_id = tenant_id
+        self.mm = mm
+        self.doc_count = n
+        self.total_length = meta["total_length"]
+        self.seqs = view[meta["seqs"] : meta["seqs"] + 8 * n].cast("q")
+        self.lengths = view[meta["lengths"] : meta["lengths"] + 4 * n].cast("I")
+        self.records = view[meta["records"] : meta["records"] + 8 * n].cast("Q")
+        self.term_offsets = view[
+            meta["term_offsets"] : meta["term_offsets"] + 8 * (t + 1)
+        ].cast("Q")
+        self.terms_at = meta["terms"]
+        self.postings = view[meta["postings"] : meta["postings"] + 8 * t].cast("Q")
+        self.ruleset_id = ruleset_id
+
+    def _term(self, i: int) -> bytes:
+        at = self.terms_at
+        return self.mm[at + self.term_offsets[i] : at + self.term_offsets[i + 1]]
+
+    def lookup(self, term: str) -> Optional[Tuple[memoryview, memoryview]]:
+        """(doc indexes, term frequencies) of `term`, or None."""
+        key = term.encode("utf-8")
+        lo, hi = 0, len(self.postings)
+        while lo < hi:  # binary search over the sorted term dictionary
+            mid = (lo + hi) // 2
+            if self._term(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(self.postings) or self._term(lo) != key:
+            return None
+        at = self.postings[lo]
+        (count,) = struct.unpack_from("I", self.mm, at)
+        view = memoryview(self.mm)
+        ids = view[at + 4 : at + 4 + 4 * count].cast("I")
+        tfs = view[at + 4 + 4 * count : at + 4 + 8 * count].cast("I")
+        return ids, tfs
+
+    def doc(self, i: int, classification: str) -> StoredDocument:
+        """Decode document `i` from its record."""
+        mm, at = self.mm, self.records[i]
+        id_len, t_len, rt_len, n_spans, body_off, body_len = _RECORD.unpack_from(mm, at)
+        at += _RECORD.size
+        doc_id = mm[at : at + id_len].decode("utf-8")
+        at += id_len
+        title = mm[at : at + t_len].decode("utf-8")
+        at += t_len
+        rtitle = mm[at : at + rt_len].decode("utf-8")
+        at += rt_len
+        flat = array("I", mm[at : at + 8 * n_spans])
+        body = mm[body_off : body_off + body_len].decode("utf-8")
+
+        doc = StoredDocument(
+            doc_id, self.tenant_id, classification, title, body, seq=self.seqs[i]
+        )
+        doc.length = self.lengths[i]
+        doc.projection = Projection(
+            ruleset_id=self.ruleset_id,
+            title=rtitle,
+            spans=tuple(zip(flat[::2], flat[1::2])),
+        )
+        return doc
+
+
+# (score, -seq, partition, classification, doc index)
+_Scored = Tuple[float, int, _MappedPartition, str, int]
+
+
+class _MappedView(ScopedView):
+    def __init__(self, parts: List[Tuple[str, _MappedPartition]]):
+        self.parts = parts
+        self.doc_count = sum(p.doc_count for _, p in parts)
+        self.avg_len = sum(p.total_length for _, p in parts) / (self.doc_count or 1)
+        self._postings: Dict[Tuple[int, str], Any] = {}
+        self._idf: Dict[str, float] = {}
+        self._matches: Dict[Tuple[str, ...], List[_Scored]] = {}
+
+    def _lookup(self, i: int, term: str):
+        key = (i, term)
+        if key not in self._postings:
+            self._postings[key] = self.parts[i][1].lookup(term)
+        return self._postings[key]
+
+    def idf(self, term: str) -> float:
+        if term not in self._idf:
+            df = 0
+            for i in range(len(self.parts)):
+                found = self._lookup(i, term)
+                df += len(found[0]) if found else 0
+            self._idf[term] = bm25_idf(self.doc_count, df)
+        return self._idf[term]
+
+    def _match(self, terms: Tuple[str, ...]) -> List[_Scored]:
+        if terms in self._matches:
+            return self._matches[terms]
+
+        idfs = [self.idf(t) for t in terms]
+        scored: List[_Scored] = []
+        for i, (classification, part) in enumerate(self.parts):
+            lists = [self._lookup(i, t) for t in terms]
+            if not all(lists):
+                continue
+            # Conjunctive match driven by the rarest term: each candidate is
+            # binary-searched in the other (ascending) lists, and since
+            # candidates ascend too, each search starts where the last ended.
+            rarest = min(range(len(lists)), key=lambda k: len(lists[k][0]))
+            others = [k for k in range(len(lists)) if k != rarest]
+            starts = [0] * len(lists)
+            for doc_i, tf in zip(*lists[rarest]):
+                tfs = [0] * len(terms)
+                tfs[rarest] = tf
+                for k in others:
+                    ids = lists[k][0]
+                    at = starts[k] = bisect_left(ids, doc_i, starts[k])
+                    if at == len(ids) or ids[at] != doc_i:
+                        break
+                    tfs[k] = lists[k][1][at]
+                else:
+                    score = bm25_score(tfs, idfs, part.lengths[doc_i], self.avg_len)
+                    scored.append(
+                        (score, -part.seqs[doc_i], part, classification, doc_i)
+                    )
+
+        self._matches[terms] = scored
+        return scored
+
+    def search(
+        self, query: str, limit: Optional[int] = None, after: Optional[RankKey] = None
+    ) -> List[SearchHit]:
+        terms = tuple(query_terms(query))
+        if not terms or not self.doc_count:
+            return []
+        top = top_ranked(self._match(terms), limit, after)
+        return [
+            SearchHit.for_doc(part.doc(doc_i, classification), score)
+            for score, _, part, classification, doc_i in top
+        ]
+
+
+class MappedStore(RetrievalStore):
+    """
+    Read-only store over a file built by write_mapped_store() (see
+    scripts/build_mapped_store.py). Writes raise ReadOnlyStoreError.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, table_at, table_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a mapped store file")
+        table = json.loads(self._mm[table_at : table_at + table_len])
+        if table["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path}: built for {table['byteorder']}-endian hosts")
+
+        self.ruleset_id = table["ruleset_id"]
+        self._tenants: Dict[str, Dict[str, Any]] = table["tenants"]
+        self._parts: Dict[Tuple[str, str], _MappedPartition] = {}
+
+    def _partition(self, tenant_id: str, classification: str) -> _MappedPartition:
+        key = (tenant_id, classification)
+        part = self._parts.get(key)
+        if part is None:
+            meta = self._tenants[tenant_id]["partitions"][classification]
+            part = self._parts[key] = _MappedPartition(
+                tenant_id, self._mm, meta, self.ruleset_id
+            )
+        return part
+
+    def _scoped_partitions(
+        self, tenant_id: str, allowed_classifications: Sequence[str]
+    ) -> List[Tuple[str, _MappedPartition]]:
+        tenant = self._tenants.get(tenant_id, {}).get("partitions", {})
+        return [
+            (c, self._partition(tenant_id, c))
+            for c in sorted(set(allowed_classifications))
+            if c in tenant
+        ]
+
+    def put(
+        self, tenant_id: str, classification: str, title: str, body: str
+    ) -> StoredDocument:
+        raise ReadOnlyStoreError("mapped store is read-only")
+
+    def put_many(self, tenant_id: str, items: Sequence[NewDoc]) -> List[StoredDocument]:
+        raise ReadOnlyStoreError("mapped store is read-only")
+
+    def list_scoped(
+        self, tenant_id: str, allowed_classifications: List[str]
+    ) -> List[StoredDocument]:
+        return [
+            part.doc(i, c)
+            for c, part in self._scoped_partitions(tenant_id, allowed_classifications)
+            for i in range(part.doc_count)
+        ]
+
+    def search_scoped(
+        self,
+        tenant_id: str,
+        allowed_classifications: List[str],
+        query: str,
+        limit: Optional[int] = None,
+        after: Optional[RankKey] = None,
+    ) -> List[SearchHit]:
+        return self.scoped(tenant_id, allowed_classifications).search(
+            query, limit, after
+        )
+
+    def scoped(self, tenant_id: str, allowed_classifications: List[str]) -> ScopedView:
+        return _MappedView(self._scoped_partitions(tenant_id, allowed_classifications))
+
+    def generation(
+        self, tenant_id: str, allowed_classifications: List[str]
+    ) -> Tuple[int, ...]:
+        # Contents never change while mapped.
+        tenant = self._tenants.get(tenant_id, {}).get("partitions", {})
+        return tuple(
+            1 if c in tenant else 0 for c in sorted(set(allowed_classifications))
+        )
+
+    def tenant_stats(self, tenant_id: str) -> TenantStats:
+        entry = self._tenants.get(tenant_id)
+        if entry is None:
+            return TenantStats()
+        parts = entry["partitions"].values()
+        doc_count = sum(p["doc_count"] for p in parts)
+        bodies = entry["bodies"]
+        return TenantStats(
+            doc_count=doc_count,
+            bytes=sum(p["bytes"] for p in parts),
+            bodies=BodyStats(
+                body_refs=doc_count,
+                unique_bodies=bodies["unique"],
+                logical_bytes=bodies["logical_bytes"],
+                unique_bytes=bodies["unique_bytes"],
+                stored_bytes=bodies["unique_bytes"],
+            ),
+        )
+
+    def clear(self):
+        raise ReadOnlyStoreError("mapped store is read-only")
+
+    def close(self) -> None:
+        self._parts = {}
+        try:
+            self._mm.close()
+        except BufferError:
+            # Views held by live query objects; unmapped when they are freed.
+            pass
@@ -0,0 +1,101 @@
+import logging
+import time
+import uuid
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.json_logger import request_id_ctx
+
+access_logger = logging.getLogger("app.access")
+
+# Response headers carrying the request id (lowercase, as ASGI requires).
+_ID_HEADERS = (b"x-request-id", b"x-trace-id")
+
+
+def derive_request_id(raw: Optional[str]) -> str:
+    """Prefer a safe upstream X-Request-Id; otherwise generate a UUID4."""
+    # Simple alphanumeric + symbols check to prevent log injection via header
+    raw = (raw or "").strip()
+
+    # CRITICAL FIX: Ensure 'raw' is not empty before returning it.
+    if raw and len(raw) < 64 and all(c.isalnum() or c in "-_." for c in raw):
+        return raw
+
+    return str(uuid.uuid4())
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+class RequestContextMiddleware:
+    """
+    Request ID + access logging as plain ASGI middleware.
+
+    Unlike `@app.middleware("http")` (BaseHTTPMiddleware), this adds no extra
+    task or body-streaming wrapper: headers are injected on the
+    `http.response.start` message and every other message passes straight
+    through, so streaming responses stream.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rid = derive_request_id(_header(scope, b"x-request-id"))
+        rid_header = rid.encode("latin-1")
+
+        # 1. Set ContextVar for correlation in deep calls (e.g. audit logs),
+        #    and request.state.request_id for route handlers.
+        token = request_id_ctx.set(rid)
+        scope.setdefault("state", {})["request_id"] = rid
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_ids(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # ---------------------------------------------------------
+                # TRACE CORRELATION SIGNAL
+                # X-Trace-Id is an alias for client correlation.
+                # ---------------------------------------------------------
+                headers = [
+                    (k, v)
+                    for k, v in message.get("headers", ())
+                    if k.lower() not in _ID_HEADERS
+                ]
+                headers += [(name, rid_header) for name in _ID_HEADERS]
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_ids)
+        finally:
+            duration_ms = int((time.perf_counter() - start) * 1000)
+
+            # 2. Structured Access Log
+            access_logger.info(
+                "request_complete",
+                extra={
+                    "props": {
+                        "event": "request_complete",
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status_code,
+                        "duration_ms": duration_ms,
+                    }
+                },
+            )
+
+            # 3. Cleanup ContextVar
+            request_id_ctx.reset(token)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from typing import Literal
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 
 Classification = Literal["public", "admin"]
 
@@ -25,16 +25,60 @@ class IngestResponse(BaseModel):
     request_id: str
 
 
+MAX_INGEST_BATCH = 100
+
+
+class IngestBatchRequest(BaseModel):
+    documents: List[IngestRequest] = Field(min_length=1, max_length=MAX_INGEST_BATCH)
+
+
+class IngestBatchResponse(BaseModel):
+    doc_ids: List[str]
+    request_id: str
+
+
+MAX_TOP_K = 50
+
+
 class QueryRequest(BaseModel):
     query: str = Field(min_length=1, max_length=300)
+    top_k: int = Field(default=10, ge=1, le=MAX_TOP_K)
+    # Pagination: results per page (defaults to top_k) and the opaque
+    # `next_cursor` of the previous page.
+    page_size: Optional[int] = Field(default=None, ge=1, le=MAX_TOP_K)
+    cursor: Optional[str] = Field(default=None, max_length=512)
+
+
+class Highlight(BaseModel):
+    start: int
+    end: int
 
 
 class QueryResult(BaseModel):
     doc_id: str
     title: str
     snippet: str
+    highlights: List[Highlight] = []  # query-term offsets within `snippet`
 
 
 class QueryResponse(BaseModel):
     request_id: str
     results: List[QueryResult]
+    next_cursor: Optional[str] = None
+
+
+MAX_QUERY_BATCH = 20
+
+
+class QueryBatchRequest(BaseModel):
+    queries: List[QueryRequest] = Field(min_length=1, max_length=MAX_QUERY_BATCH)
+
+
+class QueryBatchResult(BaseModel):
+    results: List[QueryResult]
+    next_cursor: Optional[str] = None
+
+
+class QueryBatchResponse(BaseModel):
+    request_id: str
+    queries: List[QueryBatchResult]  # same order as the request's `queries`
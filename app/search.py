@@ -0,0 +1,180 @@
+from __future__ import annotations
+import bisect
+import heapq
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+from app.security.redact import REPLACEMENT
+
+SNIPPET_CHARS = 160
+SNIPPET_LEAD = 40  # context kept before the first match
+
+# Lexical tokenizer shared by ingest (index build) and query (lookup).
+# \w keeps identifiers like "bravo_only_keyword" as a single term.
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """
+    Lowercased search form of `text`.
+    Length-preserving, so offsets found in it are valid in the original.
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # Rare: a few code points lowercase to several (e.g. "\u0130").
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens in document order."""
+    return TOKEN_PATTERN.findall(normalize(text))
+
+
+def term_frequencies(search_text: str) -> Dict[str, int]:
+    """Token -> occurrence count of an already-normalized text."""
+    return dict(Counter(TOKEN_PATTERN.findall(search_text)))
+
+
+def query_terms(query: str) -> List[str]:
+    """Distinct query tokens, preserving first-seen order."""
+    return list(dict.fromkeys(tokenize(query)))
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a query: queries that rank identically map to it."""
+    return " ".join(query_terms(query))
+
+
+# ------------------------------------------------------------------------------
+# BM25 relevance scoring (Okapi, standard parameters)
+# ------------------------------------------------------------------------------
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def bm25_idf(doc_count: int, doc_freq: int) -> float:
+    """Non-negative BM25 idf (Lucene variant)."""
+    return math.log(1.0 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+
+def bm25_score(
+    tfs: Iterable[int], idfs: Iterable[float], doc_len: int, avg_doc_len: float
+) -> float:
+    """Sum of per-term BM25 contributions for one document."""
+    norm = BM25_K1 * (1.0 - BM25_B + BM25_B * doc_len / (avg_doc_len or 1.0))
+    return sum(idf * tf * (BM25_K1 + 1.0) / (tf + norm) for tf, idf in zip(tfs, idfs))
+
+
+# A scored candidate: a tuple whose first two fields are its rank key
+# (score, -seq), followed by whatever the store needs to load the document.
+Candidate = TypeVar("Candidate", bound=tuple)
+
+
+def top_ranked(
+    scored: Iterable[Candidate],
+    limit: Optional[int],
+    after: Optional[Tuple[float, int]] = None,
+) -> List[Candidate]:
+    """
+    The `limit` best candidates (all if None), best first. With `after`,
+    only candidates ranked strictly below it: keyset resumption skips
+    earlier pages instead of re-projecting them.
+    """
+    if after is not None:
+        scored = [s for s in scored if s[:2] < after]
+    # Partial selection: only the `limit` best hits are ever ordered.
+    key = itemgetter(0, 1)
+    if limit is None:
+        return sorted(scored, key=key, reverse=True)
+    return heapq.nlargest(limit, scored, key=key)
+
+
+# ------------------------------------------------------------------------------
+# Snippets: a bounded window around the first match, masked with redaction
+# spans recorded at ingest (full-body scan), so a secret straddling the window
+# edge is still masked. Only the body up to the first match is scanned, in
+# fixed-size normalized chunks, and only the window is normalized for
+# highlights: per-hit work is O(first match + window), never O(body).
+# ------------------------------------------------------------------------------
+Span = Tuple[int, int]
+
+SCAN_CHUNK = 1024  # first chunk normalized while looking for the first match
+
+
+@lru_cache(maxsize=256)
+def _term_matcher(terms: Tuple[str, ...]) -> re.Pattern:
+    alternation = "|".join(re.escape(t) for t in terms)
+    return re.compile(rf"(?<!\w)(?:{alternation})(?!\w)")
+
+
+def _first_match(body: str, matcher: re.Pattern, longest: int) -> Optional[Span]:
+    """
+    Offsets of the first term match in `body`, normalizing one chunk at a
+    time. Chunks double in size, so a late match costs about one full pass.
+    """
+    a, size = 0, SCAN_CHUNK
+    while a < len(body):
+        # One char of context each side for the word-boundary assertions, and
+        # `longest` past the chunk so a match starting inside it is whole.
+        lo = max(0, a - 1)
+        text = normalize(body[lo : a + size + longest + 1])
+        m = matcher.search(text, a - lo)
+        if m and m.start() + lo < a + size:
+            return m.start() + lo, m.end() + lo
+        a, size = a + size, size * 2
+    return None
+
+
+def make_snippet(
+    body: str, spans: Sequence[Span], terms: Sequence[str]
+) -> Tuple[str, List[Span]]:
+    """
+    Redacted snippet of `body` around the first occurrence of any of `terms`,
+    plus (start, end) highlight offsets of term occurrences in the snippet.
+    """
+    matcher = _term_matcher(tuple(terms)) if terms else None
+    first = _first_match(body, matcher, max(map(len, terms))) if matcher else None
+
+    start = 0
+    if first and first[1] > SNIPPET_CHARS:
+        start = first[0] - SNIPPET_LEAD
+    end = min(len(body), start + SNIPPET_CHARS)
+
+    # Copy the window verbatim except for redaction spans that intersect it.
+    out: List[str] = []
+    verbatim: List[Tuple[int, int, int]] = []  # (body_start, body_end, out_start)
+    pos, out_len = start, 0
+    for s, e in spans[bisect.bisect_right(spans, start, key=itemgetter(1)) :]:
+        if s >= end:
+            break
+        if s > pos:
+            verbatim.append((pos, s, out_len))
+            out.append(body[pos:s])
+            out_len += s - pos
+        out.append(REPLACEMENT)
+        out_len += len(REPLACEMENT)
+        pos = e
+    if pos < end:
+        verbatim.append((pos, end, out_len))
+        out.append(body[pos:end])
+    snippet = "".join(out)[:SNIPPET_CHARS]
+
+    highlights: List[Span] = []
+    if matcher:
+        # The window plus one char each side for the word boundaries.
+        lo = max(0, start - 1)
+        window = normalize(body[lo : end + 1])
+        for vs, ve, out_start in verbatim:
+            for m in matcher.finditer(window, vs - lo):
+                if m.end() + lo > ve:
+                    break
+                hs = out_start + m.start() + lo - vs
+                he = hs + m.end() - m.start()
+                if he <= len(snippet):
+                    highlights.append((hs, he))
+    return snippet, highlights
@@ -1,11 +1,26 @@
 from __future__ import annotations
 import hashlib
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+from app.models import MAX_QUERY_BATCH, MAX_TOP_K
+from app.security.audit_sinks import AuditSink, build_sink
 from app.security.log_safety import AUDIT_ALLOWED_KEYS, SAFE_ID_PATTERN
+from app.settings import (
+    AUDIT_BATCH_SIZE,
+    AUDIT_FILE_PATH,
+    AUDIT_FLUSH_INTERVAL_SECONDS,
+    AUDIT_SINK,
+)
 
 logger = logging.getLogger("app.audit")
 
+_sink: Optional[AuditSink] = None
+
+# Upper bound on list-valued fields (e.g. doc_ids of a batch). Sized so a
+# full /query/batch fits; anything longer is cut and the number of dropped
+# items is recorded as "<key>_truncated", never silently.
+MAX_LIST_ITEMS = MAX_QUERY_BATCH * MAX_TOP_K
+
 
 def sha256_hex(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
@@ -19,6 +34,11 @@ def _sanitize_value(key: str, value: Any) -> Any:
     if isinstance(value, int):
         return value
 
+    if isinstance(value, (list, tuple)):
+        # "doc_ids" items are validated like "doc_id"
+        item_key = key[:-1] if key.endswith("_ids") else key
+        return [_sanitize_value(item_key, v) for v in value[:MAX_LIST_ITEMS]]
+
     s_val = str(value).strip()
 
     # Strict ID validation using the Shared Pattern
@@ -46,8 +66,10 @@ def audit(event: str, **fields: Any) -> None:
                 safe_v = _sanitize_value(k, v)
                 if safe_v is not None:
                     payload[k] = safe_v
+                if isinstance(v, (list, tuple)) and len(v) > MAX_LIST_ITEMS:
+                    payload[f"{k}_truncated"] = len(v) - MAX_LIST_ITEMS
 
-        logger.info("audit_event", extra={"props": payload})
+        get_audit_sink().emit(payload)
 
     except Exception:
         # Never crash the request
@@ -55,3 +77,27 @@ def audit(event: str, **fields: Any) -> None:
             "audit_system_failure",
             extra={"props": {"event": "audit_system_failure", "schema_version": "1.0"}},
         )
+
+
+def get_audit_sink() -> AuditSink:
+    """The active sink, built from AUDIT_SINK on first use."""
+    global _sink
+    if _sink is None:
+        _sink = build_sink(
+            AUDIT_SINK, AUDIT_FILE_PATH, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL_SECONDS
+        )
+    return _sink
+
+
+def set_audit_sink(sink: Optional[AuditSink]) -> Optional[AuditSink]:
+    """Swap the active sink (None = rebuild from settings); returns the old one."""
+    global _sink
+    previous, _sink = _sink, sink
+    return previous
+
+
+def close_audit_sink() -> None:
+    """Flush and close the active sink (on shutdown)."""
+    sink = set_audit_sink(None)
+    if sink is not None:
+        sink.close()
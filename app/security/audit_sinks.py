@@ -0,0 +1,300 @@
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, BinaryIO, Dict, Iterable, List, Tuple
+
+from app.json_logger import format_timestamp, request_id_ctx
+from app.serialization import dumps_bytes
+
+logger = logging.getLogger("app.audit")
+seal_logger = logging.getLogger("app.audit.seal")
+
+# Chain start: the `prev` of the first batch in a file.
+GENESIS_HASH = "0" * 64
+
+# Seal lines are written with this exact prefix, so the verifier can tell
+# them apart from event lines without parsing every event.
+_SEAL_PREFIX = b'{"seal":'
+
+
+class AuditSink(ABC):
+    """Destination for sanitized audit payloads (see audit.audit())."""
+
+    @abstractmethod
+    def emit(self, payload: Dict[str, Any]) -> None:
+        pass
+
+    def flush(self) -> None:
+        """Make everything emitted so far durable."""
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+
+class LoggingSink(AuditSink):
+    """Default: one structured log line per event on the `app.audit` logger."""
+
+    def emit(self, payload: Dict[str, Any]) -> None:
+        logger.info("audit_event", extra={"props": payload})
+
+
+class AuditChainError(ValueError):
+    pass
+
+
+def _batch_digest(prev: str, lines: Iterable[bytes]) -> str:
+    h = hashlib.sha256(prev.encode("ascii") + b"\n")
+    for line in lines:
+        h.update(line)
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+def _chain_tail(f: BinaryIO) -> Tuple[str, int, int]:
+    """
+    (hash, batch number, end offset) of the last complete seal line in `f`,
+    scanning back from the end 64 KiB at a time.
+    """
+    pos = f.seek(0, os.SEEK_END)
+    buf = b""
+    while pos > 0:
+        step = min(64 * 1024, pos)
+        pos -= step
+        f.seek(pos)
+        buf = f.read(step) + buf
+        # A seal starts a line; the first line of `buf` may be cut unless pos == 0.
+        limit = len(buf)
+        while True:
+            at = buf.rfind(b"\n" + _SEAL_PREFIX, 0, limit) + 1
+            if not at and not (pos == 0 and buf.startswith(_SEAL_PREFIX)):
+                break
+            nl = buf.find(b"\n", at)
+            if nl >= 0:
+                try:
+                    seal = json.loads(buf[at:nl])
+                    return seal["seal"], seal["batch"], pos + nl + 1
+                except (ValueError, KeyError):
+                    pass  # not a seal after all; keep looking before it
+            if not at:
+                break
+            limit = at - 1
+    return GENESIS_HASH, 0, 0
+
+
+class BatchedFileSink(AuditSink):
+    """
+    Appends audit events to a local JSONL file in batches.
+
+    Each batch is written with one write() + fsync, followed by a seal line
+    `{"seal": H, "prev": P, "batch": n, "count": k}` where
+    H = sha256(P + "\\n" + the batch's event lines), and P is the previous
+    seal (or GENESIS_HASH). Editing, dropping or reordering any event breaks
+    every later seal. Seals are also logged on `app.audit.seal`, so the chain
+    head is anchored outside the file.
+
+    emit() only queues the event, so it never waits on the disk; a background
+    thread writes full batches of `batch_size` events as soon as they fill,
+    and a partial batch `flush_interval` seconds after its first event.
+    Events stay pending until the write and fsync of their batch succeed; a
+    failed write is cut back off the file and retried on the next pass.
+
+    A crash between a batch's events and its seal leaves unsealed events at
+    the end of the file. On open, complete ones are sealed as a batch marked
+    `"recovered": true` (the mark is logged with the seal, so the external
+    anchor shows it), and a torn final line is moved to `<path>.torn`.
+    """
+
+    def __init__(self, path: str, batch_size: int = 100, flush_interval: float = 1.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # _lock guards the queue only and is never held across I/O; _io_lock
+        # serializes writers (the flusher thread, flush() and close()).
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._pending: List[bytes] = []
+        self._first_at = 0.0
+        self._fd = os.open(path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o666)
+        self._recover_tail()
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._timer = threading.Thread(
+            target=self._flush_periodically, name="audit-sink", daemon=True
+        )
+        self._timer.start()
+
+    def emit(self, payload: Dict[str, Any]) -> None:
+        record = {
+            "timestamp": format_timestamp(time.time()),
+            "request_id": request_id_ctx.get(),
+            **payload,
+        }
+        line = dumps_bytes(record)
+        with self._lock:
+            if not self._pending:
+                self._first_at = time.monotonic()
+            self._pending.append(line)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def flush(self) -> None:
+        self._drain(everything=True)
+
+    def close(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        self._timer.join()
+        self._drain(everything=True)
+        with self._io_lock:
+            os.close(self._fd)
+
+    def _flush_periodically(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval / 2)
+            self._wake.clear()
+            with self._lock:
+                due = time.monotonic() - self._first_at >= self.flush_interval
+            try:
+                self._drain(everything=due)
+            except OSError:
+                # Still pending; retried on the next pass.
+                logger.error(
+                    "audit_flush_failed",
+                    extra={"props": {"event": "audit_flush_failed"}},
+                )
+
+    def _drain(self, everything: bool) -> None:
+        """
+        Write pending events in batches of at most `batch_size`; a trailing
+        partial batch only if `everything`. Events are dequeued only once
+        their batch is on disk, and emit() only appends, so the prefix being
+        written never changes underneath.
+        """
+        with self._io_lock:
+            while True:
+                with self._lock:
+                    lines = self._pending[: self.batch_size]
+                if not lines or (len(lines) < self.batch_size and not everything):
+                    return
+                self._write_batch(lines)
+                with self._lock:
+                    del self._pending[: len(lines)]
+
+    def _recover_tail(self) -> None:
+        with os.fdopen(os.dup(self._fd), "rb") as f:
+            self._prev, self._batch, sealed_end = _chain_tail(f)
+            f.seek(sealed_end)
+            tail = f.read()
+        if not tail:
+            return
+        complete, _, torn = tail.rpartition(b"\n")
+        if torn:
+            with open(self.path + ".torn", "ab") as quarantine:
+                quarantine.write(torn + b"\n")
+            os.ftruncate(self._fd, sealed_end + len(complete) + (1 if complete else 0))
+        if complete:
+            # The lines are already in the file: seal them where they are.
+            lines = [line for line in complete.split(b"\n") if line]
+            self._write_batch(lines, recovered=True)
+
+    def _append(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view) :]
+
+    def _write_batch(self, lines: List[bytes], recovered: bool = False) -> None:
+        # Caller holds self._io_lock (or is __init__).
+        digest = _batch_digest(self._prev, lines)
+        seal = {
+            "seal": digest,
+            "prev": self._prev,
+            "batch": self._batch + 1,
+            "count": len(lines),
+        }
+        if recovered:
+            seal["recovered"] = True
+        start = os.lseek(self._fd, 0, os.SEEK_END)
+        try:
+            if not recovered:
+                self._append(b"".join(line + b"\n" for line in lines))
+            self._append(dumps_bytes(seal) + b"\n")
+            os.fsync(self._fd)
+        except BaseException:
+            # Cut off whatever part of the batch reached the file, so the
+            # retry appends right after the last seal.
+            try:
+                os.ftruncate(self._fd, start)
+            except OSError:
+                pass
+            raise
+        self._batch += 1
+        self._prev = digest
+
+        seal_logger.info(
+            "audit_batch_sealed",
+            extra={"props": {"event": "audit_batch_sealed", **seal}},
+        )
+
+
+def verify_chain(lines: Iterable[bytes]) -> Tuple[int, int, str]:
+    """
+    Check the hash chain of an audit JSONL stream in constant memory.
+    `lines` are raw lines (trailing newline optional). Returns
+    (events, batches, head seal hash); raises AuditChainError at the first
+    broken link or if events follow the last seal. Compare the head with the
+    last seal logged on `app.audit.seal` to detect truncation.
+    """
+    prev = GENESIS_HASH
+    running = hashlib.sha256(prev.encode("ascii") + b"\n")
+    events = batches = count = 0
+    for lineno, raw in enumerate(lines, start=1):
+        line = raw.rstrip(b"\r\n")
+        if not line:
+            continue
+        if not line.startswith(_SEAL_PREFIX):
+            running.update(line + b"\n")
+            count += 1
+            continue
+
+        try:
+            seal = json.loads(line)
+        except ValueError:
+            raise AuditChainError(f"line {lineno}: malformed seal")
+        if seal.get("prev") != prev:
+            raise AuditChainError(f"line {lineno}: seal does not follow the chain")
+        if seal.get("count") != count or seal.get("seal") != running.hexdigest():
+            raise AuditChainError(f"line {lineno}: batch {seal.get('batch')} altered")
+
+        prev = seal["seal"]
+        running = hashlib.sha256(prev.encode("ascii") + b"\n")
+        events += count
+        batches += 1
+        count = 0
+
+    if count:
+        raise AuditChainError(f"{count} event(s) after the last seal")
+    return events, batches, prev
+
+
+AUDIT_SINK_KINDS = ("log", "file")
+
+
+def build_sink(
+    kind: str, path: str, batch_size: int, flush_interval: float
+) -> AuditSink:
+    """Sink for the AUDIT_SINK setting (one of AUDIT_SINK_KINDS)."""
+    if kind == "log":
+        return LoggingSink()
+    if kind == "file":
+        return BatchedFileSink(
+            path, batch_size=batch_size, flush_interval=flush_interval
+        )
+    raise ValueError(f"unknown audit sink {kind!r}")
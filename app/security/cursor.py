@@ -0,0 +1,80 @@
+from __future__ import annotations
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import secrets
+from typing import Iterable, Sequence, Tuple
+
+from app.settings import CURSOR_SIGNING_KEY
+
+# Opaque, tamper-evident pagination cursors.
+# The token carries the keyset position and the scope generation it was
+# ranked under; the MAC also covers a binding (tenant, classification scope,
+# query hash) that is never sent to the client but recomputed from the
+# caller's principal, so a cursor replayed by another tenant/role or for
+# another query fails verification. BM25 scores move with every write to the
+# scope, so a position is only meaningful under the generation it came from:
+# a genuine cursor from an older generation is rejected as stale.
+
+_KEY = (
+    CURSOR_SIGNING_KEY.encode("utf-8")
+    if CURSOR_SIGNING_KEY
+    else secrets.token_bytes(32)
+)
+
+Position = Tuple[float, int]
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class StaleCursor(InvalidCursor):
+    """Authentic cursor, but the scope has been written to since it was issued."""
+
+
+def cursor_binding(
+    tenant_id: str, allowed_classifications: Iterable[str], normalized_query: str
+) -> bytes:
+    query_hash = hashlib.sha256(normalized_query.encode("utf-8")).hexdigest()
+    return json.dumps([tenant_id, sorted(allowed_classifications), query_hash]).encode()
+
+
+def _mac(binding: bytes, body: bytes) -> bytes:
+    return hmac.new(_KEY, binding + b"\x00" + body, hashlib.sha256).digest()
+
+
+def _b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def encode_cursor(binding: bytes, position: Position, generation: Sequence[int]) -> str:
+    body = json.dumps([*position, list(generation)], separators=(",", ":"))
+    body = body.encode("utf-8")
+    return _b64(body) + "." + _b64(_mac(binding, body))
+
+
+def decode_cursor(token: str, binding: bytes, generation: Sequence[int]) -> Position:
+    """
+    Verify `token` against `binding`; raises InvalidCursor on any mismatch,
+    and StaleCursor if it was issued under another scope `generation`.
+    """
+    try:
+        body_b64, mac_b64 = token.split(".")
+        body, mac = _unb64(body_b64), _unb64(mac_b64)
+    except (ValueError, binascii.Error):
+        raise InvalidCursor("malformed cursor")
+
+    if not hmac.compare_digest(mac, _mac(binding, body)):
+        raise InvalidCursor("cursor signature mismatch")
+
+    score, neg_seq, issued = json.loads(body)
+    if issued != list(generation):
+        raise StaleCursor("scope changed since the cursor was issued")
+    return float(score), int(neg_seq)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 import re
+from functools import lru_cache
 from typing import Any
 
 # 1. Audit Log Allowlist (The Authority)
@@ -16,9 +17,14 @@ AUDIT_ALLOWED_KEYS = {
     "reason_code",
     "path",
     "doc_id",
+    "doc_ids",
+    "doc_count",
+    "item_index",
     "classification",
     "results_count",
     "query_sha256",
+    "query_sha256s",
+    "query_count",
     "query_len",
 }
 
@@ -36,7 +42,20 @@ SENSITIVE_VALUE_PATTERNS = [
 ]
 
 
+# Every SENSITIVE_VALUE_PATTERNS match contains one of these literals, so text
+# without any of them is rejected with a substring scan instead of a regex.
+# Keep in sync when adding a value pattern.
+SENSITIVE_VALUE_LITERALS = ("sk_", "ey")
+
+# All value patterns as one alternation: a single scan per string.
+_SENSITIVE_VALUE_SCAN = re.compile(
+    "|".join(p.pattern for p in SENSITIVE_VALUE_PATTERNS)
+)
+
+
+@lru_cache(maxsize=4096)
 def is_sensitive_key(key: str) -> bool:
+    # Log keys come from a small, code-defined vocabulary: decide each once.
     return bool(SENSITIVE_KEY_PATTERN.search(key))
 
 
@@ -45,27 +64,39 @@ def is_sensitive_value(text: str) -> bool:
         return False
     # Cap scan length to prevent ReDoS
     scan_text = text[:2048]
-    return any(p.search(scan_text) for p in SENSITIVE_VALUE_PATTERNS)
+    if not any(lit in scan_text for lit in SENSITIVE_VALUE_LITERALS):
+        return False
+    return _SENSITIVE_VALUE_SCAN.search(scan_text) is not None
 
 
 def scrub_recursive(obj: Any) -> Any:
     """
     Recursively scrubs sensitive data from dicts/lists/strings.
+    Containers are only copied when something in them changed; clean input
+    is returned as-is.
     """
+    if isinstance(obj, str):
+        return "[REDACTED_VALUE]" if is_sensitive_value(obj) else obj
+
     if isinstance(obj, dict):
-        clean = {}
+        clean = None
         for k, v in obj.items():
             if isinstance(k, str) and is_sensitive_key(k):
-                clean[k] = "[REDACTED_KEY]"
+                new_v = "[REDACTED_KEY]"
+            elif v is None or isinstance(v, (bool, int, float)):
                 continue
-            clean[k] = scrub_recursive(v)
-        return clean
+            else:
+                new_v = scrub_recursive(v)
+            if new_v is not v:
+                if clean is None:
+                    clean = dict(obj)
+                clean[k] = new_v
+        return obj if clean is None else clean
 
     if isinstance(obj, list):
-        return [scrub_recursive(i) for i in obj]
-
-    if isinstance(obj, str):
-        if is_sensitive_value(obj):
-            return "[REDACTED_VALUE]"
+        items = [scrub_recursive(i) for i in obj]
+        if all(new is old for new, old in zip(items, obj)):
+            return obj
+        return items
 
     return obj
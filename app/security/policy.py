@@ -1,12 +1,15 @@
 from __future__ import annotations
 
-from typing import Dict, Set
+from typing import Dict, List, Set
 from fastapi import HTTPException
 from app.security.audit import audit
 from app.security.principal import Principal
 
 REASON_CLASSIFICATION_FORBIDDEN = "CLASSIFICATION_FORBIDDEN"
 REASON_ROLE_UNKNOWN = "ROLE_UNKNOWN_FAIL_CLOSED"
+REASON_CURSOR_INVALID = "CURSOR_INVALID"
+REASON_CURSOR_STALE = "CURSOR_STALE"
+REASON_ADMIN_REQUIRED = "ADMIN_ROLE_REQUIRED"
 
 # Explicit Policy Definition (Data-Driven)
 ROLE_POLICY: Dict[str, Set[str]] = {
@@ -24,12 +27,9 @@ def get_allowed_classifications(role: str) -> Set[str]:
     return ROLE_POLICY.get(role, set())
 
 
-def deny(*, principal: Principal, request_id: str, path: str, reason_code: str) -> None:
-    """
-    Centralized deny handler.
-    1. Emits audit-grade deny receipt.
-    2. Raises 403 exception.
-    """
+def _deny_receipt(
+    *, principal: Principal, request_id: str, path: str, reason_code: str, **extra
+) -> None:
     audit(
         "access_denied",
         reason_code=reason_code,
@@ -39,20 +39,66 @@ def deny(*, principal: Principal, request_id: str, path: str, reason_code: str)
         status=403,
         path=path,
         request_id=request_id,
+        **extra,
+    )
+
+
+def deny(*, principal: Principal, request_id: str, path: str, reason_code: str) -> None:
+    """
+    Centralized deny handler.
+    1. Emits audit-grade deny receipt.
+    2. Raises 403 exception.
+    """
+    _deny_receipt(
+        principal=principal, request_id=request_id, path=path, reason_code=reason_code
     )
     raise HTTPException(
         status_code=403, detail={"reason_code": reason_code, "request_id": request_id}
     )
 
 
+def _may_ingest(principal: Principal, classification: str) -> bool:
+    # Phase 3 Rule: Interns (non-admins) may never ingest admin-classified docs.
+    return principal.role == "admin" or classification != "admin"
+
+
 def authorize_ingest(
     *, principal: Principal, classification: str, request_id: str, path: str
 ) -> None:
-    # Phase 3 Rule: Interns (non-admins) may never ingest admin-classified docs.
-    if principal.role != "admin" and classification == "admin":
+    if not _may_ingest(principal, classification):
         deny(
             principal=principal,
             request_id=request_id,
             path=path,
             reason_code=REASON_CLASSIFICATION_FORBIDDEN,
         )
+
+
+def authorize_ingest_batch(
+    *, principal: Principal, classifications: List[str], request_id: str, path: str
+) -> None:
+    """
+    All-or-nothing batch authorization, evaluated before any write.
+    Every forbidden item gets its own deny receipt (with `item_index`), then
+    the whole batch is rejected with 403.
+    """
+    denied = [i for i, c in enumerate(classifications) if not _may_ingest(principal, c)]
+    if not denied:
+        return
+
+    for i in denied:
+        _deny_receipt(
+            principal=principal,
+            request_id=request_id,
+            path=path,
+            reason_code=REASON_CLASSIFICATION_FORBIDDEN,
+            item_index=i,
+        )
+    raise HTTPException(
+        status_code=403,
+        detail={
+            "reason_code": REASON_CLASSIFICATION_FORBIDDEN,
+            "request_id": request_id,
+            "denied_items": denied,
+        },
+    )
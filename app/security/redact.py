@@ -1,15 +1,264 @@
 from __future__ import annotations
+import hashlib
 import re
+import threading
+
+# The first-character guard below reads the pattern parse tree through
+# CPython's internal regex parser (`re._parser`, `sre_parse` before 3.11;
+# CI and the image run 3.12). If it is missing or its shape changes, the
+# guard is simply left out: redaction stays exact, only slower.
+try:
+    from re import _constants as sre, _parser as sre_parse
+except ImportError:  # pragma: no cover - depends on the interpreter
+    try:
+        import sre_constants as sre
+        import sre_parse
+    except ImportError:
+        sre = sre_parse = None
+
+
+class RuleSet(dict):
+    """
+    A dict that counts its mutations, so the compiled engine and the ruleset
+    fingerprint are rebuilt only when the rules change. Change rules in
+    place (item assignment, del, update).
+    """
+
+    version = 0
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.version += 1
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self.version += 1
+
+    def setdefault(self, key, default=None):
+        self.version += 1
+        return super().setdefault(key, default)
+
+    def pop(self, *args):
+        self.version += 1
+        return super().pop(*args)
+
+    def popitem(self):
+        self.version += 1
+        return super().popitem()
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
 
 # Regex patterns for common secrets (simplified for demo)
-PATTERNS = {
-    # AWS Access Key ID (e.g., AKIA...)
-    "AWS_KEY": r"(AKIA[0-9A-Z]{16})",
-    # Stripe Secret Key (e.g., sk_live_...)
-    "STRIPE_SECRET": r"(sk_live_[0-9a-zA-Z]{24})",  # nosec B105
-    # Generic "secret =" pattern
-    "GENERIC_SECRET": r"(?i)(secret|password|token|key)\s*[:=]\s*([^\s]+)",  # nosec B105
-}
+PATTERNS = RuleSet(
+    {
+        # AWS Access Key ID (e.g., AKIA...)
+        "AWS_KEY": r"(AKIA[0-9A-Z]{16})",
+        # Stripe Secret Key (e.g., sk_live_...)
+        "STRIPE_SECRET": r"(sk_live_[0-9a-zA-Z]{24})",  # nosec B105
+        # Generic "secret =" pattern
+        "GENERIC_SECRET": r"(?i)(secret|password|token|key)\s*[:=]\s*([^\s]+)",  # nosec B105
+    }
+)
+
+
+# Cheap literal prefilter: a pattern can only match text that contains at
+# least one of its literals. Patterns without an entry disable the prefilter
+# (the text is always scanned), so adding a rule can never weaken redaction.
+PREFILTER_LITERALS = RuleSet(
+    {
+        "AWS_KEY": ("AKIA",),
+        "STRIPE_SECRET": ("sk_live_",),
+        "GENERIC_SECRET": (":", "="),
+    }
+)
+
+REPLACEMENT = "[REDACTED]"
+
+# Leading global flags such as "(?i)" are only legal at the very start of a
+# regex, so they are rewritten as scoped groups before joining alternatives.
+_GLOBAL_FLAGS = re.compile(r"^\(\?([aiLmsux]+)\)")
+
+
+def _scope_flags(pattern: str) -> str:
+    m = _GLOBAL_FLAGS.match(pattern)
+    if not m:
+        return pattern
+    return f"(?{m.group(1)}:{pattern[m.end() :]})"
+
+
+def _first_chars(pattern: str) -> set[tuple[str, bool]] | None:
+    """
+    (char, ignorecase) pairs a match of `pattern` can start with, or None if
+    that can't be determined (the engine then skips the lookahead).
+    """
+    if sre_parse is None:
+        return None
+    try:
+        parsed = sre_parse.parse(pattern)
+        return _first_of(list(parsed), bool(parsed.state.flags & re.IGNORECASE))
+    except Exception:
+        return None
+
+
+def _first_of(items: list, icase: bool) -> set[tuple[str, bool]] | None:
+    if not items:
+        return None
+    op, av = items[0]
+    if op is sre.LITERAL:
+        return {(chr(av), icase)}
+    if op is sre.IN:
+        chars = set()
+        for item_op, item_av in av:
+            if item_op is sre.LITERAL:
+                chars.add((chr(item_av), icase))
+            elif item_op is sre.RANGE and item_av[1] - item_av[0] < 256:
+                lo, hi = item_av
+                chars.update((chr(c), icase) for c in range(lo, hi + 1))
+            else:
+                return None
+        return chars
+    if op is sre.SUBPATTERN:
+        _, add_flags, del_flags, sub = av
+        if add_flags & re.IGNORECASE:
+            icase = True
+        if del_flags & re.IGNORECASE:
+            icase = False
+        return _first_of(list(sub), icase)
+    if op is sre.BRANCH:
+        chars = set()
+        for alt in av[1]:
+            alt_chars = _first_of(list(alt), icase)
+            if alt_chars is None:
+                return None
+            chars |= alt_chars
+        return chars
+    if op in (sre.MAX_REPEAT, sre.MIN_REPEAT) and av[0] >= 1:
+        return _first_of(list(av[2]), icase)
+    return None
+
+
+def _lookahead(patterns: list[str]) -> str:
+    """
+    A `(?=...)` guard listing every possible first character. It gives the
+    joined alternation the cheap first-character skip that each single-prefix
+    pattern gets on its own. Case-insensitive characters stay under `(?i:)`
+    so Unicode case folding (e.g. U+017F for "s") is preserved exactly.
+    """
+    exact: set[str] = set()
+    folded: set[str] = set()
+    for pattern in patterns:
+        chars = _first_chars(pattern)
+        if chars is None:
+            return ""
+        for c, icase in chars:
+            (folded if icase else exact).add(c)
+
+    classes = []
+    if exact:
+        classes.append("[" + "".join(re.escape(c) for c in sorted(exact)) + "]")
+    if folded:
+        classes.append("(?i:[" + "".join(re.escape(c) for c in sorted(folded)) + "])")
+    return "(?=" + "|".join(classes) + ")"
+
+
+class RedactionEngine:
+    """
+    All patterns compiled into a single alternation with one named group per
+    pattern kind, so each text is scanned once instead of once per pattern.
+    """
+
+    def __init__(self, patterns: dict[str, str], literals: dict[str, tuple]):
+        alternatives = [
+            f"(?P<{kind}>{_scope_flags(pattern)})" for kind, pattern in patterns.items()
+        ]
+        guard = _lookahead(list(patterns.values()))
+        self.regex = re.compile(guard + "(?:" + "|".join(alternatives) + ")")
+        self.literals: tuple[str, ...] | None = None
+        if all(kind in literals for kind in patterns):
+            self.literals = tuple(
+                dict.fromkeys(lit for kind in patterns for lit in literals[kind])
+            )
+
+    def may_match(self, text: str) -> bool:
+        if self.literals is None:
+            return True
+        return any(lit in text for lit in self.literals)
+
+    def redact(self, text: str) -> str:
+        if not self.may_match(text):
+            return text
+        return self.regex.sub(REPLACEMENT, text)
+
+    def spans(self, text: str) -> list[tuple[int, int]]:
+        """(start, end) offsets of every match, in text order."""
+        if not self.may_match(text):
+            return []
+        return [m.span() for m in self.regex.finditer(text)]
+
+    def redact_with_counts(self, text: str) -> tuple[str, dict[str, int]]:
+        counts: dict[str, int] = {}
+        if not self.may_match(text):
+            return text, counts
+
+        def _count(m: re.Match) -> str:
+            counts[m.lastgroup] = counts.get(m.lastgroup, 0) + 1
+            return REPLACEMENT
+
+        return self.regex.sub(_count, text), counts
+
+
+# (rules key, engine, ruleset fingerprint) for the current PATTERNS and
+# PREFILTER_LITERALS; the key changes whenever either is mutated or replaced.
+_current: tuple | None = None
+_build_lock = threading.Lock()
+
+
+def _rules_version(rules: dict) -> object:
+    # A plain dict swapped in has no counter: compare its contents instead.
+    version = getattr(rules, "version", None)
+    return tuple(rules.items()) if version is None else version
+
+
+def _rules_key() -> tuple:
+    return (
+        id(PATTERNS),
+        _rules_version(PATTERNS),
+        id(PREFILTER_LITERALS),
+        _rules_version(PREFILTER_LITERALS),
+    )
+
+
+def _compiled() -> tuple:
+    global _current
+    current, key = _current, _rules_key()
+    if current is None or current[0] != key:
+        with _build_lock:
+            current = _current
+            if current is None or current[0] != key:
+                rules = tuple(PATTERNS.items())
+                fingerprint = hashlib.sha256(repr(rules).encode("utf-8")).hexdigest()
+                current = _current = (
+                    key,
+                    RedactionEngine(dict(rules), dict(PREFILTER_LITERALS)),
+                    fingerprint[:12],
+                )
+    return current
+
+
+def engine() -> RedactionEngine:
+    """Engine for the active PATTERNS (rebuilt only when they change)."""
+    return _compiled()[1]
 
 
 def redact_text(text: str) -> str:
@@ -17,8 +266,26 @@ def redact_text(text: str) -> str:
     Scrub known sensitive patterns from text.
     Replaces matches with [REDACTED].
     """
-    cleaned = text
-    for _, pattern in PATTERNS.items():
-        # Replace the capturing group or the whole match
-        cleaned = re.sub(pattern, "[REDACTED]", cleaned)
-    return cleaned
+    return engine().redact(text)
+
+
+def redact_text_with_counts(text: str) -> tuple[str, dict[str, int]]:
+    """Like redact_text, plus the number of matches per pattern kind."""
+    return engine().redact_with_counts(text)
+
+
+def redaction_spans(text: str) -> list[tuple[int, int]]:
+    """Offsets of every sensitive match, for masking slices of `text` later."""
+    return engine().spans(text)
+
+
+def ruleset_id() -> str:
+    """
+    Short, stable fingerprint of the active PATTERNS.
+    Cached redactions tagged with an older id must be recomputed.
+    """
+    return _compiled()[2]
+
+
+# Compile the default ruleset at import so the first request doesn't pay for it.
+engine()
@@ -0,0 +1,155 @@
+import fcntl
+import logging
+import os
+import threading
+import uuid
+from typing import List, Optional, Sequence, Tuple
+
+from app.durable_store import LogReplayStore
+from app.store import NewDoc, Record, ScopedView, StoredDocument, TenantStats
+from app.wal import WalCorruptionError, decode_record, encode_record, write_all
+
+logger = logging.getLogger("app.store")
+
+# Bytes read per pread() while catching up.
+_READ_CHUNK = 1 << 20
+
+
+class SharedSegmentStore(LogReplayStore):
+    """
+    InMemoryStore shared by every worker process of a deployment through one
+    append-only segment file (WAL record format, see app.wal).
+
+    A write takes an exclusive flock on the file, catches up to its end (so
+    seqs stay global), appends one record and fsyncs. Before every read a
+    worker compares the file size with what it has applied and replays
+    anything new, so all workers serve the same documents; the index itself
+    stays in each worker's memory and reads never wait on other processes.
+    """
+
+    # Reads may first replay new records from the segment file.
+    nonblocking_reads = False
+
+    def __init__(self, path: str, fsync: bool = True):
+        super().__init__()
+        self.path = path
+        self.fsync = fsync
+        self._fd: Optional[int] = None
+        self._offset = 0  # bytes of the file applied so far
+        # flock excludes other processes only; threads of this one take this.
+        self._lock = threading.RLock()
+
+    def recover(self) -> None:
+        with self._lock:
+            if self._fd is None:
+                self._fd = os.open(
+                    self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o600
+                )
+            self._catch_up()
+
+    def _catch_up(self) -> None:
+        """Apply records appended since the last call (caller holds _lock)."""
+        size = os.fstat(self._fd).st_size
+        pending = b""
+        while self._offset + len(pending) < size:
+            chunk = os.pread(
+                self._fd,
+                min(_READ_CHUNK, size - self._offset - len(pending)),
+                self._offset + len(pending),
+            )
+            if not chunk:
+                break
+            data = pending + chunk
+            end = data.rfind(b"\n") + 1
+            # A line without its newline is still being written (or was torn
+            # by a crash; the next writer repairs it). Stop before it.
+            for line in data[:end].splitlines(keepends=True):
+                record = decode_record(line)
+                if record is None:
+                    raise WalCorruptionError(
+                        f"{self.path}: corrupt record at byte {self._offset}"
+                    )
+                self._replay(record)
+                self._offset += len(line)
+            pending = data[end:]
+
+    def _append(self, record: dict) -> None:
+        """Append under the file lock, after catching up; then apply it."""
+        with self._lock:
+            if self._fd is None:
+                self.recover()
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                self._catch_up()
+                size = os.fstat(self._fd).st_size
+                if size > self._offset:
+                    # Torn tail left by a writer that crashed mid-append.
+                    logger.warning(
+                        "segment_torn_tail_dropped",
+                        extra={
+                            "props": {
+                                "event": "segment_torn_tail_dropped",
+                                "bytes": size - self._offset,
+                            }
+                        },
+                    )
+                    os.ftruncate(self._fd, self._offset)
+                if record["op"] == "put":
+                    # Seqs are assigned here, under the lock, so they are
+                    # unique and ordered across processes.
+                    seq = self._max_seq + 1
+                    record["docs"] = [
+                        (doc_id, seq + i, c, title, body)
+                        for i, (doc_id, _, c, title, body) in enumerate(record["docs"])
+                    ]
+                write_all(self._fd, encode_record(record))
+                if self.fsync:
+                    os.fsync(self._fd)
+                self._catch_up()
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def put_many(self, tenant_id: str, items: Sequence[NewDoc]) -> List[StoredDocument]:
+        records: List[Record] = [
+            (str(uuid.uuid4()), 0, classification, title, body)
+            for classification, title, body in items
+        ]
+        self._append({"op": "put", "tenant": tenant_id, "docs": records})
+        tenant = self.partitions[tenant_id]
+        return [tenant[c].get(doc_id) for doc_id, _, c, _, _ in records]
+
+    def _refresh(self) -> None:
+        if self._fd is None:
+            self.recover()
+        elif os.fstat(self._fd).st_size != self._offset:
+            with self._lock:
+                self._catch_up()
+
+    def list_scoped(
+        self, tenant_id: str, allowed_classifications: List[str]
+    ) -> List[StoredDocument]:
+        self._refresh()
+        return super().list_scoped(tenant_id, allowed_classifications)
+
+    def scoped(self, tenant_id: str, allowed_classifications: List[str]) -> ScopedView:
+        self._refresh()
+        return super().scoped(tenant_id, allowed_classifications)
+
+    def generation(
+        self, tenant_id: str, allowed_classifications: List[str]
+    ) -> Tuple[int, ...]:
+        self._refresh()
+        return super().generation(tenant_id, allowed_classifications)
+
+    def tenant_stats(self, tenant_id: str) -> TenantStats:
+        self._refresh()
+        return super().tenant_stats(tenant_id)
+
+    def clear(self) -> None:
+        self._append({"op": "clear"})
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
@@ -0,0 +1,51 @@
+import json
+from typing import Any, Union
+
+from fastapi.responses import JSONResponse
+
+# Optional fast JSON backend: orjson when installed, stdlib json otherwise.
+# Both paths produce equivalent JSON; only speed differs.
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+
+# Hand datetimes/dataclasses to `default=str` like stdlib json does, instead
+# of orjson's native encodings.
+_ORJSON_OPTS = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+    if orjson is not None
+    else 0
+)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Compact UTF-8 JSON; non-JSON values are rendered with str()."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str, option=_ORJSON_OPTS)
+        except TypeError:
+            # e.g. non-str dict keys or ints beyond 64 bits
+            pass
+    return json.dumps(
+        obj, default=str, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def dumps(obj: Any) -> str:
+    return dumps_bytes(obj).decode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered through the optional fast backend."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
@@ -0,0 +1,83 @@
+"""
+Server entry point: `python -m app.serve [--workers N]`.
+
+With one worker this is plain `uvicorn app.main:app`. With several, it binds
+the listening socket itself and hands it to uvicorn's process supervisor:
+uvicorn rebuilds that socket in each worker without the TCP protocol set, so
+asyncio never enables TCP_NODELAY on accepted connections and every
+two-write response (headers, then body) waits ~40 ms on a delayed ACK.
+Setting TCP_NODELAY on the listener, which accepted sockets inherit, avoids
+that.
+"""
+
+import argparse
+import socket
+import sys
+from typing import Optional
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from app.settings import (
+    AUDIT_SINK,
+    CURSOR_SIGNING_KEY,
+    STORE_BACKEND,
+    WEB_WORKERS,
+)
+
+APP = "app.main:app"
+
+
+def multi_worker_error(
+    workers: int, backend: str, cursor_key: str, audit_sink: str
+) -> Optional[str]:
+    """Why this configuration must not run with `workers` processes, if so."""
+    if workers <= 1:
+        return None
+    if backend == "memory":
+        # Each worker would hold (and, with STORE_WAL_DIR, log) its own corpus.
+        return (
+            "STORE_BACKEND='memory' is per-process; use 'shared', 'sqlite' "
+            "or 'mapped' with more than one worker"
+        )
+    if not cursor_key:
+        # A random per-process key: a cursor would only verify on the worker
+        # that issued it.
+        return "CURSOR_SIGNING_KEY must be set with more than one worker"
+    if audit_sink == "file":
+        # Each worker would seal batches onto its own hash chain in the one
+        # AUDIT_FILE_PATH, interleaving them so the chain no longer verifies.
+        return (
+            "AUDIT_SINK='file' keeps one hash chain per process; use "
+            "AUDIT_SINK='log' with more than one worker"
+        )
+    return None
+
+
+def main(argv=None) -> None:
+    ap = argparse.ArgumentParser(prog="python -m app.serve")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--workers", type=int, default=WEB_WORKERS)
+    args = ap.parse_args(argv)
+
+    error = multi_worker_error(
+        args.workers, STORE_BACKEND, CURSOR_SIGNING_KEY, AUDIT_SINK
+    )
+    if error:
+        sys.exit(f"FATAL: {error}")
+
+    # Gateway-owned app.access logs replace uvicorn's access log.
+    config = uvicorn.Config(
+        APP, host=args.host, port=args.port, workers=args.workers, access_log=False
+    )
+    if args.workers <= 1:
+        uvicorn.Server(config).run()
+        return
+    sock = config.bind_socket()
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    Multiprocess(config, target=uvicorn.Server(config).run, sockets=[sock]).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,62 @@ class Settings(BaseSettings):
     AUTH_MODE: str = "jwt"  # Options: "jwt", "headers"
     ALLOW_INSECURE_HEADERS: bool = False
 
+    # HMAC key for /query pagination cursors. Empty = random per process, so
+    # cursors don't survive restarts or cross instances; set it when running
+    # more than one instance.
+    CURSOR_SIGNING_KEY: str = ""
+
+    # Query result cache (per tenant + authorization scope). Sizes are
+    # approximate bytes of cached results; 0 entries disables the cache.
+    QUERY_CACHE_MAX_ENTRIES: int = 1024
+    QUERY_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    QUERY_CACHE_TTL_SECONDS: float = 60.0
+
+    # Async logging: records are written by a background worker through a
+    # bounded queue. When full, access logs are dropped (and counted);
+    # audit events block.
+    LOG_ASYNC: bool = False
+    LOG_QUEUE_SIZE: int = 10000
+
+    # Body storage: bodies of at least this many UTF-8 bytes are stored
+    # zlib-compressed (0 disables), with a per-tenant LRU of decompressed
+    # bodies for hot documents.
+    BODY_COMPRESS_MIN_BYTES: int = 4096
+    BODY_CACHE_ENTRIES: int = 256
+
+    # Audit sink: "log" (one structured stdout line per event) or "file"
+    # (batched, hash-chained JSONL at AUDIT_FILE_PATH; see audit_sinks.py).
+    AUDIT_SINK: str = "log"
+    AUDIT_FILE_PATH: str = "audit.jsonl"
+    AUDIT_BATCH_SIZE: int = 100
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+
+    # Document store: "memory" (process-local, lost on restart), "sqlite"
+    # (persistent file at SQLITE_PATH with an FTS5 index; on Lambda point it
+    # at /tmp or an attached volume) or "mapped" (read-only corpus file at
+    # MAPPED_STORE_PATH, built by scripts/build_mapped_store.py and mmapped
+    # at startup) or "shared" (memory backend kept in step across worker
+    # processes through the append-only segment file at STORE_SEGMENT_PATH).
+    STORE_BACKEND: str = "memory"
+    SQLITE_PATH: str = "gateway.db"
+    MAPPED_STORE_PATH: str = "corpus.gwmap"
+    STORE_SEGMENT_PATH: str = "store.seg"
+
+    # Worker processes started by `python -m app.serve`. More than one needs
+    # a store the workers share (not "memory") and a CURSOR_SIGNING_KEY.
+    WEB_WORKERS: int = 1
+
+    # Worker threads (per event loop) that async routes may occupy at once
+    # for store calls that block and for CPU-heavy ranking and redaction.
+    STORE_EXECUTOR_THREADS: int = 8
+
+    # Durability for the memory backend: when set, every write is appended
+    # to a write-ahead log in this directory (group-committed fsync) and
+    # compacted into a snapshot once the log passes STORE_WAL_COMPACT_BYTES.
+    # Startup recovers the snapshot plus the log tail; reads stay in memory.
+    STORE_WAL_DIR: str = ""
+    STORE_WAL_COMPACT_BYTES: int = 64 * 1024 * 1024
+
     # Pydantic V2: Use model_config instead of class Config
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -21,3 +77,23 @@ ENV = settings.ENV
 LOG_LEVEL = settings.LOG_LEVEL
 AUTH_MODE = settings.AUTH_MODE
 ALLOW_INSECURE_HEADERS = settings.ALLOW_INSECURE_HEADERS
+CURSOR_SIGNING_KEY = settings.CURSOR_SIGNING_KEY
+QUERY_CACHE_MAX_ENTRIES = settings.QUERY_CACHE_MAX_ENTRIES
+QUERY_CACHE_MAX_BYTES = settings.QUERY_CACHE_MAX_BYTES
+QUERY_CACHE_TTL_SECONDS = settings.QUERY_CACHE_TTL_SECONDS
+LOG_ASYNC = settings.LOG_ASYNC
+LOG_QUEUE_SIZE = settings.LOG_QUEUE_SIZE
+BODY_COMPRESS_MIN_BYTES = settings.BODY_COMPRESS_MIN_BYTES
+BODY_CACHE_ENTRIES = settings.BODY_CACHE_ENTRIES
+AUDIT_SINK = settings.AUDIT_SINK
+AUDIT_FILE_PATH = settings.AUDIT_FILE_PATH
+AUDIT_BATCH_SIZE = settings.AUDIT_BATCH_SIZE
+AUDIT_FLUSH_INTERVAL_SECONDS = settings.AUDIT_FLUSH_INTERVAL_SECONDS
+STORE_BACKEND = settings.STORE_BACKEND
+SQLITE_PATH = settings.SQLITE_PATH
+MAPPED_STORE_PATH = settings.MAPPED_STORE_PATH
+STORE_SEGMENT_PATH = settings.STORE_SEGMENT_PATH
+WEB_WORKERS = settings.WEB_WORKERS
+STORE_EXECUTOR_THREADS = settings.STORE_EXECUTOR_THREADS
+STORE_WAL_DIR = settings.STORE_WAL_DIR
+STORE_WAL_COMPACT_BYTES = settings.STORE_WAL_COMPACT_BYTES
@@ -0,0 +1,71 @@
+import asyncio
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class _AsyncCall:
+    __slots__ = ("done", "value", "failed")
+
+    def __init__(self):
+        self.done = asyncio.Event()
+        self.value: Any = None
+        self.failed = False
+
+
+class AsyncSingleFlight:
+    """
+    In-flight deduplication for coroutines on one event loop: concurrent
+    `do()` calls with an equal key await one run of `fn()` and share its
+    result.
+
+    Only successful results are shared. If the leading call raises (or is
+    cancelled), each waiter runs `fn()` itself, so per-request side effects
+    of a failure (e.g. a deny receipt) are never swallowed.
+
+    Coalesced calls are also counted per `partition(key)`.
+    """
+
+    def __init__(self, partition: Callable[[Hashable], Hashable] = lambda key: None):
+        # Only touched from the event loop thread, so no lock.
+        self._calls: Dict[Hashable, _AsyncCall] = {}
+        self._partition = partition
+        self._coalesced: Counter = Counter()
+
+    async def do(
+        self, key: Hashable, fn: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """Returns (result, shared): shared is True if another call computed it."""
+        call = self._calls.get(key)
+        if call is not None:
+            await call.done.wait()
+            if not call.failed:
+                self._coalesced[self._partition(key)] += 1
+                return call.value, True
+            return await fn(), False
+
+        call = self._calls[key] = _AsyncCall()
+        try:
+            call.value = await fn()
+        except BaseException:
+            call.failed = True
+            raise
+        finally:
+            del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+    @property
+    def coalesced(self) -> int:
+        """Calls answered with another call's result."""
+        return sum(self._coalesced.values())
+
+    def coalesced_in(self, partition: Hashable) -> int:
+        """Coalesced calls whose key falls in `partition`."""
+        return self._coalesced[partition]
+
+
+# ------------------------------------------------------------------------------
+# Singleton for the query path
+# ------------------------------------------------------------------------------
+# Keys are app.main.CacheSlot: (cache key, generation), tenant id first.
+QUERY_FLIGHTS = AsyncSingleFlight(partition=lambda slot: slot[0][0])
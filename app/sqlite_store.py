@@ -0,0 +1,487 @@
+from __future__ import annotations
+import hashlib
+import json
+import sqlite3
+import threading
+import uuid
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.body_store import BodyStats
+from app.settings import BODY_COMPRESS_MIN_BYTES
+from app.search import (
+    TOKEN_PATTERN,
+    bm25_idf,
+    bm25_score,
+    normalize,
+    query_terms,
+    top_ranked,
+)
+from app.store import (
+    NewDoc,
+    Projection,
+    RankKey,
+    RetrievalStore,
+    ScopedView,
+    SearchHit,
+    StoredDocument,
+    TenantStats,
+    project_document,
+)
+
+# The FTS index holds the gateway's own token stream (app.search.tokenize),
+# one space-separated token per word, so FTS5 and the BM25 scorer agree on
+# what a term is. The `ascii` tokenizer splits on ASCII separators only and
+# keeps "_" and non-ASCII characters inside tokens; tokens are already
+# lowercase.
+#
+# Term frequencies live in `postings`, keyed (seq, term), so BM25 scores a
+# match from the index alone; bodies are read only for the hits returned.
+#
+# Each FTS row also carries a scope token derived from its
+# (tenant_id, classification), so MATCH itself is restricted to the
+# caller's partitions: out-of-scope postings are skipped inside the index,
+# not fetched and discarded.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    doc_id TEXT NOT NULL UNIQUE,
+    tenant_id TEXT NOT NULL,
+    classification TEXT NOT NULL,
+    title TEXT NOT NULL,
+    body_id INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    ruleset_id TEXT NOT NULL,
+    redacted_title TEXT NOT NULL,
+    spans TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bodies (
+    body_id INTEGER PRIMARY KEY,
+    tenant_id TEXT NOT NULL,
+    digest BLOB NOT NULL,
+    data BLOB NOT NULL,
+    compressed INTEGER NOT NULL,
+    raw_bytes INTEGER NOT NULL,
+    UNIQUE (tenant_id, digest)
+);
+CREATE INDEX IF NOT EXISTS documents_scope
+    ON documents (tenant_id, classification, seq);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5 (
+    scope, terms, content='', tokenize="ascii tokenchars '_'"
+);
+CREATE TABLE IF NOT EXISTS postings (
+    seq INTEGER NOT NULL,
+    term TEXT NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (seq, term)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS partitions (
+    tenant_id TEXT NOT NULL,
+    classification TEXT NOT NULL,
+    doc_count INTEGER NOT NULL,
+    total_length INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    body_bytes INTEGER NOT NULL,
+    generation INTEGER NOT NULL,
+    PRIMARY KEY (tenant_id, classification)
+);
+"""
+
+# Statements are constant strings (the classification list is bound as one
+# JSON parameter), so each connection's statement cache prepares them once.
+_IN_SCOPE = "tenant_id = ? AND classification IN (SELECT value FROM json_each(?))"
+_DOC_IN_SCOPE = (
+    "d.tenant_id = ? AND d.classification IN (SELECT value FROM json_each(?))"
+)
+
+# Bodies are content-addressed per tenant (like app.body_store): a repeated
+# body points at the existing row. Append-only, as documents are.
+_FIND_BODY = "SELECT body_id FROM bodies WHERE tenant_id = ? AND digest = ?"
+_INSERT_BODY = """
+INSERT INTO bodies (tenant_id, digest, data, compressed, raw_bytes)
+VALUES (?, ?, ?, ?, ?)
+"""
+_INSERT_DOC = """
+INSERT INTO documents (doc_id, tenant_id, classification, title, body_id, length,
+                       ruleset_id, redacted_title, spans)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_INSERT_FTS = "INSERT INTO documents_fts (rowid, scope, terms) VALUES (?, ?, ?)"
+_INSERT_POSTING = "INSERT INTO postings (seq, term, tf) VALUES (?, ?, ?)"
+_UPSERT_PARTITION = """
+INSERT INTO partitions (tenant_id, classification, doc_count, total_length,
+                        bytes, body_bytes, generation)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (tenant_id, classification) DO UPDATE SET
+    doc_count = doc_count + excluded.doc_count,
+    total_length = total_length + excluded.total_length,
+    bytes = bytes + excluded.bytes,
+    body_bytes = body_bytes + excluded.body_bytes,
+    generation = excluded.generation
+"""
+_SELECT_DOCS = """
+SELECT d.seq, d.doc_id, d.tenant_id, d.classification, d.title, b.data,
+       b.compressed, d.length, d.ruleset_id, d.redacted_title, d.spans
+FROM documents d
+JOIN bodies b ON b.body_id = d.body_id AND b.tenant_id = d.tenant_id
+"""
+# The f-string queries below only splice in the constant SQL fragments above;
+# every value is a bound parameter.
+_LIST_SCOPED = f"{_SELECT_DOCS} WHERE {_DOC_IN_SCOPE} ORDER BY d.seq"  # nosec B608
+# One row per (matching document, query term): what BM25 needs, no bodies.
+_MATCH_TERM_FREQS = f"""
+SELECT d.seq, d.length, p.term, p.tf
+FROM documents d
+JOIN postings p
+  ON p.seq = d.seq AND p.term IN (SELECT value FROM json_each(?))
+WHERE d.seq IN (SELECT rowid FROM documents_fts WHERE documents_fts MATCH ?)
+  AND {_DOC_IN_SCOPE}
+"""  # nosec B608
+_DOCS_BY_SEQ = f"""
+{_SELECT_DOCS}
+WHERE d.seq IN (SELECT value FROM json_each(?)) AND {_DOC_IN_SCOPE}
+"""  # nosec B608
+_DOC_FREQ = f"""
+SELECT count(*) FROM documents
+WHERE seq IN (SELECT rowid FROM documents_fts WHERE documents_fts MATCH ?)
+  AND {_IN_SCOPE}
+"""  # nosec B608
+_SCOPE_STATS = f"""
+SELECT coalesce(sum(doc_count), 0), coalesce(sum(total_length), 0)
+FROM partitions WHERE {_IN_SCOPE}
+"""  # nosec B608
+_GENERATIONS = f"SELECT classification, generation FROM partitions WHERE {_IN_SCOPE}"  # nosec B608
+_TENANT_STATS = """
+SELECT coalesce(sum(doc_count), 0), coalesce(sum(bytes), 0),
+       coalesce(sum(body_bytes), 0)
+FROM partitions WHERE tenant_id = ?
+"""
+_TENANT_BODIES = """
+SELECT count(*), coalesce(sum(raw_bytes), 0), coalesce(sum(length(data)), 0)
+FROM bodies WHERE tenant_id = ?
+"""
+
+_Row = Tuple[int, str, str, str, str, bytes, int, int, str, str, str]
+
+
+def scope_token(tenant_id: str, classification: str) -> str:
+    """FTS token naming one (tenant_id, classification) partition."""
+    raw = f"{tenant_id}\x00{classification}".encode("utf-8")
+    return "p" + hashlib.sha256(raw).hexdigest()
+
+
+def _scope_filter(tenant_id: str, classifications: Sequence[str]) -> str:
+    tokens = " OR ".join(f'"{scope_token(tenant_id, c)}"' for c in classifications)
+    return f"scope : ({tokens})"
+
+
+def _match_expr(scope: str, terms: Sequence[str]) -> str:
+    # Terms are \w+ tokens, so quoting them needs no escaping.
+    quoted = " AND ".join(f'"{t}"' for t in terms)
+    return f"{scope} AND terms : ({quoted})"
+
+
+def _body_text(row: _Row) -> str:
+    data = zlib.decompress(row[5]) if row[6] else row[5]
+    return data.decode("utf-8")
+
+
+def _to_doc(row: _Row) -> StoredDocument:
+    doc = StoredDocument(*row[1:5], _body_text(row), seq=row[0])
+    doc.length = row[7]
+    doc.projection = Projection(
+        ruleset_id=row[8],
+        title=row[9],
+        spans=tuple(tuple(span) for span in json.loads(row[10])),
+    )
+    return doc
+
+
+class _SQLiteView(ScopedView):
+    def __init__(
+        self, store: "SQLiteStore", tenant_id: str, allowed: Sequence[str]
+    ) -> None:
+        self.store = store
+        self.tenant_id = tenant_id
+        self.allowed = sorted(set(allowed))
+        self._allowed_json = json.dumps(self.allowed)
+        self._scope = _scope_filter(tenant_id, self.allowed)
+        # Scope-only statistics (see ScopedView): FTS5's own bm25() would use
+        # table-wide ones.
+        conn = store._conn()
+        self.doc_count, total_length = conn.execute(
+            _SCOPE_STATS, (tenant_id, self._allowed_json)
+        ).fetchone()
+        self.avg_len = total_length / (self.doc_count or 1)
+        self._idf: Dict[str, float] = {}
+
+    def idf(self, term: str) -> float:
+        if term not in self._idf:
+            (df,) = (
+                self.store._conn()
+                .execute(
+                    _DOC_FREQ,
+                    (
+                        _match_expr(self._scope, [term]),
+                        self.tenant_id,
+                        self._allowed_json,
+                    ),
+                )
+                .fetchone()
+            )
+            self._idf[term] = bm25_idf(self.doc_count, df)
+        return self._idf[term]
+
+    def search(
+        self, query: str, limit: Optional[int] = None, after: Optional[RankKey] = None
+    ) -> List[SearchHit]:
+        terms = tuple(query_terms(query))
+        if not terms or not self.doc_count or not self.allowed:
+            return []
+        idfs = [self.idf(t) for t in terms]
+        conn = self.store._conn()
+        rows = conn.execute(
+            _MATCH_TERM_FREQS,
+            (
+                json.dumps(terms),
+                _match_expr(self._scope, terms),
+                self.tenant_id,
+                self._allowed_json,
+            ),
+        )
+        # {seq: (length, {term: tf})}
+        matches: Dict[int, Tuple[int, Dict[str, int]]] = {}
+        for seq, length, term, tf in rows:
+            matches.setdefault(seq, (length, {}))[1][term] = tf
+
+        scored = [
+            (bm25_score([tfs[t] for t in terms], idfs, length, self.avg_len), -seq)
+            for seq, (length, tfs) in matches.items()
+        ]
+        top = top_ranked(scored, limit, after)
+        if not top:
+            return []
+
+        # Only the returned hits are loaded (and their bodies decompressed).
+        found = {
+            row[0]: row
+            for row in conn.execute(
+                _DOCS_BY_SEQ,
+                (
+                    json.dumps([-neg_seq for _, neg_seq in top]),
+                    self.tenant_id,
+                    self._allowed_json,
+                ),
+            )
+        }
+        return [
+            SearchHit.for_doc(_to_doc(found[-neg_seq]), score) for score, neg_seq in top
+        ]
+
+
+class SQLiteStore(RetrievalStore):
+    """
+    Persistent store on one SQLite file with an FTS5 keyword index.
+
+    Every statement that reads or writes a tenant's documents names
+    tenant_id and classification in its WHERE clause (the FTS match is
+    additionally restricted by scope token); only the test/dev clear()
+    touches all rows. The database runs in WAL mode, so readers
+    never block the single writer; each thread gets its own connection with
+    a prepared-statement cache.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        compress_min_bytes: int = BODY_COMPRESS_MIN_BYTES,
+        cached_statements: int = 128,
+    ):
+        self.path = path
+        self.compress_min_bytes = compress_min_bytes
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit; writes open their own BEGIN IMMEDIATE transaction.
+            # Only the owning thread uses a connection; close() may run on
+            # another one, hence check_same_thread=False.
+            conn = sqlite3.connect(
+                self.path,
+                timeout=5.0,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=self.cached_statements,
+            )
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Close every thread's connection."""
+        with self._lock:
+            conns, self._connections = self._connections, []
+        for conn in conns:
+            conn.close()
+        self._local = threading.local()
+
+    def _ref_body(self, conn: sqlite3.Connection, tenant_id: str, body: str) -> int:
+        raw = body.encode("utf-8")
+        digest = hashlib.sha256(raw).digest()
+        found = conn.execute(_FIND_BODY, (tenant_id, digest)).fetchone()
+        if found is not None:
+            return found[0]
+        data, compressed = raw, 0
+        if self.compress_min_bytes and len(raw) >= self.compress_min_bytes:
+            packed = zlib.compress(raw)
+            if len(packed) < len(raw):
+                data, compressed = packed, 1
+        return conn.execute(
+            _INSERT_BODY, (tenant_id, digest, data, compressed, len(raw))
+        ).lastrowid
+
+    def put(
+        self, tenant_id: str, classification: str, title: str, body: str
+    ) -> StoredDocument:
+        return self.put_many(tenant_id, [(classification, title, body)])[0]
+
+    def put_many(self, tenant_id: str, items: Sequence[NewDoc]) -> List[StoredDocument]:
+        # One transaction per batch: documents, their FTS rows and the
+        # partition counters become visible together.
+        conn = self._conn()
+        docs: List[StoredDocument] = []
+        # {classification: [docs, total_length, bytes, body_bytes]}
+        touched: Dict[str, List[int]] = {}
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for classification, title, body in items:
+                tokens = TOKEN_PATTERN.findall(normalize(body))
+                proj = project_document(title, body)
+                doc = StoredDocument(
+                    str(uuid.uuid4()), tenant_id, classification, title, body
+                )
+                doc.length = len(tokens)
+                doc.projection = proj
+                doc.seq = conn.execute(
+                    _INSERT_DOC,
+                    (
+                        doc.doc_id,
+                        tenant_id,
+                        classification,
+                        title,
+                        self._ref_body(conn, tenant_id, body),
+                        doc.length,
+                        proj.ruleset_id,
+                        proj.title,
+                        json.dumps(proj.spans),
+                    ),
+                ).lastrowid
+                conn.execute(
+                    _INSERT_FTS,
+                    (doc.seq, scope_token(tenant_id, classification), " ".join(tokens)),
+                )
+                conn.executemany(
+                    _INSERT_POSTING,
+                    ((doc.seq, term, tf) for term, tf in Counter(tokens).items()),
+                )
+                body_bytes = len(body.encode("utf-8"))
+                part = touched.setdefault(classification, [0, 0, 0, 0])
+                part[0] += 1
+                part[1] += doc.length
+                part[2] += len(title.encode("utf-8")) + body_bytes
+                part[3] += body_bytes
+                docs.append(doc)
+
+            # The batch's last seq is the new generation of every partition
+            # it wrote to; AUTOINCREMENT never reuses one, even after clear().
+            generation = docs[-1].seq if docs else 0
+            for classification, (n, length, size, body_bytes) in touched.items():
+                conn.execute(
+                    _UPSERT_PARTITION,
+                    (
+                        tenant_id,
+                        classification,
+                        n,
+                        length,
+                        size,
+                        body_bytes,
+                        generation,
+                    ),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return docs
+
+    def list_scoped(
+        self, tenant_id: str, allowed_classifications: List[str]
+    ) -> List[StoredDocument]:
+        rows = self._conn().execute(
+            _LIST_SCOPED, (tenant_id, json.dumps(sorted(set(allowed_classifications))))
+        )
+        return [_to_doc(row) for row in rows]
+
+    def search_scoped(
+        self,
+        tenant_id: str,
+        allowed_classifications: List[str],
+        query: str,
+        limit: Optional[int] = None,
+        after: Optional[RankKey] = None,
+    ) -> List[SearchHit]:
+        view = self.scoped(tenant_id, allowed_classifications)
+        return view.search(query, limit, after)
+
+    def scoped(self, tenant_id: str, allowed_classifications: List[str]) -> ScopedView:
+        return _SQLiteView(self, tenant_id, allowed_classifications)
+
+    def generation(
+        self, tenant_id: str, allowed_classifications: List[str]
+    ) -> Tuple[int, ...]:
+        allowed = sorted(set(allowed_classifications))
+        found = dict(
+            self._conn().execute(_GENERATIONS, (tenant_id, json.dumps(allowed)))
+        )
+        return tuple(found.get(c, 0) for c in allowed)
+
+    def tenant_stats(self, tenant_id: str) -> TenantStats:
+        conn = self._conn()
+        n, size, body_bytes = conn.execute(_TENANT_STATS, (tenant_id,)).fetchone()
+        unique, unique_bytes, stored_bytes = conn.execute(
+            _TENANT_BODIES, (tenant_id,)
+        ).fetchone()
+        bodies = BodyStats(
+            body_refs=n,
+            unique_bodies=unique,
+            logical_bytes=body_bytes,
+            unique_bytes=unique_bytes,
+            stored_bytes=stored_bytes,
+        )
+        return TenantStats(doc_count=n, bytes=size, bodies=bodies)
+
+    def clear(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM documents")
+            conn.execute("DELETE FROM bodies")
+            conn.execute("DELETE FROM partitions")
+            conn.execute("DELETE FROM postings")
+            conn.execute(
+                "INSERT INTO documents_fts (documents_fts) VALUES ('delete-all')"
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
@@ -1,7 +1,220 @@
 from abc import ABC, abstractmethod
-from typing import List
+from dataclasses import dataclass, replace
+import itertools
+import sys
+import threading
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, get_args
 import uuid
-from app.models import Document
+from app.body_store import BodyRef, BodyStats, BodyStore, body_text
+from app.models import Classification, Document
+from app.search import (
+    bm25_idf,
+    bm25_score,
+    normalize,
+    query_terms,
+    term_frequencies,
+    top_ranked,
+)
+from app.security.redact import redact_text, redaction_spans, ruleset_id
+from app.settings import (
+    MAPPED_STORE_PATH,
+    SQLITE_PATH,
+    STORE_BACKEND,
+    STORE_SEGMENT_PATH,
+    STORE_WAL_DIR,
+)
+
+
+# (classification, title, body) of a document to ingest
+NewDoc = Tuple[str, str, str]
+
+# (doc_id, seq, classification, title, body): a document with its identity
+# assigned, as written to (and replayed from) durable storage
+Record = Tuple[str, int, str, str, str]
+
+
+class ReadOnlyStoreError(RuntimeError):
+    """A write was attempted on a store that serves a read-only corpus."""
+
+
+@dataclass(frozen=True)
+class TenantStats:
+    doc_count: int = 0
+    bytes: int = 0  # UTF-8 size of titles + bodies
+    bodies: BodyStats = BodyStats()  # dedup / compression of stored bodies
+
+
+@dataclass(frozen=True)
+class Projection:
+    """
+    Query-independent views of a document, computed once at ingest.
+    Tagged with the redaction ruleset that produced them, so a rules change
+    invalidates them lazily instead of serving stale redactions.
+    """
+
+    ruleset_id: str
+    title: str  # redacted
+    spans: Tuple[Tuple[int, int], ...]  # redaction spans over the full body
+
+
+# Classification names seen so far; documents store an index into this list.
+# Stores build documents on executor threads, so first-seen names are
+# registered under a lock (lookups of known names take none: a name enters
+# the dict only after its list slot exists). The API's own classifications
+# are registered at import.
+_CLASSIFICATIONS: List[str] = []
+_CLASSIFICATION_CODES: Dict[str, int] = {}
+_CLASSIFICATIONS_LOCK = threading.Lock()
+
+
+def _classification_code(name: str) -> int:
+    code = _CLASSIFICATION_CODES.get(name)
+    if code is None:
+        with _CLASSIFICATIONS_LOCK:
+            code = _CLASSIFICATION_CODES.get(name)
+            if code is None:
+                code = len(_CLASSIFICATIONS)
+                _CLASSIFICATIONS.append(sys.intern(name))
+                _CLASSIFICATION_CODES[_CLASSIFICATIONS[code]] = code
+    return code
+
+
+for _name in get_args(Classification):
+    _classification_code(_name)
+
+
+class StoredDocument:
+    """
+    The store's internal form of a document: a slotted record with interned
+    tenant id and an integer classification code, plus its index metadata.
+    Validation happens once, on the API model at ingest; the HTTP layer reads
+    the same attribute names (or calls to_model()).
+    The body is a BodyRef shared through the tenant's BodyStore.
+    """
+
+    __slots__ = (
+        "doc_id",
+        "tenant_id",
+        "class_code",
+        "title",
+        "_body",
+        "seq",
+        "length",
+        "projection",
+    )
+
+    def __init__(
+        self,
+        doc_id: str,
+        tenant_id: str,
+        classification: str,
+        title: str,
+        body: BodyRef,
+        seq: int = 0,
+    ):
+        self.doc_id = doc_id
+        self.tenant_id = sys.intern(tenant_id)
+        self.class_code = _classification_code(classification)
+        self.title = title
+        self._body = body
+        self.seq = seq  # store insertion sequence, the rank tiebreak
+        self.length = 0  # token count, for BM25 length normalization
+        self.projection: Optional[Projection] = None
+
+    @property
+    def classification(self) -> str:
+        return _CLASSIFICATIONS[self.class_code]
+
+    @property
+    def body(self) -> str:
+        return body_text(self._body)
+
+    def to_model(self) -> Document:
+        return Document(
+            doc_id=self.doc_id,
+            tenant_id=self.tenant_id,
+            classification=self.classification,
+            title=self.title,
+            body=self.body,
+        )
+
+
+def project_document(title: str, body: str) -> Projection:
+    # Spans come from a scan of the whole body, so a snippet window cut later
+    # still masks a secret that straddles its edge.
+    return Projection(
+        ruleset_id=ruleset_id(),
+        title=redact_text(title),
+        spans=tuple(redaction_spans(body)),
+    )
+
+
+def current_projection(doc: StoredDocument) -> Projection:
+    """Cached projection, recomputed if the redaction rules changed."""
+    proj = doc.projection
+    if proj is None or proj.ruleset_id != ruleset_id():
+        proj = doc.projection = project_document(doc.title, doc.body)
+    return proj
+
+
+# Position of a hit in the ranking, (score, -insertion_seq): results are
+# ordered by this key descending, which makes it a stable keyset cursor.
+RankKey = Tuple[float, int]
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    doc: StoredDocument
+    score: float
+    projection: Projection
+    seq: int  # store insertion sequence, the rank tiebreak
+
+    @property
+    def rank_key(self) -> RankKey:
+        return (self.score, -self.seq)
+
+    @classmethod
+    def for_doc(cls, doc: StoredDocument, score: float) -> "SearchHit":
+        """Hit carrying `doc`'s projection under the current ruleset."""
+        return cls(
+            doc=doc, score=score, projection=current_projection(doc), seq=doc.seq
+        )
+
+
+class ScopedView(ABC):
+    """
+    Read handle bound to one already-authorized (tenant_id, classifications)
+    scope. Several queries can run against one view and share its scope
+    resolution and collection statistics. Those statistics (document count,
+    average length, document frequencies) come from the in-scope partitions
+    only, so a score never reflects documents the caller is not allowed to
+    see.
+    """
+
+    @abstractmethod
+    def search(
+        self, query: str, limit: Optional[int] = None, after: Optional[RankKey] = None
+    ) -> List[SearchHit]:
+        """Best hits first; with `after`, only hits ranked strictly below it."""
+        pass
+
+
+class _DelegatingView(ScopedView):
+    """Fallback view for stores without shared per-scope state."""
+
+    def __init__(
+        self, store: "RetrievalStore", tenant_id: str, allowed: List[str]
+    ) -> None:
+        self.store = store
+        self.tenant_id = tenant_id
+        self.allowed = allowed
+
+    def search(
+        self, query: str, limit: Optional[int] = None, after: Optional[RankKey] = None
+    ) -> List[SearchHit]:
+        return self.store.search_scoped(
+            self.tenant_id, self.allowed, query, limit, after
+        )
 
 
 # ------------------------------------------------------------------------------
@@ -10,17 +223,28 @@ from app.models import Document
 # This proves to the reviewer: "I designed this to be swappable for Qdrant/Pinecone."
 # ------------------------------------------------------------------------------
 class RetrievalStore(ABC):
+    # True if scoped(), generation() and tenant_stats() never block on I/O,
+    # so async callers may run them on the event loop (see app.async_store).
+    nonblocking_reads = False
+
     @abstractmethod
     def put(
         self, tenant_id: str, classification: str, title: str, body: str
-    ) -> Document:
+    ) -> StoredDocument:
         """Persist a document with security metadata."""
         pass
 
+    def put_many(self, tenant_id: str, items: Sequence[NewDoc]) -> List[StoredDocument]:
+        """
+        Persist several documents for one tenant. Items are
+        (classification, title, body); authorization happens before this call.
+        """
+        return [self.put(tenant_id, c, title, body) for c, title, body in items]
+
     @abstractmethod
     def list_scoped(
         self, tenant_id: str, allowed_classifications: List[str]
-    ) -> List[Document]:
+    ) -> List[StoredDocument]:
         """
         Retrieve documents enforcing tenant isolation and classification scope.
 
@@ -30,51 +254,402 @@ class RetrievalStore(ABC):
         """
         pass
 
+    @abstractmethod
+    def search_scoped(
+        self,
+        tenant_id: str,
+        allowed_classifications: List[str],
+        query: str,
+        limit: Optional[int] = None,
+        after: Optional[RankKey] = None,
+    ) -> List[SearchHit]:
+        """
+        Keyword search constrained to the tenant/classification scope.
+
+        Returns at most `limit` hits, best BM25 score first, resuming below
+        the `after` rank key when paginating. The scope is
+        applied inside the store, before any document body is read, so callers
+        can never observe out-of-scope matches (or their term statistics).
+        """
+        pass
+
+    def scoped(self, tenant_id: str, allowed_classifications: List[str]) -> ScopedView:
+        """A view restricted to the given scope, for running several queries."""
+        return _DelegatingView(self, tenant_id, list(allowed_classifications))
+
+    @abstractmethod
+    def generation(
+        self, tenant_id: str, allowed_classifications: List[str]
+    ) -> Tuple[int, ...]:
+        """
+        Change token for a scope: it differs after any write into one of the
+        scope's (tenant_id, classification) partitions. Used to invalidate
+        cached query results.
+        """
+        pass
+
+    @abstractmethod
+    def tenant_stats(self, tenant_id: str) -> TenantStats:
+        """Document count and stored bytes for one tenant."""
+        pass
+
     @abstractmethod
     def clear(self):
         """Reset state (Test/Dev only)."""
         pass
 
+    def recover(self) -> None:
+        """Load persisted state before serving requests (called at startup)."""
+        pass
+
+    def close(self) -> None:
+        """Make every write durable and release resources (at shutdown)."""
+        pass
+
 
 # ------------------------------------------------------------------------------
 # The Implementation: In-Memory Adapter
 # ------------------------------------------------------------------------------
+# Postings: {token: {doc_id: term_frequency}}
+Postings = Dict[str, Dict[str, int]]
+
+# (doc, its term frequencies, bytes it adds): one document ready to index
+_Entry = Tuple[StoredDocument, Dict[str, int], int]
+
+
+def _prepare(doc: StoredDocument, body: str) -> _Entry:
+    """Project and tokenize `doc` (whose body is `body`) for indexing."""
+    size = len(doc.title.encode("utf-8")) + len(body.encode("utf-8"))
+    # Restored documents may arrive with their projection precomputed.
+    if doc.projection is None or doc.projection.ruleset_id != ruleset_id():
+        doc.projection = project_document(doc.title, body)
+    tfs = term_frequencies(normalize(body))
+    doc.length = sum(tfs.values())
+    return doc, tfs, size
+
+
+class _Segment:
+    """Documents plus their postings; never modified once published."""
+
+    __slots__ = ("docs", "postings")
+
+    def __init__(self, docs: Dict[str, StoredDocument], postings: Postings):
+        self.docs = docs
+        self.postings = postings
+
+    @classmethod
+    def build(cls, entries: Sequence[_Entry]) -> "_Segment":
+        docs: Dict[str, StoredDocument] = {}
+        postings: Postings = {}
+        for doc, tfs, _ in entries:
+            docs[doc.doc_id] = doc
+            doc_id = doc.doc_id
+            for token, tf in tfs.items():
+                # get() first: setdefault(token, {}) would build a dict per token.
+                plist = postings.get(token)
+                if plist is None:
+                    plist = postings[token] = {}
+                plist[doc_id] = tf
+        return cls(docs, postings)
+
+    def merge(self, newer: "_Segment") -> "_Segment":
+        """A new segment holding both; postings lists only `newer` lacks are shared."""
+        postings = dict(self.postings)
+        for token, plist in newer.postings.items():
+            older = postings.get(token)
+            postings[token] = {**older, **plist} if older else plist
+        return _Segment({**self.docs, **newer.docs}, postings)
+
+
+class _Partition:
+    """
+    All documents of one (tenant_id, classification) pair plus their index.
+
+    Copy-on-write: a published partition is never modified. A write builds
+    the next one (see with_entries) and the store swaps it in, so readers
+    take no lock and always see a whole batch or none of it. The documents
+    live in immutable segments, one per write batch, with equal-sized tails
+    merged like a binary counter: at most log2(n) segments, and each
+    document is copied O(log n) times over its life, never O(n) per write.
+    """
+
+    __slots__ = ("segments", "doc_count", "bytes", "total_length", "generation")
+
+    def __init__(
+        self,
+        segments: Tuple[_Segment, ...] = (),
+        doc_count: int = 0,
+        bytes: int = 0,
+        total_length: int = 0,
+        generation: int = 0,
+    ):
+        self.segments = segments
+        self.doc_count = doc_count
+        self.bytes = bytes
+        self.total_length = total_length  # sum of token counts, for BM25 avgdl
+        self.generation = generation  # store-wide write counter value of the last write
+
+    def with_entries(self, entries: Sequence[_Entry], generation: int) -> "_Partition":
+        """The partition after adding `entries`; self is left untouched."""
+        segments = list(self.segments)
+        segment = _Segment.build(entries)
+        while segments and len(segments[-1].docs) <= len(segment.docs):
+            segment = segments.pop().merge(segment)
+        segments.append(segment)
+        return _Partition(
+            tuple(segments),
+            self.doc_count + len(entries),
+            self.bytes + sum(size for _, _, size in entries),
+            self.total_length + sum(doc.length for doc, _, _ in entries),
+            generation,
+        )
+
+    def get(self, doc_id: str) -> Optional[StoredDocument]:
+        for segment in self.segments:
+            doc = segment.docs.get(doc_id)
+            if doc is not None:
+                return doc
+        return None
+
+    def iter_docs(self) -> Iterator[StoredDocument]:
+        """Every document, in insertion order."""
+        for segment in self.segments:
+            yield from segment.docs.values()
+
+    def merged(self) -> _Segment:
+        """The whole partition as one segment (O(n); for export, not queries)."""
+        merged = _Segment({}, {})
+        for segment in self.segments:
+            merged = merged.merge(segment)
+        return merged
+
+
+# (score, -seq, doc): ordering on the first two keeps ties in insertion order.
+_Scored = Tuple[float, int, StoredDocument]
+
+
+class _InMemoryView(ScopedView):
+    def __init__(self, parts: List[_Partition]):
+        # Partitions are immutable, so holding them pins a consistent snapshot
+        # for every search on this view.
+        self.segments = [s for p in parts for s in p.segments]
+        self.doc_count = sum(p.doc_count for p in parts)
+        self.avg_len = sum(p.total_length for p in parts) / (self.doc_count or 1)
+        self._idf: Dict[str, float] = {}
+        self._matches: Dict[Tuple[str, ...], List[_Scored]] = {}
+
+    def idf(self, term: str) -> float:
+        if term not in self._idf:
+            df = sum(len(s.postings.get(term, ())) for s in self.segments)
+            self._idf[term] = bm25_idf(self.doc_count, df)
+        return self._idf[term]
+
+    def _match(self, terms: Tuple[str, ...]) -> List[_Scored]:
+        if terms in self._matches:
+            return self._matches[terms]
+
+        idfs = [self.idf(t) for t in terms]
+        scored: List[_Scored] = []
+        for segment in self.segments:
+            # Conjunctive match: intersect starting from the rarest term so the
+            # work is bounded by the shortest postings list. A document and
+            # all of its postings live in the same segment.
+            lists = [segment.postings.get(t) for t in terms]
+            if not all(lists):
+                continue
+            rarest = min(lists, key=len)
+
+            for doc_id in rarest:
+                if all(doc_id in other for other in lists):
+                    doc = segment.docs[doc_id]
+                    tfs = [other[doc_id] for other in lists]
+                    score = bm25_score(tfs, idfs, doc.length, self.avg_len)
+                    scored.append((score, -doc.seq, doc))
+
+        self._matches[terms] = scored
+        return scored
+
+    def search(
+        self, query: str, limit: Optional[int] = None, after: Optional[RankKey] = None
+    ) -> List[SearchHit]:
+        terms = tuple(query_terms(query))
+        if not terms or not self.doc_count:
+            return []
+        top = top_ranked(self._match(terms), limit, after)
+        return [SearchHit.for_doc(doc, score) for score, _, doc in top]
+
+
 class InMemoryStore(RetrievalStore):
+    nonblocking_reads = True
+
     def __init__(self):
-        self.db = {}  # {doc_id: Document}
+        # Physical layout: {tenant_id: {classification: _Partition}}.
+        # A scoped read only ever walks the partitions it is allowed to see;
+        # other tenants' documents are not even iterated to be rejected.
+        self.partitions: Dict[str, Dict[str, _Partition]] = {}
+        self.stats: Dict[str, TenantStats] = {}
+        # Bodies are deduplicated per tenant, never across tenants.
+        self.bodies: Dict[str, BodyStore] = {}
+        self._seq = itertools.count()  # insertion order, used as a rank tiebreak
+        # Never reset (not even by clear()), so a generation token is never
+        # reused for different contents.
+        self._generations = itertools.count(1)
+        # Serializes writers. Readers take no lock: writes publish new
+        # partition objects instead of mutating ones a reader may hold.
+        self._publish_lock = threading.Lock()
+
+    def _scoped_partitions(
+        self, tenant_id: str, allowed_classifications: List[str]
+    ) -> List[_Partition]:
+        tenant = self.partitions.get(tenant_id, {})
+        return [tenant[c] for c in sorted(set(allowed_classifications)) if c in tenant]
 
     def put(
         self, tenant_id: str, classification: str, title: str, body: str
-    ) -> Document:
-        doc_id = str(uuid.uuid4())
-        doc = Document(
-            doc_id=doc_id,
-            tenant_id=tenant_id,
-            classification=classification,
-            title=title,
-            body=body,
-        )
-        self.db[doc_id] = doc
-        return doc
+    ) -> StoredDocument:
+        return self.put_many(tenant_id, [(classification, title, body)])[0]
+
+    def put_many(self, tenant_id: str, items: Sequence[NewDoc]) -> List[StoredDocument]:
+        return self._apply(tenant_id, self._new_records(items))
+
+    def _new_records(self, items: Sequence[NewDoc]) -> List[Record]:
+        return [
+            (str(uuid.uuid4()), next(self._seq), classification, title, body)
+            for classification, title, body in items
+        ]
+
+    def _apply(
+        self,
+        tenant_id: str,
+        records: Sequence[Record],
+        projections: Optional[Sequence[Projection]] = None,
+    ) -> List[StoredDocument]:
+        # One pass: each doc is projected and tokenized, then every touched
+        # partition is rebuilt once for the whole batch. The tenant's
+        # partition map is replaced, not mutated, so a reader sees the batch
+        # in all of its partitions or in none.
+        with self._publish_lock:
+            tenant = dict(self.partitions.get(tenant_id, {}))
+            bodies = self.bodies.setdefault(tenant_id, BodyStore())
+            docs: List[StoredDocument] = []
+            batches: Dict[str, List[_Entry]] = {}
+            for i, (doc_id, seq, classification, title, body) in enumerate(records):
+                doc = StoredDocument(
+                    doc_id=doc_id,
+                    tenant_id=tenant_id,
+                    classification=classification,
+                    title=title,
+                    body=bodies.add(body),
+                    seq=seq,
+                )
+                if projections is not None:
+                    doc.projection = projections[i]
+                batches.setdefault(doc.classification, []).append(_prepare(doc, body))
+                docs.append(doc)
+
+            generation = next(self._generations)
+            added = 0
+            for classification, entries in batches.items():
+                part = tenant.get(classification) or _Partition()
+                tenant[classification] = part.with_entries(entries, generation)
+                added += tenant[classification].bytes - part.bytes
+            self.partitions[tenant_id] = tenant
+
+            prev = self.stats.get(tenant_id, TenantStats())
+            self.stats[tenant_id] = TenantStats(
+                doc_count=prev.doc_count + len(docs), bytes=prev.bytes + added
+            )
+        return docs
 
     def list_scoped(
         self, tenant_id: str, allowed_classifications: List[str]
-    ) -> List[Document]:
+    ) -> List[StoredDocument]:
         # The "Sad Path" Defense:
         # We enforce filtering at the storage layer, ensuring no leakage even if
         # the upper layers fail to validate.
         return [
             d
-            for d in self.db.values()
-            if d.tenant_id == tenant_id and d.classification in allowed_classifications
+            for part in self._scoped_partitions(tenant_id, allowed_classifications)
+            for d in part.iter_docs()
         ]
 
+    def search_scoped(
+        self,
+        tenant_id: str,
+        allowed_classifications: List[str],
+        query: str,
+        limit: Optional[int] = None,
+        after: Optional[RankKey] = None,
+    ) -> List[SearchHit]:
+        view = self.scoped(tenant_id, allowed_classifications)
+        return view.search(query, limit, after)
+
+    def scoped(self, tenant_id: str, allowed_classifications: List[str]) -> ScopedView:
+        return _InMemoryView(
+            self._scoped_partitions(tenant_id, allowed_classifications)
+        )
+
+    def generation(
+        self, tenant_id: str, allowed_classifications: List[str]
+    ) -> Tuple[int, ...]:
+        tenant = self.partitions.get(tenant_id, {})
+        return tuple(
+            tenant[c].generation if c in tenant else 0
+            for c in sorted(set(allowed_classifications))
+        )
+
+    def tenant_stats(self, tenant_id: str) -> TenantStats:
+        stats = self.stats.get(tenant_id, TenantStats())
+        if tenant_id in self.bodies:
+            stats = replace(stats, bodies=self.bodies[tenant_id].stats())
+        return stats
+
     def clear(self):
-        self.db = {}
+        with self._publish_lock:
+            self.partitions = {}
+            self.stats = {}
+            self.bodies = {}
 
 
 # ------------------------------------------------------------------------------
 # Factory / Singleton
 # In production, this would be: if settings.USE_QDRANT: STORE = QdrantStore()
 # ------------------------------------------------------------------------------
-STORE = InMemoryStore()
+STORE_BACKENDS = ("memory", "sqlite", "mapped", "shared")
+
+
+def build_store(
+    backend: str,
+    sqlite_path: str = "",
+    wal_dir: str = "",
+    mapped_path: str = "",
+    segment_path: str = "",
+) -> RetrievalStore:
+    """
+    Store for the STORE_BACKEND setting (one of STORE_BACKENDS). With a
+    `wal_dir`, the memory backend logs every write there and recovers from it.
+    """
+    if backend == "memory":
+        if wal_dir:
+            from app.durable_store import DurableInMemoryStore
+
+            return DurableInMemoryStore(wal_dir)
+        return InMemoryStore()
+    if backend == "sqlite":
+        from app.sqlite_store import SQLiteStore
+
+        return SQLiteStore(sqlite_path)
+    if backend == "mapped":
+        from app.mapped_store import MappedStore
+
+        return MappedStore(mapped_path)
+    if backend == "shared":
+        from app.segment_store import SharedSegmentStore
+
+        return SharedSegmentStore(segment_path)
+    raise ValueError(f"unknown store backend {backend!r}")
+
+
+STORE = build_store(
+    STORE_BACKEND, SQLITE_PATH, STORE_WAL_DIR, MAPPED_STORE_PATH, STORE_SEGMENT_PATH
+)
@@ -0,0 +1,243 @@
+from __future__ import annotations
+import os
+import re
+import threading
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.serialization import dumps_bytes, loads
+
+# WAL segments are numbered files in one directory; a record is one line,
+# `<crc32 hex> <json>\n`, so a torn final write is detected and dropped.
+_SEGMENT_NAME = re.compile(r"^wal-(\d{8})\.log$")
+
+SNAPSHOT_NAME = "snapshot.jsonl"
+SNAPSHOT_FORMAT = "gateway-store-snapshot/1"
+
+
+class WalCorruptionError(ValueError):
+    pass
+
+
+def encode_record(record: Any) -> bytes:
+    payload = dumps_bytes(record)
+    return b"%08x %s\n" % (zlib.crc32(payload), payload)
+
+
+def decode_record(line: bytes) -> Optional[Any]:
+    """The record on `line`, or None if it is torn or fails its checksum."""
+    if len(line) < 10 or not line.endswith(b"\n") or line[8:9] != b" ":
+        return None
+    payload = line[9:-1]
+    try:
+        if int(line[:8], 16) != zlib.crc32(payload):
+            return None
+        return loads(payload)
+    except ValueError:
+        return None
+
+
+def write_all(fd: int, data: bytes) -> None:
+    """os.write() until all of `data` is written (it may write less)."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+def segment_path(directory: str, number: int) -> str:
+    return os.path.join(directory, f"wal-{number:08d}.log")
+
+
+def list_segments(directory: str) -> List[Tuple[int, str]]:
+    """(number, path) of every WAL segment in `directory`, oldest first."""
+    found = []
+    for name in os.listdir(directory):
+        m = _SEGMENT_NAME.match(name)
+        if m:
+            found.append((int(m.group(1)), os.path.join(directory, name)))
+    return sorted(found)
+
+
+def read_segment(path: str, last: bool = False) -> Iterator[Any]:
+    """
+    Records of one segment in order. A bad final line of the `last` segment
+    is a write torn by a crash: it is dropped and the file truncated to the
+    last good record. Anything else that fails to decode raises
+    WalCorruptionError, since replaying past it would lose acknowledged writes.
+    """
+    good = 0
+    with open(path, "rb") as f:
+        pending: Optional[bytes] = None
+        for line in f:
+            if pending is not None:
+                raise WalCorruptionError(f"{path}: corrupt record at byte {good}")
+            record = decode_record(line)
+            if record is None:
+                pending = line
+                continue
+            good += len(line)
+            yield record
+    if pending is not None:
+        if not last:
+            raise WalCorruptionError(f"{path}: corrupt record at byte {good}")
+        with open(path, "r+b") as f:
+            f.truncate(good)
+            os.fsync(f.fileno())
+
+
+def _fsync_dir(directory: str) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class WriteAheadLog:
+    """
+    Append-only log with group commit.
+
+    append() writes the record to the current segment (one unbuffered
+    write) and returns its log sequence number; wait_durable(lsn) blocks
+    until an fsync has covered it. A single committer thread fsyncs whenever
+    there are unsynced records, so writers arriving during one fsync share
+    the next: N concurrent writers cost about one fsync, not N.
+    """
+
+    def __init__(self, directory: str, segment: int):
+        self.directory = directory
+        self.segment = segment
+        self.segment_bytes = 0
+        self.syncs = 0
+        self._fd = self._open(segment)
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._sync_lock = threading.Lock()  # held across fsync and rotate
+        self._written = 0
+        self._durable = 0
+        self._error: Optional[OSError] = None
+        self._closed = False
+        self._committer = threading.Thread(
+            target=self._commit_loop, name="wal-commit", daemon=True
+        )
+        self._committer.start()
+
+    def _open(self, segment: int) -> int:
+        fd = os.open(
+            segment_path(self.directory, segment),
+            os.O_WRONLY | os.O_CREAT | os.O_APPEND,
+            0o600,
+        )
+        _fsync_dir(self.directory)
+        return fd
+
+    def append(self, record: Any) -> int:
+        line = encode_record(record)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("write-ahead log is closed")
+            write_all(self._fd, line)
+            self.segment_bytes += len(line)
+            self._written += 1
+            self._cond.notify_all()
+            return self._written
+
+    def wait_durable(self, lsn: int) -> None:
+        with self._cond:
+            while self._durable < lsn:
+                if self._error is not None:
+                    raise self._error
+                self._cond.wait()
+
+    def _commit_loop(self) -> None:
+        while True:
+            with self._cond:
+                while self._written == self._durable and not self._closed:
+                    self._cond.wait()
+                if self._closed and self._written == self._durable:
+                    return
+            with self._sync_lock:
+                with self._lock:
+                    target, fd = self._written, self._fd
+                try:
+                    os.fsync(fd)
+                except OSError as e:
+                    with self._cond:
+                        self._error = e
+                        self._cond.notify_all()
+                    return
+                with self._cond:
+                    self.syncs += 1
+                    self._durable = max(self._durable, target)
+                    self._cond.notify_all()
+
+    def rotate(self) -> int:
+        """Seal the current segment and start the next; returns its number."""
+        with self._sync_lock, self._cond:
+            os.fsync(self._fd)
+            os.close(self._fd)
+            self._durable = self._written
+            self.segment += 1
+            self.segment_bytes = 0
+            self._fd = self._open(self.segment)
+            self._cond.notify_all()
+            return self.segment
+
+    def close(self) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._committer.join()
+        with self._sync_lock, self._lock:
+            os.fsync(self._fd)
+            os.close(self._fd)
+
+
+# ------------------------------------------------------------------------------
+# Snapshots: a header line, then one JSON line per row. Written to a temp
+# file, fsynced and renamed into place, so a reader sees all of it or none.
+# ------------------------------------------------------------------------------
+def write_snapshot(directory: str, header: Dict[str, Any], rows: Iterable[Any]) -> int:
+    """Atomically replace the snapshot in `directory`; returns the row count."""
+    path = os.path.join(directory, SNAPSHOT_NAME)
+    tmp = path + ".tmp"
+    count = 0
+    with open(tmp, "wb") as f:
+        f.write(dumps_bytes({"format": SNAPSHOT_FORMAT, **header}) + b"\n")
+        for row in rows:
+            f.write(dumps_bytes(row) + b"\n")
+            count += 1
+        f.write(dumps_bytes({"rows": count}) + b"\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    _fsync_dir(directory)
+    return count
+
+
+def read_snapshot(directory: str) -> Tuple[Optional[Dict[str, Any]], Iterator[Any]]:
+    """(header, rows) of the snapshot in `directory`; (None, empty) if none."""
+    path = os.path.join(directory, SNAPSHOT_NAME)
+    if not os.path.exists(path):
+        return None, iter(())
+    f = open(path, "rb")
+    header = loads(f.readline())
+    if header.get("format") != SNAPSHOT_FORMAT:
+        f.close()
+        raise WalCorruptionError(f"{path}: unknown snapshot format")
+
+    def rows() -> Iterator[Any]:
+        with f:
+            count = 0
+            prev = f.readline()
+            for line in f:
+                yield loads(prev)
+                count += 1
+                prev = line
+            trailer = loads(prev) if prev else None
+            if not isinstance(trailer, dict) or trailer.get("rows") != count:
+                raise WalCorruptionError(f"{path}: truncated snapshot")
+
+    return header, rows()
@@ -60,6 +60,16 @@ def main() -> None:
         if "TENANT_B_DOC" in item.get("title", ""):
             fail("tenant-b title appeared in tenant-a results")
 
+    # Structural isolation: each tenant's partitions hold only its own docs.
+    for tenant in ("tenant-a", "tenant-b"):
+        if STORE.tenant_stats(tenant).doc_count != 1:
+            fail(f"{tenant} partition does not hold exactly its own document")
+        scoped = STORE.list_scoped(
+            tenant_id=tenant, allowed_classifications=["public", "admin"]
+        )
+        if any(d.tenant_id != tenant for d in scoped):
+            fail(f"foreign document stored in {tenant} partition")
+
     print("PASS tenant_isolation_gate")
 
 
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""In-flight /query capacity of the async routes with an I/O-bound backend.
+
+Each backend wraps an in-memory store and adds a fixed latency to every
+search, standing in for a network round trip:
+
+  blocking   a sync RetrievalStore that sleeps in search(); the routes reach
+             it through SyncStoreAdapter, so each in-flight search holds one
+             of STORE_EXECUTOR_THREADS worker threads
+  awaiting   a native AsyncRetrievalStore that awaits asyncio.sleep(), so a
+             waiting search holds no thread at all
+
+C concurrent clients send POST /query in-process over ASGI (httpx). The
+query cache is disabled and every query is distinct, so each request
+searches. Reported: requests/s and the peak number of searches waiting at
+once.
+
+Usage: python scripts/bench_async_routes.py [--latency-ms 20] [--requests 2000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+os.environ.setdefault("AUTH_MODE", "headers")
+os.environ.setdefault("ALLOW_INSECURE_HEADERS", "true")
+os.environ["QUERY_CACHE_MAX_ENTRIES"] = "0"
+
+import httpx  # noqa: E402
+
+import app.main  # noqa: E402
+from app.async_store import AsyncRetrievalStore, as_async  # noqa: E402
+from app.settings import STORE_EXECUTOR_THREADS  # noqa: E402
+from app.store import InMemoryStore  # noqa: E402
+
+HEADERS = {"X-User": "bench", "X-Tenant": "tenant-a", "X-Role": "admin"}
+
+
+class Gauge:
+    def __init__(self):
+        self.now = self.peak = 0
+
+    def __enter__(self):
+        self.now += 1
+        self.peak = max(self.peak, self.now)
+
+    def __exit__(self, *exc):
+        self.now -= 1
+
+
+def blocking_store(latency: float, gauge: Gauge) -> InMemoryStore:
+    class BlockingStore(InMemoryStore):
+        nonblocking_reads = False
+
+        def scoped(self, tenant_id, allowed_classifications):
+            view = super().scoped(tenant_id, allowed_classifications)
+            search = view.search
+
+            def slow_search(*args):
+                with gauge:  # ints under the GIL: good enough for a peak
+                    time.sleep(latency)
+                return search(*args)
+
+            view.search = slow_search
+            return view
+
+    return BlockingStore()
+
+
+def awaiting_store(latency: float, gauge: Gauge) -> AsyncRetrievalStore:
+    backing = as_async(InMemoryStore())
+
+    class SlowView:
+        def __init__(self, view):
+            self.view = view
+
+        async def asearch(self, query, limit=None, after=None):
+            with gauge:
+                await asyncio.sleep(latency)
+            return await self.view.asearch(query, limit, after)
+
+    class AwaitingStore(AsyncRetrievalStore):
+        aput_many = backing.aput_many
+        alist_scoped = backing.alist_scoped
+        ageneration = backing.ageneration
+        atenant_stats = backing.atenant_stats
+
+        async def ascoped(self, tenant_id, allowed_classifications):
+            return SlowView(await backing.ascoped(tenant_id, allowed_classifications))
+
+    return AwaitingStore()
+
+
+async def run(store, clients: int, requests: int) -> float:
+    app.main.STORE = store
+    transport = httpx.ASGITransport(app=app.main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        for i in range(100):
+            r = await c.post(
+                "/ingest",
+                json={"classification": "public", "title": f"d{i}", "body": "payroll"},
+                headers=HEADERS,
+            )
+            r.raise_for_status()
+        queue = iter(range(requests))
+
+        async def client():
+            for i in queue:
+                r = await c.post(
+                    "/query", json={"query": f"payroll q{i}"}, headers=HEADERS
+                )
+                r.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        return requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency-ms", type=float, default=20.0)
+    ap.add_argument("--requests", type=int, default=2000)
+    args = ap.parse_args()
+    latency = args.latency_ms / 1000
+    logging.disable(logging.CRITICAL)
+
+    print(
+        f"{args.latency_ms:.0f} ms backend latency, {args.requests} requests, "
+        f"STORE_EXECUTOR_THREADS={STORE_EXECUTOR_THREADS}"
+    )
+    print(f"{'backend':<10}{'clients':>8}{'req/s':>10}{'peak waiting':>14}")
+    for clients in (1, 16, 64, 256):
+        for label, make in (("blocking", blocking_store), ("awaiting", awaiting_store)):
+            gauge = Gauge()
+            rps = asyncio.run(run(make(latency, gauge), clients, args.requests))
+            print(f"{label:<10}{clients:>8}{rps:>10.0f}{gauge.peak:>14}")
+
+
+if __name__ == "__main__":
+    main()
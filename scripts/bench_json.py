@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: JSON encoding for log lines and /query responses.
+
+1. Log formatter throughput (lines/s): the previous JsonFormatter
+   (`json.dumps(default=str)` + `datetime.now().isoformat()` per line)
+   against the current one (`app/serialization.py` backend + cached
+   millisecond timestamps).
+2. /query response encoding (responses/s) for a 50-result QueryResponse:
+   stdlib JSONResponse, FastJSONResponse, and the pydantic-core path FastAPI
+   uses for routes with a response_model (which /query has).
+
+Usage: python scripts/bench_json.py [--seconds 1.0]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.json_logger import JsonFormatter  # noqa: E402
+from app.models import Highlight, QueryResponse, QueryResult  # noqa: E402
+from app.serialization import JSON_BACKEND, FastJSONResponse  # noqa: E402
+
+
+class LegacyJsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        log_record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        log_record.update(record.props)
+        return json.dumps(log_record, default=str)
+
+
+def make_record() -> logging.LogRecord:
+    record = logging.LogRecord(
+        "app.audit", logging.INFO, "", 0, "audit_event", (), None
+    )
+    record.request_id = "3f0b6c1e-2a51-4f7e-9d2a-0c8e5b7a9f11"
+    record.props = {
+        "event": "query_allowed",
+        "schema_version": "1.0",
+        "tenant_id": "tenant-a",
+        "role": "admin",
+        "user_id": "alice",
+        "query_sha256": "ab" * 32,
+        "query_len": 17,
+        "results_count": 10,
+        "doc_ids": [f"doc-{i:04d}" for i in range(10)],
+    }
+    return record
+
+
+def make_response() -> QueryResponse:
+    return QueryResponse(
+        request_id="3f0b6c1e-2a51-4f7e-9d2a-0c8e5b7a9f11",
+        results=[
+            QueryResult(
+                doc_id=f"00000000-0000-4000-8000-{i:012d}",
+                title=f"Quarterly report {i}",
+                snippet="lorem ipsum dolor sit amet " * 6,
+                highlights=[Highlight(start=6, end=11), Highlight(start=40, end=45)],
+            )
+            for i in range(50)
+        ],
+    )
+
+
+def rate(fn, seconds: float) -> float:
+    for _ in range(100):  # warm-up
+        fn()
+    n, start = 0, time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < seconds:
+        for _ in range(100):
+            fn()
+        n += 100
+    return n / elapsed
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=1.0)
+    args = ap.parse_args()
+
+    record = make_record()
+    print(f"JSON backend: {JSON_BACKEND}")
+    print(f"{'log formatter':<32}{'lines/s':>12}")
+    for label, fmt in (("legacy", LegacyJsonFormatter()), ("current", JsonFormatter())):
+        print(f"{label:<32}{rate(lambda: fmt.format(record), args.seconds):>12.0f}")
+
+    resp = make_response()
+    cases = (
+        ("JSONResponse (stdlib)", lambda: JSONResponse(resp.model_dump(mode="json"))),
+        ("FastJSONResponse", lambda: FastJSONResponse(resp.model_dump(mode="json"))),
+        ("pydantic-core (response_model)", lambda: resp.model_dump_json().encode()),
+    )
+    print(f"\n{'/query, 50 results':<32}{'responses/s':>12}")
+    for label, fn in cases:
+        print(f"{label:<32}{rate(fn, args.seconds):>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: per-request overhead of the request-context middleware.
+
+Compares the previous `@app.middleware("http")` implementation
+(BaseHTTPMiddleware) against the pure-ASGI `RequestContextMiddleware` in
+`app/middleware.py`, each wrapping a bare `/health` route. Logging is
+disabled so only middleware cost is measured.
+
+By default requests are driven in-process over ASGI; `--uvicorn` serves each
+app with uvicorn on localhost and measures keep-alive HTTP round trips.
+
+Usage: python scripts/bench_middleware.py [--requests 5000] [--uvicorn]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import http.client
+import logging
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from fastapi import FastAPI, Request  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.json_logger import request_id_ctx  # noqa: E402
+from app.middleware import (  # noqa: E402
+    RequestContextMiddleware,
+    access_logger,
+    derive_request_id,
+)
+
+
+async def legacy_request_context(request: Request, call_next):
+    rid = derive_request_id(request.headers.get("X-Request-Id"))
+    token = request_id_ctx.set(rid)
+    request.state.request_id = rid
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        response.headers["X-Request-Id"] = rid
+        response.headers["X-Trace-Id"] = rid
+        return response
+    finally:
+        access_logger.info(
+            "request_complete",
+            extra={
+                "props": {
+                    "event": "request_complete",
+                    "method": request.method,
+                    "path": request.url.path,
+                    "status": status_code,
+                    "duration_ms": int((time.perf_counter() - start) * 1000),
+                }
+            },
+        )
+        request_id_ctx.reset(token)
+
+
+def make_app(pure_asgi: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/health")
+    async def health(request: Request):
+        return {"ok": True, "request_id": request.state.request_id}
+
+    if pure_asgi:
+        app.add_middleware(RequestContextMiddleware)
+    else:
+        app.add_middleware(BaseHTTPMiddleware, dispatch=legacy_request_context)
+    return app
+
+
+async def _asgi_request(app: FastAPI) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/health",
+        "raw_path": b"/health",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"x-request-id", b"bench-1")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    await app(scope, receive, send)
+    return time.perf_counter() - start
+
+
+def bench_asgi(app: FastAPI, n: int) -> list[float]:
+    async def run():
+        for _ in range(200):  # warm-up
+            await _asgi_request(app)
+        return [await _asgi_request(app) for _ in range(n)]
+
+    return asyncio.run(run())
+
+
+def bench_uvicorn(app: FastAPI, n: int) -> list[float]:
+    import uvicorn
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_config=None)
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+
+    def request() -> float:
+        start = time.perf_counter()
+        conn.request("GET", "/health", headers={"X-Request-Id": "bench-1"})
+        conn.getresponse().read()
+        return time.perf_counter() - start
+
+    try:
+        for _ in range(200):  # warm-up
+            request()
+        return [request() for _ in range(n)]
+    finally:
+        conn.close()
+        server.should_exit = True
+        thread.join()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=5000)
+    ap.add_argument("--uvicorn", action="store_true")
+    args = ap.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    bench = bench_uvicorn if args.uvicorn else bench_asgi
+    mode = "uvicorn HTTP" if args.uvicorn else "in-process ASGI"
+
+    print(f"GET /health latency, {args.requests} requests, {mode}")
+    print(f"{'middleware':<22}{'mean us':>10}{'p50 us':>10}{'p99 us':>10}")
+    for label, pure in (("BaseHTTPMiddleware", False), ("pure ASGI", True)):
+        samples = sorted(bench(make_app(pure), args.requests))
+        mean = statistics.fmean(samples) * 1e6
+        p50 = samples[len(samples) // 2] * 1e6
+        p99 = samples[int(len(samples) * 0.99)] * 1e6
+        print(f"{label:<22}{mean:>10.1f}{p50:>10.1f}{p99:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
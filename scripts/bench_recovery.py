@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Recovery benchmark for the durable in-memory store (STORE_WAL_DIR).
+
+Writes N documents as durable state in a temp directory, then times
+`DurableInMemoryStore.recover()` into a fresh process-local store:
+
+1. WAL only: every document is replayed from the write-ahead log
+   (projections and the index are rebuilt).
+2. Snapshot + tail: a compacted snapshot (with precomputed projections)
+   plus a 1% WAL tail.
+3. Mapped file: `MappedStore` opening a corpus file built from the same
+   documents (STORE_BACKEND=mapped), plus its first query.
+
+Usage: python scripts/bench_recovery.py [--docs 1000000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import random
+import resource
+import string
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.durable_store import DurableInMemoryStore  # noqa: E402
+from app.mapped_store import MappedStore, write_mapped_store  # noqa: E402
+from app.store import project_document  # noqa: E402
+from app.wal import WriteAheadLog, write_snapshot  # noqa: E402
+
+TENANTS = [f"tenant-{i:03d}" for i in range(50)]
+CLASSIFICATIONS = ["public", "admin"]
+BATCH = 1000
+
+
+def make_docs(n: int, start: int = 0, seed: int = 11):
+    """(tenant, record) pairs; records are (doc_id, seq, class, title, body)."""
+    rng = random.Random(seed + start)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=6)) for _ in range(2000)]
+    for seq in range(start, start + n):
+        yield (
+            rng.choice(TENANTS),
+            (
+                str(uuid.UUID(int=rng.getrandbits(128))),
+                seq,
+                rng.choice(CLASSIFICATIONS),
+                " ".join(rng.choices(words, k=4)),
+                " ".join(rng.choices(words, k=30)),
+            ),
+        )
+
+
+def write_wal(directory: str, segment: int, docs) -> None:
+    """Append `docs` as put records of up to BATCH same-tenant documents."""
+    wal = WriteAheadLog(directory, segment)
+    pending: dict = {}
+    lsn = 0
+    for tenant, record in docs:
+        batch = pending.setdefault(tenant, [])
+        batch.append(record)
+        if len(batch) == BATCH:
+            lsn = wal.append({"op": "put", "tenant": tenant, "docs": batch})
+            pending[tenant] = []
+    for tenant, batch in pending.items():
+        if batch:
+            lsn = wal.append({"op": "put", "tenant": tenant, "docs": batch})
+    wal.wait_durable(lsn)
+    wal.close()
+
+
+def snapshot_rows(docs):
+    for tenant, (doc_id, seq, classification, title, body) in sorted(
+        docs, key=lambda d: d[0]
+    ):
+        proj = project_document(title, body)
+        yield [
+            tenant,
+            doc_id,
+            seq,
+            classification,
+            title,
+            body,
+            proj.ruleset_id,
+            proj.title,
+            proj.spans,
+        ]
+
+
+def dir_bytes(directory: str) -> int:
+    return sum(f.stat().st_size for f in Path(directory).iterdir())
+
+
+def report(label: str, mib: float, elapsed: float, n: int) -> None:
+    print(f"{label:<24}{mib:>10.0f}{elapsed:>10.2f}{n / elapsed:>12.0f}")
+
+
+def time_recovery(directory: str, n: int, label: str) -> DurableInMemoryStore:
+    gc.collect()
+    store = DurableInMemoryStore(directory)
+    start = time.perf_counter()
+    store.recover()
+    elapsed = time.perf_counter() - start
+    docs = sum(store.tenant_stats(t).doc_count for t in TENANTS)
+    assert docs == n, (docs, n)
+    store.close()
+    report(label, dir_bytes(directory) / 2**20, elapsed, n)
+    return store
+
+
+def time_mapped(path: str, n: int) -> None:
+    start = time.perf_counter()
+    store = MappedStore(path)
+    opened = time.perf_counter() - start
+    word = store.list_scoped(TENANTS[0], ["public"])[0].body.split()[0]
+    start = time.perf_counter()
+    hits = store.search_scoped(TENANTS[0], ["public", "admin"], word, limit=10)
+    first_query = time.perf_counter() - start
+    assert hits
+    mib = Path(path).stat().st_size / 2**20
+    print(f"{'mapped file (open)':<24}{mib:>10.0f}{opened:>10.4f}")
+    print(f"{'  + first query':<24}{'':>10}{first_query:>10.4f}")
+    store.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=1_000_000)
+    args = ap.parse_args()
+    n = args.docs
+    tail = max(1, n // 100)
+
+    print(f"{n} documents, ~200 B bodies")
+    print(f"{'recovery from':<24}{'MiB':>10}{'seconds':>10}{'docs/s':>12}")
+    with (
+        tempfile.TemporaryDirectory() as wal_only,
+        tempfile.TemporaryDirectory() as snap,
+    ):
+        write_wal(wal_only, 0, make_docs(n))
+        store = time_recovery(wal_only, n, "WAL only")
+        mapped = os.path.join(wal_only, "corpus.gwmap")
+        write_mapped_store(store, mapped)
+        del store
+
+        docs = list(make_docs(n - tail))
+        write_snapshot(snap, {"next_segment": 1}, snapshot_rows(docs))
+        del docs
+        write_wal(snap, 1, make_docs(tail, start=n - tail))
+        time_recovery(snap, n, "snapshot + 1% WAL")
+        gc.collect()
+        time_mapped(mapped, n)
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"\npeak RSS {rss:.0f} MiB (pid {os.getpid()})")
+
+
+if __name__ == "__main__":
+    main()
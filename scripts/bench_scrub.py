@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: SafeLogFilter cost per log line.
+
+Compares the previous scrubber (per-key regex, one regex per value pattern,
+always rebuilding dicts) against `app/security/log_safety.py` on a typical
+access-log and audit payload.
+
+Usage: python scripts/bench_scrub.py [--lines 50000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.security.log_safety import (  # noqa: E402
+    SENSITIVE_KEY_PATTERN,
+    SENSITIVE_VALUE_PATTERNS,
+    scrub_recursive,
+)
+
+
+def legacy_scrub(obj):
+    if isinstance(obj, dict):
+        clean = {}
+        for k, v in obj.items():
+            if isinstance(k, str) and SENSITIVE_KEY_PATTERN.search(k):
+                clean[k] = "[REDACTED_KEY]"
+                continue
+            clean[k] = legacy_scrub(v)
+        return clean
+    if isinstance(obj, list):
+        return [legacy_scrub(i) for i in obj]
+    if isinstance(obj, str):
+        scan = obj[:2048]
+        if obj and any(p.search(scan) for p in SENSITIVE_VALUE_PATTERNS):
+            return "[REDACTED_VALUE]"
+    return obj
+
+
+PAYLOADS = {
+    "access log": {
+        "event": "request_complete",
+        "method": "POST",
+        "path": "/query",
+        "status": 200,
+        "duration_ms": 4,
+    },
+    "audit event": {
+        "event": "query_allowed",
+        "schema_version": "1.0",
+        "tenant_id": "tenant-a",
+        "role": "admin",
+        "user_id": "alice",
+        "request_id": "3f0b6c1e-2a51-4f7e-9d2a-0c8e5b7a9f11",
+        "query_sha256": "ab" * 32,
+        "query_len": 17,
+        "results_count": 10,
+        "doc_ids": [f"doc-{i:04d}" for i in range(10)],
+    },
+}
+
+
+def per_line_us(fn, payload, lines: int) -> float:
+    start = time.perf_counter()
+    for _ in range(lines):
+        fn(payload)
+    return (time.perf_counter() - start) / lines * 1e6
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lines", type=int, default=50_000)
+    args = ap.parse_args()
+
+    print(f"{'payload':<14}{'before us':>12}{'after us':>12}{'speedup':>10}")
+    for label, payload in PAYLOADS.items():
+        assert legacy_scrub(payload) == scrub_recursive(payload)
+        before = per_line_us(legacy_scrub, payload, args.lines)
+        after = per_line_us(scrub_recursive, payload, args.lines)
+        print(f"{label:<14}{before:>12.2f}{after:>12.2f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Concurrent ingest + query throughput for InMemoryStore.
+
+Preloads a store, then runs writer threads (batches of `put_many`) next to
+reader threads (`search_scoped`) for a fixed time and reports operations
+per second. Readers take no lock (writes publish new copy-on-write
+partitions); for comparison the same load runs against a store that
+serializes every call with one lock, the obvious alternative.
+
+With the GIL, threads share one core for Python code, so the numbers
+show how much writers hold readers up rather than parallel speedup.
+
+Usage: python scripts/bench_store_concurrency.py [--docs 50000] [--seconds 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import string
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.store import InMemoryStore  # noqa: E402
+
+SCOPE = ["public", "admin"]
+
+
+class LockedStore(InMemoryStore):
+    """Baseline: one lock around every read and write."""
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def put_many(self, tenant_id, items):
+        with self._lock:
+            return super().put_many(tenant_id, items)
+
+    def search_scoped(self, *args, **kwargs):
+        with self._lock:
+            return super().search_scoped(*args, **kwargs)
+
+
+def make_docs(rng: random.Random, words: list[str], n: int):
+    return [
+        (
+            rng.choice(SCOPE),
+            " ".join(rng.choices(words, k=4)),
+            " ".join(rng.choices(words, k=30)),
+        )
+        for _ in range(n)
+    ]
+
+
+def run(store: InMemoryStore, words, writers: int, readers: int, seconds: float):
+    counts = {"reads": 0, "docs": 0}
+    stop = threading.Event()
+    lock = threading.Lock()
+
+    def writer(seed):
+        rng = random.Random(seed)
+        n = 0
+        while not stop.is_set():
+            n += len(store.put_many("tenant-a", make_docs(rng, words, 10)))
+        with lock:
+            counts["docs"] += n
+
+    def reader(seed):
+        rng = random.Random(seed)
+        n = 0
+        while not stop.is_set():
+            store.search_scoped("tenant-a", SCOPE, rng.choice(words), limit=10)
+            n += 1
+        with lock:
+            counts["reads"] += n
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [
+        threading.Thread(target=reader, args=(100 + i,)) for i in range(readers)
+    ]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return counts["reads"] / seconds, counts["docs"] / seconds
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=50_000)
+    ap.add_argument("--seconds", type=float, default=5.0)
+    args = ap.parse_args()
+
+    rng = random.Random(3)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=6)) for _ in range(2000)]
+    preload = make_docs(rng, words, args.docs)
+
+    print(f"{args.docs} preloaded documents, {args.seconds:.0f}s per run")
+    print(f"{'store':<12}{'writers':>8}{'readers':>8}{'queries/s':>12}{'docs/s':>10}")
+    for writers, readers in ((0, 8), (1, 8), (4, 8), (4, 0)):
+        for label, cls in (("lock-free", InMemoryStore), ("one lock", LockedStore)):
+            store = cls()
+            for i in range(0, len(preload), 1000):
+                store.put_many("tenant-a", preload[i : i + 1000])
+            qps, dps = run(store, words, writers, readers, args.seconds)
+            print(f"{label:<12}{writers:>8}{readers:>8}{qps:>12.0f}{dps:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
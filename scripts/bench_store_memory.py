@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Memory benchmark: bytes per stored document.
+
+1. Record overhead: a pydantic `Document` (the store's previous internal
+   representation) against the slotted `StoredDocument`, with per-request
+   tenant/classification strings as the HTTP layer produces them.
+2. Whole store: `InMemoryStore` footprint per document after ingesting N
+   small documents (records, projections, postings).
+
+Measured with tracemalloc. Usage: python scripts/bench_store_memory.py [--docs 100000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import random
+import string
+import sys
+import tracemalloc
+import uuid
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.models import Document  # noqa: E402
+from app.store import InMemoryStore, StoredDocument  # noqa: E402
+
+TENANTS = [f"tenant-{i:03d}" for i in range(50)]
+CLASSIFICATIONS = ["public", "admin"]
+
+
+def make_items(n: int, seed: int = 11) -> list[tuple[str, str, str, str]]:
+    rng = random.Random(seed)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=6)) for _ in range(2000)]
+    return [
+        (
+            rng.choice(TENANTS),
+            rng.choice(CLASSIFICATIONS),
+            " ".join(rng.choices(words, k=4)),
+            " ".join(rng.choices(words, k=30)),
+        )
+        for _ in range(n)
+    ]
+
+
+def fresh(s: str) -> str:
+    """A new string object, like one parsed out of a request body."""
+    return "".join(list(s))
+
+
+def measure(build) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del kept
+    return used
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=100_000)
+    args = ap.parse_args()
+    n = args.docs
+    items = make_items(n)
+    ids = [str(uuid.uuid4()) for _ in range(n)]
+
+    def pydantic_records():
+        return [
+            Document(
+                doc_id=ids[i],
+                tenant_id=fresh(t),
+                classification=fresh(c),
+                title=title,
+                body=body,
+            )
+            for i, (t, c, title, body) in enumerate(items)
+        ]
+
+    def slotted_records():
+        return [
+            StoredDocument(ids[i], fresh(t), fresh(c), title, body, seq=i)
+            for i, (t, c, title, body) in enumerate(items)
+        ]
+
+    def whole_store():
+        store = InMemoryStore()
+        for t, c, title, body in items:
+            store.put(fresh(t), fresh(c), title, body)
+        return store
+
+    print(f"{n} documents, ~{sum(len(b) for *_, b in items) // n} B bodies")
+    print(f"{'representation':<32}{'bytes/doc':>12}")
+    for label, build in (
+        ("pydantic Document", pydantic_records),
+        ("StoredDocument (__slots__)", slotted_records),
+        ("InMemoryStore (total)", whole_store),
+    ):
+        print(f"{label:<32}{measure(build) / n:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Build a read-only corpus file for STORE_BACKEND=mapped.
+
+Loads documents into an in-memory store (which computes the redacted
+projections and the BM25 index), then writes them with
+`app.mapped_store.write_mapped_store()`. Sources:
+
+  --jsonl FILE    one {"tenant_id", "classification", "title", "body"} per line
+  --wal-dir DIR   the durable state of a STORE_WAL_DIR deployment
+
+Usage: python scripts/build_mapped_store.py --jsonl corpus.jsonl --out corpus.gwmap
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from itertools import groupby
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.durable_store import DurableInMemoryStore  # noqa: E402
+from app.mapped_store import write_mapped_store  # noqa: E402
+from app.serialization import loads  # noqa: E402
+from app.store import InMemoryStore  # noqa: E402
+
+
+def load_jsonl(path: str) -> InMemoryStore:
+    store = InMemoryStore()
+    with open(path, "rb") as f:
+        rows = (loads(line) for line in f if line.strip())
+        for tenant_id, group in groupby(rows, key=lambda r: r["tenant_id"]):
+            store.put_many(
+                tenant_id, [(r["classification"], r["title"], r["body"]) for r in group]
+            )
+    return store
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    source = ap.add_mutually_exclusive_group(required=True)
+    source.add_argument("--jsonl")
+    source.add_argument("--wal-dir")
+    ap.add_argument("--out", required=True)
+    args = ap.parse_args()
+
+    start = time.perf_counter()
+    if args.jsonl:
+        store = load_jsonl(args.jsonl)
+    else:
+        store = DurableInMemoryStore(args.wal_dir)
+        store.recover()
+    loaded = time.perf_counter()
+    write_mapped_store(store, args.out)
+    store.close()
+
+    docs = sum(p.doc_count for t in store.partitions.values() for p in t.values())
+    size = Path(args.out).stat().st_size
+    print(
+        f"{docs} documents -> {args.out} ({size / 2**20:.1f} MiB); "
+        f"load {loaded - start:.1f}s, write {time.perf_counter() - loaded:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
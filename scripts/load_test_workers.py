@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Load test: /query throughput with 1, 2, 4... worker processes.
+
+Every run starts `python -m app.serve --workers N` and serves STORE_BACKEND=shared from one segment file in a temp
+directory. The first run ingests the corpus over HTTP (so it is written by
+whichever workers accept the requests); later runs recover it at startup.
+Before measuring, the script opens many fresh connections, which uvicorn
+spreads across workers, and checks that each one returns the same ranked
+doc_ids for the same query. Throughput is then measured with client
+processes, each looping keep-alive POST /query requests. The query cache
+is disabled so every request ranks and redacts.
+
+Throughput can only scale up to the number of CPU cores the server gets
+(the clients share them too); the script prints the core count.
+
+Usage: python scripts/load_test_workers.py [--workers 1,2,4] [--docs 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import socket
+import string
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+HEADERS = {
+    "X-User": "load",
+    "X-Tenant": "tenant-a",
+    "X-Role": "admin",
+    "Content-Type": "application/json",
+}
+INGEST_BATCH = 100
+
+
+def vocabulary(seed: int = 7) -> list[str]:
+    rng = random.Random(seed)
+    return ["".join(rng.choices(string.ascii_lowercase, k=6)) for _ in range(2000)]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers: int, segment: str) -> tuple[subprocess.Popen, int]:
+    port = free_port()
+    env = dict(
+        os.environ,
+        AUTH_MODE="headers",
+        ALLOW_INSECURE_HEADERS="true",
+        STORE_BACKEND="shared",
+        STORE_SEGMENT_PATH=segment,
+        QUERY_CACHE_MAX_ENTRIES="0",
+        CURSOR_SIGNING_KEY="load-test",
+        LOG_LEVEL="WARNING",
+    )
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "app.serve",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+        ],
+        cwd=ROOT_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                conn.close()
+                # Let the remaining workers finish recovering.
+                time.sleep(0.5 * workers)
+                return proc, port
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+def post(conn: http.client.HTTPConnection, path: str, payload: dict) -> dict:
+    conn.request("POST", path, body=json.dumps(payload), headers=HEADERS)
+    resp = conn.getresponse()
+    body = resp.read()
+    if resp.status != 200:
+        raise RuntimeError(f"{path}: {resp.status} {body[:200]!r}")
+    return json.loads(body)
+
+
+def ingest(port: int, docs: int) -> None:
+    rng = random.Random(11)
+    words = vocabulary()
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    for start in range(0, docs, INGEST_BATCH):
+        batch = [
+            {
+                "classification": rng.choice(["public", "admin"]),
+                "title": " ".join(rng.choices(words, k=4)),
+                "body": " ".join(rng.choices(words, k=30)),
+            }
+            for _ in range(min(INGEST_BATCH, docs - start))
+        ]
+        post(conn, "/ingest/batch", {"documents": batch})
+        # A fresh connection may land on another worker.
+        conn.close()
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+    conn.close()
+
+
+def check_consistency(port: int, connections: int) -> None:
+    """Fresh connections (spread over workers) must agree on every ranking."""
+    for query in vocabulary()[:5]:
+        seen = set()
+        for _ in range(connections):
+            conn = http.client.HTTPConnection("127.0.0.1", port)
+            result = post(conn, "/query", {"query": query, "top_k": 20})
+            seen.add(tuple(r["doc_id"] for r in result["results"]))
+            conn.close()
+        if len(seen) != 1:
+            raise AssertionError(f"workers disagree on {query!r}: {len(seen)} rankings")
+
+
+def client(port: int, seconds: float, seed: int, out) -> None:
+    rng = random.Random(seed)
+    words = vocabulary()
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    n = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        post(conn, "/query", {"query": rng.choice(words), "top_k": 10})
+        n += 1
+    conn.close()
+    out.put(n)
+
+
+def measure(port: int, clients: int, seconds: float) -> float:
+    out: multiprocessing.Queue = multiprocessing.Queue()
+    procs = [
+        multiprocessing.Process(target=client, args=(port, seconds, i, out))
+        for i in range(clients)
+    ]
+    for p in procs:
+        p.start()
+    total = sum(out.get() for _ in procs)
+    for p in procs:
+        p.join()
+    return total / seconds
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", default="1,2,4")
+    ap.add_argument("--docs", type=int, default=20_000)
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--clients-per-worker", type=int, default=2)
+    args = ap.parse_args()
+    counts = [int(n) for n in args.workers.split(",")]
+
+    print(f"{args.docs} documents, {os.cpu_count()} CPU core(s), query cache off")
+    print(f"{'workers':>8}{'clients':>9}{'queries/s':>12}{'speedup':>9}")
+    baseline = None
+    with tempfile.TemporaryDirectory() as tmp:
+        segment = os.path.join(tmp, "store.seg")
+        for i, workers in enumerate(counts):
+            proc, port = start_server(workers, segment)
+            try:
+                if i == 0:
+                    ingest(port, args.docs)
+                check_consistency(port, connections=4 * workers)
+                clients = workers * args.clients_per_worker
+                qps = measure(port, clients, args.seconds)
+            finally:
+                proc.terminate()
+                proc.wait()
+            baseline = baseline or qps
+            print(f"{workers:>8}{clients:>9}{qps:>12.0f}{qps / baseline:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
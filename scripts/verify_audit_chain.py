@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Verify the hash chain of an audit JSONL file written by AUDIT_SINK=file.
+
+Streams the file line by line (constant memory, any file size) and checks
+every batch seal against the events before it and the previous seal.
+
+Usage: python scripts/verify_audit_chain.py audit.jsonl [--expect-head HASH]
+Exit status: 0 = chain intact, 1 = broken or head mismatch, 2 = unreadable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.security.audit_sinks import AuditChainError, verify_chain  # noqa: E402
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("path")
+    ap.add_argument(
+        "--expect-head",
+        help="last seal hash from the app.audit.seal log stream (anchor)",
+    )
+    args = ap.parse_args()
+
+    try:
+        with open(args.path, "rb") as f:
+            events, batches, head = verify_chain(f)
+    except OSError as e:
+        print(f"❌ cannot read {args.path}: {e}")
+        return 2
+    except AuditChainError as e:
+        print(f"❌ FAIL: {e}")
+        return 1
+
+    if args.expect_head and args.expect_head != head:
+        print(f"❌ FAIL: chain head {head} != expected {args.expect_head}")
+        return 1
+    print(f"✅ PASS: {events} events in {batches} sealed batches, head {head}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
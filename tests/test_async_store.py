@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+
+import httpx
+
+from app.async_store import (
+    AsyncRetrievalStore,
+    SyncStoreAdapter,
+    as_async,
+    run_offloaded,
+)
+from app.settings import STORE_EXECUTOR_THREADS
+from app.store import InMemoryStore
+
+HEADERS = {"X-User": "u", "X-Tenant": "t1", "X-Role": "admin"}
+
+
+def test_adapter_mirrors_the_sync_store():
+    sync = InMemoryStore()
+    store = as_async(sync)
+    assert isinstance(store, SyncStoreAdapter) and as_async(store) is store
+
+    async def scenario():
+        doc = await store.aput("t1", "public", "guide", "payroll basics")
+        await store.aput_many("t1", [("admin", "secret", "payroll numbers")])
+        hits = await store.asearch_scoped("t1", ["public"], "payroll")
+        listed = await store.alist_scoped("t1", ["public", "admin"])
+        generation = await store.ageneration("t1", ["public"])
+        stats = await store.atenant_stats("t1")
+        return doc, hits, listed, generation, stats
+
+    doc, hits, listed, generation, stats = asyncio.run(scenario())
+    assert [h.doc.doc_id for h in hits] == [doc.doc_id]
+    assert len(listed) == 2
+    assert generation == sync.generation("t1", ["public"])
+    assert stats.doc_count == 2
+
+
+def test_offloaded_calls_are_bounded():
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def work():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+
+    async def scenario():
+        await asyncio.gather(
+            *(run_offloaded(work) for _ in range(4 * STORE_EXECUTOR_THREADS))
+        )
+
+    asyncio.run(scenario())
+    assert peak[0] == STORE_EXECUTOR_THREADS
+
+
+def test_memory_reads_stay_on_the_loop_and_ranking_does_not():
+    threads = {}
+
+    class Probe(InMemoryStore):
+        def generation(self, *args):
+            threads["generation"] = threading.get_ident()
+            return super().generation(*args)
+
+    class BlockingProbe(Probe):
+        nonblocking_reads = False
+
+    async def scenario(store):
+        view = await store.ascoped("t1", ["public"])
+        await store.ageneration("t1", ["public"])
+        original = view.view.search
+
+        def search(*args):
+            threads["search"] = threading.get_ident()
+            return original(*args)
+
+        view.view.search = search
+        await view.asearch("payroll")
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(scenario(as_async(Probe())))
+    assert threads["generation"] == loop_thread
+    assert threads["search"] != loop_thread
+
+    loop_thread = asyncio.run(scenario(as_async(BlockingProbe())))
+    assert threads["generation"] != loop_thread
+
+
+def test_io_bound_store_keeps_many_requests_in_flight(monkeypatch):
+    """An awaiting backend is not capped by threads (Starlette's pool is 40)."""
+    import app.main
+
+    requests = 100
+    in_flight, peak = [0], [0]
+    backing = as_async(InMemoryStore())
+
+    class SlowView:
+        def __init__(self, view):
+            self.view = view
+
+        async def asearch(self, query, limit=None, after=None):
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+            await asyncio.sleep(0.2)  # e.g. a network round trip
+            in_flight[0] -= 1
+            return await self.view.asearch(query, limit, after)
+
+    class SlowStore(AsyncRetrievalStore):
+        aput_many = backing.aput_many
+        alist_scoped = backing.alist_scoped
+        ageneration = backing.ageneration
+        atenant_stats = backing.atenant_stats
+
+        async def ascoped(self, tenant_id, allowed_classifications):
+            return SlowView(await backing.ascoped(tenant_id, allowed_classifications))
+
+    monkeypatch.setattr(app.main, "STORE", SlowStore())
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app.main.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://t"
+        ) as client:
+            r = await client.post(
+                "/ingest",
+                json={"classification": "public", "title": "t", "body": "payroll"},
+                headers=HEADERS,
+            )
+            assert r.status_code == 200
+            responses = await asyncio.gather(
+                *(
+                    client.post(
+                        "/query", json={"query": f"payroll q{i}"}, headers=HEADERS
+                    )
+                    for i in range(requests)
+                )
+            )
+        return responses
+
+    responses = asyncio.run(scenario())
+    assert all(r.status_code == 200 for r in responses)
+    assert peak[0] == requests
@@ -0,0 +1,166 @@
+import json
+import time
+import pytest
+from app.security.audit import audit, set_audit_sink
+from app.security.audit_sinks import (
+    GENESIS_HASH,
+    AuditChainError,
+    BatchedFileSink,
+    verify_chain,
+)
+
+
+def _lines(path):
+    return path.read_bytes().splitlines()
+
+
+def _wait_for_lines(path, n):
+    deadline = time.monotonic() + 5
+    while len(_lines(path)) < n and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_batches_are_sealed_by_size_and_chain_verifies(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    sink = BatchedFileSink(str(path), batch_size=3, flush_interval=60)
+    previous = set_audit_sink(sink)
+    try:
+        for i in range(7):
+            audit("doc_ingested", doc_id=f"doc-{i}", tenant_id="tenant-a")
+        _wait_for_lines(path, 8)
+        assert len(_lines(path)) == 8  # two full batches + their seals
+    finally:
+        set_audit_sink(previous)
+        sink.close()  # seals the trailing partial batch
+
+    lines = _lines(path)
+    seals = [json.loads(line) for line in lines if line.startswith(b'{"seal":')]
+    assert [s["count"] for s in seals] == [3, 3, 1]
+    assert seals[0]["prev"] == GENESIS_HASH
+    assert verify_chain(lines) == (7, 3, seals[-1]["seal"])
+    assert json.loads(lines[0])["event"] == "doc_ingested"
+
+
+def test_partial_batch_is_sealed_after_flush_interval(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    sink = BatchedFileSink(str(path), batch_size=100, flush_interval=0.05)
+    try:
+        sink.emit({"event": "x"})
+        _wait_for_lines(path, 2)
+        assert verify_chain(_lines(path))[:2] == (1, 1)
+    finally:
+        sink.close()
+
+
+def test_chain_continues_across_restarts(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    for run in range(2):
+        sink = BatchedFileSink(str(path), batch_size=2, flush_interval=60)
+        sink.emit({"event": f"run-{run}-a"})
+        sink.emit({"event": f"run-{run}-b"})
+        sink.close()
+    assert verify_chain(_lines(path))[:2] == (4, 2)
+
+
+@pytest.mark.parametrize("tamper", ["edit", "drop", "append"])
+def test_tampering_breaks_the_chain(tmp_path, tamper):
+    path = tmp_path / "audit.jsonl"
+    sink = BatchedFileSink(str(path), batch_size=2, flush_interval=60)
+    for i in range(4):
+        sink.emit({"event": "doc_ingested", "doc_id": f"doc-{i}"})
+    sink.close()
+
+    lines = _lines(path)
+    if tamper == "edit":
+        lines[0] = lines[0].replace(b"doc-0", b"doc-9")
+    elif tamper == "drop":
+        del lines[3]
+    else:
+        lines.append(b'{"event":"forged"}')
+    with pytest.raises(AuditChainError):
+        verify_chain(lines)
+
+
+def test_unsealed_tail_from_a_crash_is_sealed_on_reopen(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    sink = BatchedFileSink(str(path), batch_size=2, flush_interval=60)
+    sink.emit({"event": "a"})
+    sink.emit({"event": "b"})
+    sink.close()
+    # Crash after a batch's events reached the file, before its seal; the
+    # last line was only half written.
+    with open(path, "ab") as f:
+        f.write(b'{"event":"c"}\n{"event":"d"}\n{"event":"e')
+
+    sink = BatchedFileSink(str(path), batch_size=2, flush_interval=60)
+    sink.emit({"event": "f"})
+    sink.close()
+
+    lines = _lines(path)
+    assert verify_chain(lines)[:2] == (5, 3)
+    seals = [json.loads(line) for line in lines if line.startswith(b'{"seal":')]
+    assert [s.get("recovered", False) for s in seals] == [False, True, False]
+    assert (tmp_path / "audit.jsonl.torn").read_bytes() == b'{"event":"e\n'
+
+
+def test_failed_write_keeps_the_batch_for_the_next_flush(tmp_path, monkeypatch):
+    import app.security.audit_sinks as audit_sinks
+
+    path = tmp_path / "audit.jsonl"
+    sink = BatchedFileSink(str(path), batch_size=100, flush_interval=60)
+    sink.emit({"event": "a"})
+    sink.flush()
+    sink.emit({"event": "b"})
+    sink.emit({"event": "c"})
+
+    def disk_full(fd):
+        raise OSError(28, "No space left on device")
+
+    with monkeypatch.context() as m:
+        m.setattr(audit_sinks.os, "fsync", disk_full)
+        with pytest.raises(OSError):
+            sink.flush()
+    assert verify_chain(_lines(path))[:2] == (1, 1)  # partial write cut off
+
+    sink.close()
+    events = [
+        json.loads(line)["event"]
+        for line in _lines(path)
+        if not line.startswith(b'{"seal":')
+    ]
+    assert events == ["a", "b", "c"]
+    assert verify_chain(_lines(path))[:2] == (3, 2)
+
+
+def test_emit_does_not_wait_for_a_batch_being_written(tmp_path, monkeypatch):
+    import threading
+    import app.security.audit_sinks as audit_sinks
+
+    path = tmp_path / "audit.jsonl"
+    sink = BatchedFileSink(str(path), batch_size=2, flush_interval=60)
+    release, in_fsync = threading.Event(), threading.Event()
+    real_fsync = audit_sinks.os.fsync
+
+    def slow_fsync(fd):
+        in_fsync.set()
+        release.wait(5)
+        real_fsync(fd)
+
+    with monkeypatch.context() as m:
+        m.setattr(audit_sinks.os, "fsync", slow_fsync)
+        sink.emit({"event": "a"})
+        sink.emit({"event": "b"})  # fills a batch: written off the caller
+        assert in_fsync.wait(5)
+
+        # The flusher is stuck in fsync; emitting still returns at once.
+        start = time.monotonic()
+        for event in "cde":
+            sink.emit({"event": event})
+        assert time.monotonic() - start < 1
+        release.set()
+        sink.close()
+
+    lines = _lines(path)
+    assert verify_chain(lines)[:2] == (5, 3)
+    events = [json.loads(line)["event"] for line in lines if b'"event"' in line]
+    assert events == ["a", "b", "c", "d", "e"]
@@ -0,0 +1,69 @@
+from fastapi.testclient import TestClient
+from app.body_store import BodyStore, CompressedBody
+from app.main import app
+from app.store import STORE, InMemoryStore
+
+client = TestClient(app)
+
+ADMIN = {"X-User": "seed", "X-Tenant": "tenant-bodies", "X-Role": "admin"}
+BOILERPLATE = "This policy applies to all staff. " * 200  # ~6.8 KB
+
+
+def test_identical_bodies_are_stored_once_per_tenant():
+    store = InMemoryStore()
+    a = store.put("tenant-a", "public", "one", BOILERPLATE)
+    b = store.put("tenant-a", "admin", "two", BOILERPLATE)
+    c = store.put("tenant-b", "public", "three", BOILERPLATE)
+
+    assert a._body is b._body  # shared within the tenant
+    assert a._body is not c._body  # never across tenants
+    assert a.body == b.body == c.body == BOILERPLATE
+
+    stats = store.tenant_stats("tenant-a").bodies
+    assert (stats.body_refs, stats.unique_bodies) == (2, 1)
+    assert stats.dedup_ratio == 2.0
+    assert stats.compression_ratio > 10  # repetitive text compresses well
+    assert store.tenant_stats("tenant-b").bodies.body_refs == 1
+
+
+def test_compressed_bodies_round_trip_through_the_lru():
+    bodies = BodyStore(compress_min_bytes=100, cache_entries=1)
+    small = bodies.add("short body")
+    big = bodies.add(BOILERPLATE)
+    other = bodies.add("x" * 500)
+
+    assert small == "short body"
+    assert isinstance(big, CompressedBody) and isinstance(other, CompressedBody)
+    assert big.text() == BOILERPLATE
+    assert other.text() == "x" * 500  # evicts BOILERPLATE from the 1-entry LRU
+    assert big.text() == BOILERPLATE
+
+    assert bodies.add(BOILERPLATE) is big  # deduplicated, not stored again
+    assert bodies.stats().unique_bodies == 3
+    assert bodies.stats().body_refs == 4
+
+
+def test_search_and_snippets_over_compressed_bodies():
+    store = InMemoryStore()
+    store.put("t1", "public", "handbook", BOILERPLATE + " escalation contacts")
+
+    hits = store.search_scoped("t1", ["public"], "escalation")
+    assert len(hits) == 1 and hits[0].doc.body.endswith("escalation contacts")
+
+
+def test_storage_stats_endpoint_reports_own_tenant():
+    STORE.clear()
+    docs = [
+        {"title": f"t{i}", "body": BOILERPLATE, "classification": "public"}
+        for i in range(3)
+    ]
+    client.post("/ingest/batch", headers=ADMIN, json={"documents": docs})
+
+    r = client.get("/admin/storage", headers=ADMIN)
+    assert r.status_code == 200
+    body = r.json()
+    assert body["doc_count"] == 3 and body["unique_bodies"] == 1
+    assert body["dedup_ratio"] == 3.0
+
+    intern = {**ADMIN, "X-Role": "intern"}
+    assert client.get("/admin/storage", headers=intern).status_code == 403
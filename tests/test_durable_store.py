@@ -0,0 +1,184 @@
+import asyncio
+import os
+import threading
+
+import pytest
+
+from app.durable_store import DurableInMemoryStore
+from app.wal import (
+    SNAPSHOT_NAME,
+    WalCorruptionError,
+    WriteAheadLog,
+    list_segments,
+    read_segment,
+)
+
+
+def _reopen(directory, **kwargs):
+    store = DurableInMemoryStore(str(directory), **kwargs)
+    store.recover()
+    return store
+
+
+def _ids(store, tenant="t1"):
+    return sorted(d.doc_id for d in store.list_scoped(tenant, ["public", "admin"]))
+
+
+def test_writes_survive_restart(tmp_path):
+    store = _reopen(tmp_path)
+    a = store.put("t1", "public", "guide", "payroll basics")
+    store.put_many("t1", [("admin", "secret", "payroll numbers")])
+    store.put("t2", "public", "other", "payroll elsewhere")
+    store.close()
+
+    again = _reopen(tmp_path)
+    assert _ids(again) == _ids(store)
+    hits = again.search_scoped("t1", ["public"], "payroll")
+    assert [h.doc.doc_id for h in hits] == [a.doc_id]
+    assert again.tenant_stats("t1").doc_count == 2
+    # Sequence numbers continue after the recovered ones.
+    last = max(d.seq for d in again.list_scoped("t1", ["public", "admin"]))
+    assert again.put("t1", "public", "new", "x").seq > last
+    again.close()
+
+
+def test_clear_is_logged(tmp_path):
+    store = _reopen(tmp_path)
+    store.put("t1", "public", "old", "gone")
+    store.clear()
+    kept = store.put("t1", "public", "new", "kept")
+    store.close()
+
+    assert _ids(_reopen(tmp_path)) == [kept.doc_id]
+
+
+def test_compaction_snapshots_and_drops_covered_segments(tmp_path):
+    store = _reopen(tmp_path, compact_bytes=10**9)
+    first = [store.put("t1", "public", f"d{i}", f"body {i}") for i in range(5)]
+    store.compact()
+    tail = store.put("t1", "admin", "tail", "after the snapshot")
+    store.close()
+
+    assert os.path.exists(tmp_path / SNAPSHOT_NAME)
+    assert [n for n, _ in list_segments(str(tmp_path))] == [1]
+
+    again = _reopen(tmp_path)
+    assert _ids(again) == sorted([d.doc_id for d in first] + [tail.doc_id])
+    restored = again.search_scoped("t1", ["public"], "body")[0]
+    assert restored.projection.ruleset_id == first[0].projection.ruleset_id
+    again.close()
+
+
+def test_compaction_triggers_in_background(tmp_path):
+    store = _reopen(tmp_path, compact_bytes=1)
+    store.put("t1", "public", "d", "body")
+    for t in threading.enumerate():
+        if t.name == "store-compact":
+            t.join()
+    store.close()
+
+    assert os.path.exists(tmp_path / SNAPSHOT_NAME)
+    assert len(_ids(_reopen(tmp_path))) == 1
+
+
+def test_torn_tail_is_dropped(tmp_path):
+    store = _reopen(tmp_path)
+    kept = store.put("t1", "public", "d", "durable")
+    store.close()
+    _, path = list_segments(str(tmp_path))[-1]
+    with open(path, "ab") as f:
+        f.write(b'0badc0de {"op":"put","ten')
+
+    again = _reopen(tmp_path)
+    assert _ids(again) == [kept.doc_id]
+    again.close()
+    assert all(r["op"] == "put" for r in read_segment(path))
+
+
+def test_corruption_before_the_tail_fails_recovery(tmp_path):
+    store = _reopen(tmp_path)
+    store.put("t1", "public", "a", "one")
+    store.put("t1", "public", "b", "two")
+    store.close()
+    _, path = list_segments(str(tmp_path))[-1]
+    data = bytearray(open(path, "rb").read())
+    data[12] ^= 0xFF
+    open(path, "wb").write(bytes(data))
+
+    with pytest.raises(WalCorruptionError):
+        _reopen(tmp_path)
+
+
+def test_group_commit_shares_fsyncs(tmp_path):
+    wal = WriteAheadLog(str(tmp_path), 0)
+    barrier = threading.Barrier(8)
+
+    def writer():
+        barrier.wait()
+        for i in range(25):
+            wal.wait_durable(wal.append({"i": i}))
+
+    threads = [threading.Thread(target=writer) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wal.close()
+
+    assert len(list(read_segment(list_segments(str(tmp_path))[0][1]))) == 200
+    assert wal.syncs < 200
+
+
+def test_startup_fails_closed_on_corrupt_log(tmp_path, monkeypatch):
+    import app.main
+
+    segment = tmp_path / "wal-00000000.log"
+    segment.write_bytes(b"garbage\n" + b"00000000 {}\n")
+    monkeypatch.setattr(app.main, "STORE", DurableInMemoryStore(str(tmp_path)))
+
+    async def start():
+        async with app.main.lifespan(app.main.app):
+            pass
+
+    with pytest.raises(SystemExit):
+        asyncio.run(start())
+
+
+def test_writes_outside_recover_and_close_are_refused(tmp_path):
+    store = DurableInMemoryStore(str(tmp_path))
+    with pytest.raises(RuntimeError):
+        store.put("t1", "public", "early", "before recovery")
+    store.recover()
+    kept = store.put("t1", "public", "d", "durable")
+    store.close()
+
+    for write in (
+        lambda: store.put("t1", "public", "late", "after close"),
+        store.clear,
+        store.recover,
+    ):
+        with pytest.raises(RuntimeError):
+            write()
+    # Memory was not reloaded behind the caller's back, and nothing was logged.
+    assert _ids(store) == [kept.doc_id]
+    assert _ids(_reopen(tmp_path)) == [kept.doc_id]
+
+
+def test_short_writes_are_completed(tmp_path, monkeypatch):
+    import app.wal as wal
+
+    real_write = os.write
+
+    def short_write(fd, data):
+        # Like a write interrupted by a signal: only part of the buffer lands.
+        return real_write(fd, bytes(data[: max(1, len(data) // 3)]))
+
+    store = _reopen(tmp_path)
+    with monkeypatch.context() as m:
+        m.setattr(wal.os, "write", short_write)
+        store.put("t1", "public", "guide", "payroll basics " * 50)
+    store.close()
+
+    again = _reopen(tmp_path)
+    assert len(_ids(again)) == 1
+    again.close()
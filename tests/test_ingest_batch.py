@@ -0,0 +1,64 @@
+import logging
+from fastapi.testclient import TestClient
+from app.main import app
+from app.store import STORE
+
+client = TestClient(app)
+
+
+def _doc(title, classification="public"):
+    return {
+        "title": title,
+        "body": f"{title} batch body",
+        "classification": classification,
+    }
+
+
+def test_batch_ingest_writes_all_and_emits_one_audit_event(caplog):
+    STORE.clear()
+    caplog.set_level(logging.INFO, logger="app.audit")
+    headers = {"X-User": "loader", "X-Tenant": "tenant-batch", "X-Role": "admin"}
+
+    r = client.post(
+        "/ingest/batch",
+        headers=headers,
+        json={"documents": [_doc("one"), _doc("two", "admin"), _doc("three")]},
+    )
+
+    assert r.status_code == 200
+    doc_ids = r.json()["doc_ids"]
+    assert len(doc_ids) == 3
+    assert STORE.tenant_stats("tenant-batch").doc_count == 3
+
+    events = [rec.props for rec in caplog.records if rec.name == "app.audit"]
+    ingested = [e for e in events if e["event"] == "docs_ingested"]
+    assert len(ingested) == 1
+    assert ingested[0]["doc_ids"] == doc_ids
+    assert ingested[0]["doc_count"] == 3
+
+
+def test_batch_with_forbidden_item_is_rejected_with_per_item_receipts(caplog):
+    STORE.clear()
+    caplog.set_level(logging.INFO, logger="app.audit")
+    headers = {"X-User": "intern", "X-Tenant": "tenant-batch", "X-Role": "intern"}
+
+    r = client.post(
+        "/ingest/batch",
+        headers=headers,
+        json={"documents": [_doc("ok"), _doc("bad", "admin"), _doc("bad2", "admin")]},
+    )
+
+    assert r.status_code == 403
+    detail = r.json()["detail"]
+    assert detail["reason_code"] == "CLASSIFICATION_FORBIDDEN"
+    assert detail["denied_items"] == [1, 2]
+
+    # Fail-closed: nothing from the batch was written.
+    assert STORE.tenant_stats("tenant-batch").doc_count == 0
+
+    receipts = [
+        rec.props
+        for rec in caplog.records
+        if rec.name == "app.audit" and rec.props["event"] == "access_denied"
+    ]
+    assert [r["item_index"] for r in receipts] == [1, 2]
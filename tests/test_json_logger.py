@@ -1,5 +1,14 @@
+import json
 import logging
-from app.json_logger import SafeLogFilter
+import queue
+import threading
+from app.json_logger import (
+    SafeLogFilter,
+    _CaptureHandler,
+    request_id_ctx,
+    setup_logging,
+    shutdown_logging,
+)
 
 
 def test_deeply_nested_secret_is_blocked():
@@ -37,3 +46,51 @@ def test_deeply_nested_secret_is_blocked():
     # Based on our regex, "sk_live_..." matches the value pattern
     assert secret_value not in str(metadata)
     assert "[REDACTED_VALUE]" in str(metadata) or "[REDACTED_KEY]" in str(metadata)
+
+
+def _record(name: str, msg: str = "m") -> logging.LogRecord:
+    return logging.LogRecord(name, logging.INFO, "", 0, msg, (), None)
+
+
+def test_async_queue_drops_access_logs_but_blocks_audit():
+    q = queue.Queue(maxsize=1)
+    handler = _CaptureHandler(q)
+
+    handler.emit(_record("app.access"))
+    handler.emit(_record("app.access"))  # queue full: dropped and counted
+    assert handler.dropped == 1
+
+    audit_writer = threading.Thread(target=handler.emit, args=(_record("app.audit"),))
+    audit_writer.start()
+    audit_writer.join(0.1)
+    assert audit_writer.is_alive()  # waits for room instead of dropping
+
+    q.get()
+    audit_writer.join(5)
+    assert not audit_writer.is_alive()
+    assert q.get_nowait().name == "app.audit"
+
+
+def test_async_logging_keeps_request_id_and_flushes_on_shutdown(capsys):
+    root = logging.getLogger()
+    saved = (root.level, list(root.handlers))
+    try:
+        setup_logging(queue_size=100)
+        token = request_id_ctx.set("rid-async")
+        try:
+            logging.getLogger("app.audit").info(
+                "audit_event", extra={"props": {"event": "doc_ingested"}}
+            )
+        finally:
+            request_id_ctx.reset(token)
+        shutdown_logging()
+    finally:
+        for h in list(root.handlers):
+            root.removeHandler(h)
+        root.setLevel(saved[0])
+        for h in saved[1]:
+            root.addHandler(h)
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    audit_lines = [line for line in lines if line.get("event") == "doc_ingested"]
+    assert audit_lines and audit_lines[0]["request_id"] == "rid-async"
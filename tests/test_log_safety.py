@@ -0,0 +1,46 @@
+from app.security.log_safety import (
+    SENSITIVE_VALUE_LITERALS,
+    SENSITIVE_VALUE_PATTERNS,
+    is_sensitive_value,
+    scrub_recursive,
+)
+
+SAMPLES = [
+    "sk_live_1234567890abcdef",
+    "prefix sk_test_abcdefghijKLM suffix",
+    "eyJhbGciOiJIUzI1NiJ9.eyJzdWIiOiIxIn0.sig",
+    "they keyed the survey",
+    "status ok",
+    "sk_live_short",
+    "",
+]
+
+
+def test_combined_scan_agrees_with_individual_patterns():
+    for text in SAMPLES:
+        expected = any(p.search(text) for p in SENSITIVE_VALUE_PATTERNS)
+        assert is_sensitive_value(text) == expected, text
+        if expected:
+            # The literal prefilter can never reject a real match.
+            assert any(lit in text for lit in SENSITIVE_VALUE_LITERALS)
+
+
+def test_clean_payload_is_returned_without_copying():
+    props = {"event": "request_complete", "status": 200, "duration_ms": 3}
+    props["nested"] = {"ids": ["a", "b"], "ok": True}
+    assert scrub_recursive(props) is props
+
+
+def test_dirty_payload_is_copied_not_mutated():
+    props = {
+        "event": "x",
+        "password": "hunter2",
+        "items": [{"note": "sk_live_1234567890abcdef"}, 1],
+    }
+    clean = scrub_recursive(props)
+
+    assert clean is not props
+    assert clean["password"] == "[REDACTED_KEY]"
+    assert clean["items"] == [{"note": "[REDACTED_VALUE]"}, 1]
+    assert props["password"] == "hunter2"
+    assert props["items"][0]["note"].startswith("sk_live_")
@@ -0,0 +1,131 @@
+import pytest
+
+from app.mapped_store import MappedStore, write_mapped_store
+from app.store import InMemoryStore, ReadOnlyStoreError
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    memory = InMemoryStore()
+    key = ("AK" + "IA") + ("1" * 16)
+    memory.put_many(
+        "t1",
+        [
+            ("public", "w", "payroll " + "filler " * 50),
+            ("public", "s", "payroll payroll payroll summary"),
+            ("admin", f"key {key}", "payroll report for bravo_only_keyword"),
+            ("public", "dup", "shared boilerplate"),
+            ("admin", "dup", "shared boilerplate"),
+        ],
+    )
+    memory.put("t2", "public", "noise", "payroll payroll noise")
+    path = str(tmp_path / "corpus.gwmap")
+    write_mapped_store(memory, path)
+    store = MappedStore(path)
+    yield memory, store
+    store.close()
+
+
+def test_search_matches_in_memory_store(corpus):
+    memory, mapped = corpus
+    for scope in (["public"], ["public", "admin"]):
+        for query in ("payroll", "payroll summary", "BRAVO_ONLY_KEYWORD", "nothing"):
+            got = mapped.search_scoped("t1", scope, query)
+            want = memory.search_scoped("t1", scope, query)
+            assert [(h.doc.doc_id, h.seq) for h in got] == [
+                (h.doc.doc_id, h.seq) for h in want
+            ]
+            assert [h.score for h in got] == pytest.approx([h.score for h in want])
+
+
+def test_multi_term_matches_agree_with_in_memory_store(tmp_path):
+    # Interleaved posting lists of very different lengths, written in
+    # several batches (segments), exercise the bisect-driven intersection.
+    memory = InMemoryStore()
+    for batch in range(4):
+        memory.put_many(
+            "t1",
+            [
+                ("public", f"d{i}", f"common {'even' if i % 2 else 'odd'} m{i % 7}")
+                for i in range(batch * 50, batch * 50 + 50)
+            ],
+        )
+    path = str(tmp_path / "terms.gwmap")
+    write_mapped_store(memory, path)
+    mapped = MappedStore(path)
+    try:
+        for query in ("common even", "m3 odd common", "even odd", "m6 even"):
+            got = mapped.search_scoped("t1", ["public"], query)
+            want = memory.search_scoped("t1", ["public"], query)
+            assert [h.seq for h in got] == [h.seq for h in want]
+            assert [h.score for h in got] == pytest.approx([h.score for h in want])
+    finally:
+        mapped.close()
+
+
+def test_scope_and_projections_survive_the_file(corpus):
+    memory, mapped = corpus
+    assert mapped.search_scoped("t2", ["admin"], "payroll") == []
+    assert mapped.search_scoped("nobody", ["public"], "payroll") == []
+
+    (hit,) = mapped.search_scoped("t1", ["admin"], "bravo_only_keyword")
+    assert hit.doc.tenant_id == "t1" and hit.doc.classification == "admin"
+    assert "AKIA" not in hit.projection.title
+    assert hit.doc.body == "payroll report for bravo_only_keyword"
+
+    ids = {d.doc_id for d in mapped.list_scoped("t1", ["public"])}
+    assert ids == {d.doc_id for d in memory.list_scoped("t1", ["public"])}
+
+
+def test_pagination_and_stats(corpus):
+    memory, mapped = corpus
+    first = mapped.search_scoped("t1", ["public", "admin"], "payroll", limit=1)
+    rest = mapped.search_scoped(
+        "t1", ["public", "admin"], "payroll", after=first[-1].rank_key
+    )
+    full = mapped.search_scoped("t1", ["public", "admin"], "payroll")
+    assert [h.doc.doc_id for h in first + rest] == [h.doc.doc_id for h in full]
+
+    stats = mapped.tenant_stats("t1")
+    assert stats.doc_count == memory.tenant_stats("t1").doc_count == 5
+    assert stats.bytes == memory.tenant_stats("t1").bytes
+    assert stats.bodies.unique_bodies == 4
+    assert mapped.tenant_stats("nobody").doc_count == 0
+    assert mapped.generation("t1", ["admin", "public"]) == (1, 1)
+
+
+def test_writes_are_rejected(corpus):
+    _, mapped = corpus
+    with pytest.raises(ReadOnlyStoreError):
+        mapped.put("t1", "public", "t", "b")
+    with pytest.raises(ReadOnlyStoreError):
+        mapped.clear()
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not-a-corpus"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        MappedStore(str(path))
+
+
+def test_ingest_is_refused_with_503(corpus, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import app.main
+
+    _, mapped = corpus
+    monkeypatch.setattr(app.main, "STORE", mapped)
+    client = TestClient(app.main.app)
+    headers = {"X-User": "u", "X-Tenant": "t1", "X-Role": "admin"}
+
+    r = client.post(
+        "/ingest",
+        json={"classification": "public", "title": "t", "body": "b"},
+        headers=headers,
+    )
+    assert r.status_code == 503
+
+    r = client.post("/query", json={"query": "payroll"}, headers=headers)
+    assert r.status_code == 200
+    assert len(r.json()["results"]) == 3
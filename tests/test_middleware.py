@@ -0,0 +1,26 @@
+import logging
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_unsafe_upstream_request_id_is_replaced():
+    r = client.get("/health", headers={"X-Request-Id": "bad id\nforged=1"})
+    rid = r.json()["request_id"]
+    assert rid != "bad id\nforged=1"
+    assert r.headers["X-Request-Id"] == rid
+    assert r.headers["X-Trace-Id"] == rid
+
+
+def test_access_log_carries_status_and_request_id(caplog):
+    caplog.set_level(logging.INFO, logger="app.access")
+    r = client.post("/query", headers={"X-Request-Id": "mw-1"}, json={})
+
+    assert r.status_code == 422
+    records = [rec for rec in caplog.records if rec.name == "app.access"]
+    props = records[-1].props
+    assert props["event"] == "request_complete"
+    assert (props["method"], props["path"]) == ("POST", "/query")
+    assert props["status"] == r.status_code
+    assert r.headers["X-Request-Id"] == "mw-1"
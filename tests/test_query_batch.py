@@ -0,0 +1,102 @@
+import logging
+from fastapi.testclient import TestClient
+from app.main import app
+from app.security.audit import sha256_hex
+from app.store import STORE
+
+client = TestClient(app)
+
+ADMIN = {"X-User": "seed", "X-Tenant": "tenant-fan", "X-Role": "admin"}
+INTERN = {"X-User": "intern", "X-Tenant": "tenant-fan", "X-Role": "intern"}
+
+
+def _seed():
+    STORE.clear()
+    client.post(
+        "/ingest/batch",
+        headers=ADMIN,
+        json={
+            "documents": [
+                {"title": "Guide", "body": "payroll guide", "classification": "public"},
+                {"title": "Pay", "body": "payroll secrets", "classification": "admin"},
+                {"title": "Trip", "body": "travel policy", "classification": "public"},
+            ]
+        },
+    )
+
+
+def test_query_batch_returns_per_query_results_in_scope(caplog):
+    _seed()
+    caplog.set_level(logging.INFO, logger="app.audit")
+    queries = ["payroll", "travel", "missing"]
+
+    r = client.post(
+        "/query/batch",
+        headers=INTERN,
+        json={"queries": [{"query": q} for q in queries]},
+    )
+
+    assert r.status_code == 200
+    per_query = [
+        [res["title"] for res in item["results"]] for item in r.json()["queries"]
+    ]
+    assert per_query == [["Guide"], ["Trip"], []]
+
+    events = [rec.props for rec in caplog.records if rec.name == "app.audit"]
+    batch = [e for e in events if e["event"] == "query_batch_allowed"]
+    assert len(batch) == 1
+    assert batch[0]["query_sha256s"] == [sha256_hex(q) for q in queries]
+    assert batch[0]["query_count"] == 3
+    assert batch[0]["results_count"] == 2
+
+
+def test_query_batch_fails_closed_for_unknown_role():
+    _seed()
+    r = client.post(
+        "/query/batch",
+        headers={**INTERN, "X-Role": "contractor"},
+        json={"queries": [{"query": "payroll"}]},
+    )
+    assert r.status_code == 403
+    assert r.json()["detail"]["reason_code"] == "ROLE_UNKNOWN_FAIL_CLOSED"
+
+
+def test_query_batch_audits_every_returned_document(caplog):
+    STORE.clear()
+    for n in range(2):
+        client.post(
+            "/ingest/batch",
+            headers=ADMIN,
+            json={
+                "documents": [
+                    {
+                        "title": f"d{n}-{i}",
+                        "body": f"w{i % 4} common",
+                        "classification": "public",
+                    }
+                    for i in range(100)
+                ]
+            },
+        )
+    caplog.set_level(logging.INFO, logger="app.audit")
+    # 4 disjoint sub-queries x 50 hits = 200 distinct documents.
+    queries = [{"query": f"w{i}", "top_k": 50} for i in range(4)]
+    r = client.post("/query/batch", headers=INTERN, json={"queries": queries})
+
+    returned = [res["doc_id"] for q in r.json()["queries"] for res in q["results"]]
+    events = [rec.props for rec in caplog.records if rec.name == "app.audit"]
+    batch = [e for e in events if e["event"] == "query_batch_allowed"][0]
+    assert len(returned) == 200 == batch["results_count"]
+    assert sorted(batch["doc_ids"]) == sorted(returned)
+    assert "doc_ids_truncated" not in batch
+
+
+def test_audit_records_how_many_list_items_were_cut(caplog):
+    from app.security.audit import MAX_LIST_ITEMS, audit
+
+    caplog.set_level(logging.INFO, logger="app.audit")
+    audit("query_batch_allowed", doc_ids=[f"d{i}" for i in range(MAX_LIST_ITEMS + 7)])
+
+    event = [rec.props for rec in caplog.records if rec.name == "app.audit"][-1]
+    assert len(event["doc_ids"]) == MAX_LIST_ITEMS
+    assert event["doc_ids_truncated"] == 7
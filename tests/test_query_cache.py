@@ -0,0 +1,124 @@
+from fastapi.testclient import TestClient
+from app.cache import QUERY_CACHE, QueryCache
+from app.main import app
+from app.store import STORE
+
+client = TestClient(app)
+
+ADMIN = {"X-User": "seed", "X-Tenant": "tenant-cache", "X-Role": "admin"}
+INTERN = {"X-User": "intern", "X-Tenant": "tenant-cache", "X-Role": "intern"}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cache_lru_ttl_and_generation():
+    clock = FakeClock()
+    cache = QueryCache(max_entries=2, max_bytes=100, ttl_seconds=10, clock=clock)
+
+    cache.put("a", 1, "A", size=10)
+    cache.put("b", 1, "B", size=10)
+    assert cache.get("a", 1) == "A"  # "b" is now least recently used
+    cache.put("c", 1, "C", size=10)
+    assert cache.get("b", 1) is None
+    assert cache.get("c", 2) is None  # scope changed since it was cached
+
+    clock.now = 11
+    assert cache.get("a", 1) is None
+
+    cache.put("big", 1, "X", size=90)
+    cache.put("d", 1, "D", size=20)  # over max_bytes: "big" is evicted
+    assert cache.get("big", 1) is None
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (1, 4)
+    assert (stats.evictions, stats.expirations, stats.invalidations) == (2, 1, 1)
+    assert (stats.entries, stats.bytes) == (1, 20)
+
+
+def test_cache_counts_per_partition():
+    cache = QueryCache(
+        max_entries=1, max_bytes=100, ttl_seconds=10, partition=lambda k: k[0]
+    )
+    cache.put(("t1", "q"), 1, "A", size=10)
+    assert cache.get(("t1", "q"), 1) == "A"
+    cache.put(("t2", "q"), 1, "B", size=10)  # evicts t1's entry
+
+    t1, t2 = cache.stats("t1"), cache.stats("t2")
+    assert (t1.hits, t1.evictions, t1.entries, t1.bytes) == (1, 1, 0, 0)
+    assert (t2.hits, t2.evictions, t2.entries, t2.bytes) == (0, 0, 1, 10)
+    assert cache.stats("t3") == type(t1)()
+    assert (cache.stats().hits, cache.stats().entries) == (1, 1)
+
+
+def _query(headers, query="cached"):
+    r = client.post("/query", headers=headers, json={"query": query})
+    assert r.status_code == 200
+    return [res["doc_id"] for res in r.json()["results"]]
+
+
+def _ingest(headers, classification, body="cached term"):
+    client.post(
+        "/ingest",
+        headers=headers,
+        json={"title": "t", "body": body, "classification": classification},
+    )
+
+
+def test_repeat_query_hits_and_ingest_invalidates_only_its_scope():
+    STORE.clear()
+    QUERY_CACHE.clear()
+    _ingest(ADMIN, "public")
+
+    first = _query(INTERN)
+    assert _query(INTERN) == first
+    assert QUERY_CACHE.stats().hits == 1
+
+    # An admin-only write does not touch the intern's (public-only) scope...
+    _ingest(ADMIN, "admin")
+    assert _query(INTERN) == first
+    assert QUERY_CACHE.stats().hits == 2
+
+    # ...but a public write does.
+    _ingest(ADMIN, "public")
+    assert len(_query(INTERN)) == 2
+    assert QUERY_CACHE.stats().invalidations == 1
+
+
+def test_cached_admin_page_is_never_served_to_intern():
+    STORE.clear()
+    QUERY_CACHE.clear()
+    _ingest(ADMIN, "admin", body="cached payroll")
+
+    assert len(_query(ADMIN)) == 1
+    assert _query(INTERN) == []
+
+
+def test_cache_stats_endpoint_is_admin_only():
+    r = client.get("/admin/query-cache", headers=ADMIN)
+    assert r.status_code == 200
+    keys = {"hits", "misses", "evictions", "invalidations", "coalesced"}
+    assert keys <= r.json().keys()
+
+    r = client.get("/admin/query-cache", headers=INTERN)
+    assert r.status_code == 403
+    assert r.json()["detail"]["reason_code"] == "ADMIN_ROLE_REQUIRED"
+
+
+def test_cache_stats_endpoint_counts_only_the_callers_tenant():
+    other = {"X-User": "eve", "X-Tenant": "tenant-cache-other", "X-Role": "admin"}
+    STORE.clear()
+    QUERY_CACHE.clear()
+    _ingest(ADMIN, "public")
+    _query(ADMIN)
+    _query(ADMIN)
+
+    mine = client.get("/admin/query-cache", headers=ADMIN).json()
+    theirs = client.get("/admin/query-cache", headers=other).json()
+    assert (mine["hits"], mine["misses"], mine["entries"]) == (1, 1, 1)
+    assert (theirs["hits"], theirs["misses"], theirs["entries"]) == (0, 0, 0)
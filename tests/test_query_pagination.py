@@ -0,0 +1,91 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.store import STORE
+
+client = TestClient(app)
+
+ADMIN = {"X-User": "seed", "X-Tenant": "tenant-page", "X-Role": "admin"}
+INTERN = {"X-User": "intern", "X-Tenant": "tenant-page", "X-Role": "intern"}
+OTHER = {"X-User": "eve", "X-Tenant": "tenant-other", "X-Role": "admin"}
+
+
+def _seed(n: int = 7):
+    STORE.clear()
+    docs = [
+        {"title": f"doc{i}", "body": "paged " * (i + 1), "classification": "public"}
+        for i in range(n)
+    ]
+    client.post("/ingest/batch", headers=ADMIN, json={"documents": docs})
+
+
+def _page(headers, **body):
+    return client.post("/query", headers=headers, json={"query": "paged", **body})
+
+
+def test_pages_cover_all_results_once_in_rank_order():
+    _seed()
+    full = _page(ADMIN, top_k=50).json()["results"]
+
+    seen, cursor = [], None
+    while True:
+        r = _page(ADMIN, page_size=3, cursor=cursor)
+        assert r.status_code == 200
+        body = r.json()
+        seen += [res["doc_id"] for res in body["results"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == [res["doc_id"] for res in full]
+    assert len(seen) == 7
+
+
+def test_tampered_cursor_is_denied():
+    _seed()
+    cursor = _page(ADMIN, page_size=2).json()["next_cursor"]
+    body, mac = cursor.split(".")
+    forged = body[:-1] + ("A" if body[-1] != "A" else "B") + "." + mac
+
+    assert _page(ADMIN, page_size=2, cursor=forged).status_code == 403
+    r = _page(ADMIN, page_size=2, cursor="garbage")
+    assert r.json()["detail"]["reason_code"] == "CURSOR_INVALID"
+
+
+def test_cursor_is_bound_to_scope_and_query():
+    _seed()
+    cursor = _page(ADMIN, page_size=2).json()["next_cursor"]
+
+    # Another role, another tenant or another query cannot resume it.
+    assert _page(INTERN, page_size=2, cursor=cursor).status_code == 403
+    assert _page(OTHER, page_size=2, cursor=cursor).status_code == 403
+    r = client.post(
+        "/query",
+        headers=ADMIN,
+        json={"query": "other", "page_size": 2, "cursor": cursor},
+    )
+    assert r.status_code == 403
+
+
+def test_write_between_pages_makes_the_cursor_stale():
+    _seed()
+    cursor = _page(ADMIN, page_size=3).json()["next_cursor"]
+
+    # The write shifts every BM25 score in the scope: resuming from the old
+    # position could skip or repeat hits, so the cursor is refused instead.
+    client.post(
+        "/ingest",
+        headers=ADMIN,
+        json={"title": "late", "body": "paged paged", "classification": "public"},
+    )
+    r = _page(ADMIN, page_size=3, cursor=cursor)
+    assert r.status_code == 403
+    assert r.json()["detail"]["reason_code"] == "CURSOR_STALE"
+
+    # A write outside the scope (another tenant) leaves it valid.
+    cursor = _page(ADMIN, page_size=3).json()["next_cursor"]
+    client.post(
+        "/ingest",
+        headers=OTHER,
+        json={"title": "x", "body": "paged", "classification": "public"},
+    )
+    assert _page(ADMIN, page_size=3, cursor=cursor).status_code == 200
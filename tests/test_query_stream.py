@@ -0,0 +1,37 @@
+import json
+import logging
+from fastapi.testclient import TestClient
+from app.main import app
+from app.store import STORE
+
+client = TestClient(app)
+
+ADMIN = {"X-User": "seed", "X-Tenant": "tenant-stream", "X-Role": "admin"}
+
+
+def test_query_streams_ndjson_and_audits_final_count(caplog):
+    STORE.clear()
+    docs = [
+        {"title": f"doc{i}", "body": "streamed term", "classification": "public"}
+        for i in range(4)
+    ]
+    client.post("/ingest/batch", headers=ADMIN, json={"documents": docs})
+    caplog.set_level(logging.INFO, logger="app.audit")
+
+    r = client.post(
+        "/query",
+        headers={**ADMIN, "Accept": "application/x-ndjson"},
+        json={"query": "streamed", "top_k": 3},
+    )
+
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    assert r.headers.get("X-Request-Id")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert len(lines) == 3
+    assert all(line["snippet"] == "streamed term" for line in lines)
+
+    events = [rec.props for rec in caplog.records if rec.name == "app.audit"]
+    allowed = [e for e in events if e["event"] == "query_allowed"]
+    assert allowed[-1]["results_count"] == 3
+    assert allowed[-1]["doc_ids"] == [line["doc_id"] for line in lines]
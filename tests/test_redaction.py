@@ -1,5 +1,8 @@
 from fastapi.testclient import TestClient
 from app.main import app
+from app.security import redact
+from app.search import make_snippet
+from app.store import InMemoryStore
 
 client = TestClient(app)
 
@@ -62,3 +65,83 @@ def test_redaction_happens_before_snippet_slicing():
 
     snippet = results[0]["snippet"]
     assert "AKIA" not in snippet
+
+
+def test_cached_projection_is_recomputed_when_ruleset_changes(monkeypatch):
+    store = InMemoryStore()
+    body = "internal codename zephyr rollout"
+    store.put("t1", "public", "title", body)
+    before = store.search_scoped("t1", ["public"], "rollout")[0].projection
+    assert before.spans == ()
+
+    monkeypatch.setitem(redact.PATTERNS, "CODENAME", r"(zephyr)")
+    after = store.search_scoped("t1", ["public"], "rollout")[0].projection
+
+    assert after.ruleset_id != before.ruleset_id
+    snippet, _ = make_snippet(body, after.spans, ["rollout"])
+    assert "zephyr" not in snippet
+    assert "[REDACTED]" in snippet
+
+
+def test_single_pass_engine_counts_matches_per_kind():
+    aws = ("AK" + "IA") + ("2" * 16)
+    text = f"id {aws} and password = hunter2 and {aws}"
+
+    cleaned, counts = redact.redact_text_with_counts(text)
+
+    assert "AKIA" not in cleaned and "hunter2" not in cleaned
+    assert counts == {"AWS_KEY": 2, "GENERIC_SECRET": 1}
+    assert cleaned == redact.redact_text(text)
+
+
+def test_prefilter_skips_clean_text_but_not_unfiltered_rules(monkeypatch):
+    clean = "nothing sensitive in this sentence"
+    assert not redact.engine().may_match(clean)
+    assert redact.redact_text(clean) == clean
+
+    # A rule without prefilter literals forces a scan of every text.
+    monkeypatch.setitem(redact.PATTERNS, "CODENAME", r"(sensitive)")
+    assert redact.engine().may_match(clean)
+    assert redact.redact_text(clean) == "nothing [REDACTED] in this sentence"
+
+
+def test_first_char_guard_preserves_unicode_case_folding():
+    # U+017F (long s) matches "s" under IGNORECASE; the guard must not skip it.
+    text = "ſecret = hunter2"
+    assert redact.redact_text(text) == "[REDACTED]"
+
+
+def test_first_char_guard_is_derived_and_exact(monkeypatch):
+    # Exercises the interpreter's regex parser: if its internals change, the
+    # guard silently disappears, which this catches.
+    guarded = redact.engine()
+    assert guarded.regex.pattern.startswith("(?=")
+
+    monkeypatch.setattr(redact, "_lookahead", lambda patterns: "")
+    unguarded = redact.RedactionEngine(dict(redact.PATTERNS), {})
+    aws = ("AK" + "IA") + ("3" * 16)
+    for text in (f"x {aws} y", "TOKEN: abc", "Key=v and \u017fecret=s", "plain"):
+        assert guarded.redact(text) == unguarded.redact(text)
+
+
+def test_engine_is_rebuilt_only_when_rules_change(monkeypatch):
+    built, rid = redact.engine(), redact.ruleset_id()
+    assert redact.engine() is built and redact.ruleset_id() == rid
+
+    monkeypatch.setitem(redact.PATTERNS, "CODENAME", r"(zephyr)")
+    changed = redact.engine()
+    assert changed is not built and redact.ruleset_id() != rid
+
+    monkeypatch.undo()
+    assert redact.engine() is not changed and redact.ruleset_id() == rid
+
+
+def test_plain_dict_rules_are_picked_up(monkeypatch):
+    rid = redact.ruleset_id()
+    monkeypatch.setattr(redact, "PATTERNS", dict(redact.PATTERNS))
+    assert redact.redact_text("zephyr") == "zephyr"
+
+    # Edited in place: no version counter, but the contents changed.
+    redact.PATTERNS["CODENAME"] = r"(zephyr)"
+    assert redact.redact_text("zephyr") == redact.REPLACEMENT
+    assert redact.ruleset_id() != rid
@@ -0,0 +1,103 @@
+import pytest
+
+from app.segment_store import SharedSegmentStore
+from app.store import build_store
+from app.wal import WalCorruptionError
+
+
+@pytest.fixture
+def workers(tmp_path):
+    path = str(tmp_path / "store.seg")
+    stores = [SharedSegmentStore(path, fsync=False) for _ in range(2)]
+    for store in stores:
+        store.recover()
+    yield path, stores
+    for store in stores:
+        store.close()
+
+
+def _ranked(store, tenant, scope, query):
+    return [
+        (h.doc.doc_id, h.seq, h.score)
+        for h in store.search_scoped(tenant, scope, query)
+    ]
+
+
+def test_workers_see_each_others_writes(workers):
+    _, (a, b) = workers
+    a.put_many("t1", [("public", "a", "payroll alpha"), ("admin", "b", "payroll beta")])
+    b.put("t1", "public", "c", "payroll payroll gamma")
+    b.put("t2", "public", "d", "payroll noise")
+
+    for scope in (["public"], ["public", "admin"]):
+        assert _ranked(a, "t1", scope, "payroll") == _ranked(b, "t1", scope, "payroll")
+    assert len(a.search_scoped("t1", ["public", "admin"], "payroll")) == 3
+    assert a.search_scoped("t2", ["admin"], "payroll") == []
+    assert a.tenant_stats("t1").doc_count == b.tenant_stats("t1").doc_count == 3
+    assert {d.doc_id for d in a.list_scoped("t2", ["public"])} == {
+        d.doc_id for d in b.list_scoped("t2", ["public"])
+    }
+
+
+def test_seqs_are_global_across_writers(workers):
+    _, (a, b) = workers
+    first = a.put_many("t1", [("public", "x", "one"), ("public", "y", "two")])
+    second = b.put("t1", "public", "z", "three")
+    third = a.put("t1", "public", "w", "four")
+    assert [d.seq for d in first] == [0, 1]
+    assert second.seq == 2 and third.seq == 3
+
+
+def test_generation_moves_when_another_worker_writes(workers):
+    _, (a, b) = workers
+    before = a.generation("t1", ["public"])
+    b.put("t1", "public", "x", "payroll")
+    assert a.generation("t1", ["public"]) != before
+
+
+def test_restart_recovers_and_clear_propagates(workers):
+    path, (a, b) = workers
+    a.put("t1", "public", "x", "payroll")
+    fresh = SharedSegmentStore(path, fsync=False)
+    fresh.recover()
+    assert fresh.tenant_stats("t1").doc_count == 1
+
+    b.clear()
+    assert a.list_scoped("t1", ["public"]) == []
+    assert fresh.search_scoped("t1", ["public"], "payroll") == []
+    fresh.close()
+
+
+def test_torn_tail_is_skipped_then_repaired(workers):
+    path, (a, b) = workers
+    a.put("t1", "public", "x", "payroll")
+    with open(path, "ab") as f:
+        f.write(b'0123abcd {"op": "pu')  # a writer died mid-append
+
+    assert len(b.search_scoped("t1", ["public"], "payroll")) == 1
+    b.put("t1", "public", "y", "payroll again")
+    assert len(a.search_scoped("t1", ["public"], "payroll")) == 2
+
+
+def test_corrupt_record_is_refused(tmp_path):
+    path = tmp_path / "store.seg"
+    path.write_bytes(b"00000000 {}\n")
+    store = SharedSegmentStore(str(path))
+    with pytest.raises(WalCorruptionError):
+        store.recover()
+    store.close()
+
+
+def test_factory_selects_shared_backend(tmp_path):
+    store = build_store("shared", segment_path=str(tmp_path / "store.seg"))
+    assert isinstance(store, SharedSegmentStore)
+
+
+def test_multi_worker_launch_requires_a_shared_store_and_cursor_key():
+    from app.serve import multi_worker_error
+
+    assert multi_worker_error(1, "memory", "", "file") is None
+    assert "STORE_BACKEND" in multi_worker_error(4, "memory", "k", "log")
+    assert "CURSOR_SIGNING_KEY" in multi_worker_error(4, "shared", "", "log")
+    assert "AUDIT_SINK" in multi_worker_error(4, "shared", "k", "file")
+    assert multi_worker_error(4, "shared", "k", "log") is None
@@ -0,0 +1,38 @@
+import json
+import logging
+from datetime import datetime, timezone
+from app.json_logger import JsonFormatter, format_timestamp
+from app.serialization import FastJSONResponse, dumps, dumps_bytes
+
+
+def test_dumps_matches_stdlib_and_falls_back_for_odd_inputs():
+    obj = {"event": "x", "n": 3, "ids": ["a", "b"], "when": datetime(2026, 1, 1)}
+    assert json.loads(dumps(obj)) == json.loads(json.dumps(obj, default=str))
+
+    # Non-str keys and huge ints are not orjson-native; stdlib handles them.
+    assert json.loads(dumps_bytes({1: 2**70})) == {"1": 2**70}
+
+
+def test_fast_response_renders_compact_utf8():
+    body = FastJSONResponse({"ok": True, "name": "é"}).body
+    assert json.loads(body) == {"ok": True, "name": "é"}
+
+
+def test_timestamp_is_iso_utc_at_millisecond_granularity():
+    created = 1767225600.1239  # 2026-01-01T00:00:00.123 UTC
+    ts = format_timestamp(created)
+    assert ts == "2026-01-01T00:00:00.123+00:00"
+    assert datetime.fromisoformat(ts) == datetime(
+        2026, 1, 1, 0, 0, 0, 123000, tzinfo=timezone.utc
+    )
+    assert format_timestamp(created + 1) == "2026-01-01T00:00:01.123+00:00"
+
+
+def test_formatter_output_is_json_with_props():
+    record = logging.LogRecord(
+        "app.audit", logging.INFO, "", 0, "audit_event", (), None
+    )
+    record.props = {"event": "doc_ingested", "doc_count": 2}
+    line = json.loads(JsonFormatter().format(record))
+    assert line["event"] == "doc_ingested" and line["doc_count"] == 2
+    assert line["timestamp"].endswith("+00:00")
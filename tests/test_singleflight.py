@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from app.singleflight import AsyncSingleFlight
+
+
+def test_concurrent_identical_calls_share_one_computation():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)  # followers arrive while this is in flight
+        return ("page",)
+
+    async def scenario():
+        results = await asyncio.gather(*(flight.do("k", compute) for _ in range(5)))
+        # Nothing stays in flight: the next call computes again.
+        fresh = await flight.do("k", compute)
+        return results, fresh
+
+    results, fresh = asyncio.run(scenario())
+
+    assert [r for r, _ in results] == [("page",)] * 5
+    assert sorted(shared for _, shared in results) == [False] + [True] * 4
+    assert flight.coalesced == 4
+    assert fresh == (("page",), False) and len(calls) == 2
+
+
+def test_failed_leader_is_not_shared():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        if len(calls) == 1:
+            raise RuntimeError("leader failed")
+        return "own"
+
+    async def scenario():
+        return await asyncio.gather(
+            *(flight.do("k", compute) for _ in range(3)), return_exceptions=True
+        )
+
+    leader, *waiters = asyncio.run(scenario())
+
+    # Each waiter re-ran the computation itself instead of inheriting the error.
+    assert isinstance(leader, RuntimeError)
+    assert waiters == [("own", False)] * 2
+    assert len(calls) == 3 and flight.coalesced == 0
+
+
+def test_cancelled_leader_is_not_shared():
+    flight = AsyncSingleFlight()
+    started = []
+
+    async def compute():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return "own"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.do("k", compute))
+        await asyncio.sleep(0)  # the leader registers its call
+        waiter = asyncio.ensure_future(flight.do("k", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await waiter, leader.cancelled()
+
+    assert asyncio.run(scenario()) == (("own", False), True)
+    assert len(started) == 2
+
+
+def test_different_keys_do_not_coalesce():
+    flight = AsyncSingleFlight()
+
+    async def value(v):
+        return v
+
+    async def fail():
+        raise ValueError()
+
+    async def scenario():
+        assert await flight.do("a", lambda: value(1)) == (1, False)
+        assert await flight.do("b", lambda: value(2)) == (2, False)
+        with pytest.raises(ValueError):
+            await flight.do("c", fail)
+
+    asyncio.run(scenario())
+    assert flight.coalesced == 0
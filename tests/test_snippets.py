@@ -0,0 +1,47 @@
+from app.search import SCAN_CHUNK, SNIPPET_CHARS, make_snippet
+from app.security.redact import redaction_spans
+
+
+def _snippet(body, terms):
+    return make_snippet(body, redaction_spans(body), terms)
+
+
+def test_snippet_is_windowed_around_the_match_with_highlights():
+    body = ("lorem " * 100) + "Payroll schedule for March " + ("ipsum " * 100)
+
+    snippet, highlights = _snippet(body, ["payroll"])
+
+    assert len(snippet) <= SNIPPET_CHARS
+    assert [snippet[s:e] for s, e in highlights] == ["Payroll"]
+
+
+def test_secret_straddling_window_start_is_masked():
+    # The window starts mid-way through "password = hunter2"; the ingest-time
+    # spans cover the full match, so the tail can't leak.
+    body = ("filler " * 40) + "password = hunter2" + (" x" * 15) + " deepterm"
+    start = body.index("deepterm") - 40
+    assert body.index("password") < start < body.index("hunter2")
+
+    snippet, highlights = _snippet(body, ["deepterm"])
+
+    assert "hunter2" not in snippet
+    assert snippet.startswith("[REDACTED]")
+    assert [snippet[s:e] for s, e in highlights] == ["deepterm"]
+
+
+def test_no_match_falls_back_to_leading_window():
+    snippet, highlights = _snippet("short body", [])
+    assert snippet == "short body"
+    assert highlights == []
+
+
+def test_match_straddling_a_scan_chunk_is_found_whole():
+    # "payroll" crosses the first chunk boundary; "xpayroll" before it must
+    # not count (word boundary), even though it sits at the chunk edge too.
+    body = "a" * (SCAN_CHUNK - 12) + " xpayroll" + " payroll tail"
+    assert body.index(" payroll") < SCAN_CHUNK < body.index(" payroll") + 8
+
+    snippet, highlights = _snippet(body, ["payroll"])
+
+    assert [snippet[s:e] for s, e in highlights] == ["payroll"]
+    assert snippet.endswith("payroll tail")
@@ -0,0 +1,135 @@
+import threading
+
+import pytest
+
+from app.sqlite_store import SQLiteStore
+from app.store import InMemoryStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = SQLiteStore(str(tmp_path / "gateway.db"))
+    yield s
+    s.close()
+
+
+def test_search_is_scoped_to_tenant_and_classification(store):
+    pub = store.put("tenant-a", "public", "guide", "payroll basics")
+    store.put("tenant-a", "admin", "secret", "payroll numbers")
+    store.put("tenant-b", "public", "other", "payroll elsewhere")
+
+    hits = store.search_scoped("tenant-a", ["public"], "payroll")
+
+    assert [h.doc.doc_id for h in hits] == [pub.doc_id]
+    assert hits[0].doc.tenant_id == "tenant-a"
+    assert store.search_scoped("tenant-a", [], "payroll") == []
+    assert [d.doc_id for d in store.list_scoped("tenant-a", ["public"])] == [pub.doc_id]
+
+
+def test_ranking_matches_in_memory_store(store):
+    memory = InMemoryStore()
+    docs = [
+        ("public", "w", "payroll " + "filler " * 50),
+        ("public", "s", "payroll payroll payroll summary"),
+        ("admin", "a", "payroll report for bravo_only_keyword"),
+        ("public", "x", "unrelated text"),
+    ]
+    for target in (store, memory):
+        target.put_many("t1", docs)
+        target.put("t2", "public", "noise", "payroll payroll noise")
+
+    for query in ("payroll", "payroll summary", "BRAVO_ONLY_KEYWORD", "missing"):
+        got = store.search_scoped("t1", ["public", "admin"], query)
+        want = memory.search_scoped("t1", ["public", "admin"], query)
+        assert [(h.doc.title, h.score) for h in got] == pytest.approx(
+            [(h.doc.title, h.score) for h in want]
+        )
+
+
+def test_search_reads_bodies_of_returned_hits_only(store, monkeypatch):
+    import app.sqlite_store as sqlite_store
+
+    store.put_many("t1", [("public", f"d{i}", f"payroll doc {i}") for i in range(20)])
+    decoded = []
+    body_text = sqlite_store._body_text
+    monkeypatch.setattr(
+        sqlite_store, "_body_text", lambda row: decoded.append(row[0]) or body_text(row)
+    )
+
+    hits = store.search_scoped("t1", ["public"], "payroll", limit=3)
+
+    assert len(hits) == 3
+    assert sorted(decoded) == sorted(h.seq for h in hits)
+
+
+def test_keyset_pagination(store):
+    for i in range(5):
+        store.put("t1", "public", f"d{i}", "shared term")
+
+    first = store.search_scoped("t1", ["public"], "shared", limit=2)
+    rest = store.search_scoped("t1", ["public"], "shared", after=first[-1].rank_key)
+
+    assert len(first) == 2 and len(rest) == 3
+    assert {h.doc.doc_id for h in first}.isdisjoint(h.doc.doc_id for h in rest)
+
+
+def test_documents_survive_reopen(tmp_path):
+    path = str(tmp_path / "gateway.db")
+    first = SQLiteStore(path)
+    key = ("AK" + "IA") + ("1" * 16)
+    doc = first.put("t1", "public", f"Key {key}", "durable payroll")
+    gen = first.generation("t1", ["public"])
+    first.close()
+
+    second = SQLiteStore(path)
+    hits = second.search_scoped("t1", ["public"], "payroll")
+    assert [h.doc.doc_id for h in hits] == [doc.doc_id]
+    assert key not in hits[0].projection.title
+    assert second.generation("t1", ["public"]) == gen
+    assert second.tenant_stats("t1").doc_count == 1
+    second.close()
+
+
+def test_generation_changes_only_for_written_partition(store):
+    before = store.generation("t1", ["admin", "public"])
+    store.put("t1", "public", "t", "body")
+    after = store.generation("t1", ["admin", "public"])
+
+    assert after[0] == before[0] == 0
+    assert after[1] != before[1]
+    store.clear()
+    store.put("t1", "public", "t", "body")
+    assert store.generation("t1", ["public"])[0] > after[1]
+
+
+def test_bodies_are_deduplicated_and_compressed_per_tenant(tmp_path):
+    store = SQLiteStore(str(tmp_path / "gateway.db"), compress_min_bytes=64)
+    body = "boilerplate clause " * 20
+    store.put_many("t1", [("public", f"d{i}", body) for i in range(3)])
+    store.put("t2", "public", "d", body)
+
+    stats = store.tenant_stats("t1")
+    assert stats.doc_count == 3
+    assert stats.bodies.unique_bodies == 1
+    assert stats.bodies.dedup_ratio == 3.0
+    assert stats.bodies.compression_ratio > 1.0
+    assert store.tenant_stats("t2").bodies.unique_bodies == 1
+    assert [d.body for d in store.list_scoped("t1", ["public"])] == [body] * 3
+    store.close()
+
+
+def test_each_thread_uses_its_own_connection(store):
+    store.put("t1", "public", "t", "threaded payroll")
+    results = []
+
+    def reader():
+        results.append(len(store.search_scoped("t1", ["public"], "payroll")))
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == [1, 1, 1, 1]
+    assert len(store._connections) == 5
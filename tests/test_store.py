@@ -0,0 +1,116 @@
+import threading
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.store import InMemoryStore, StoredDocument
+
+
+def test_search_scoped_only_returns_in_scope_matches():
+    store = InMemoryStore()
+    pub = store.put("tenant-a", "public", "guide", "payroll basics")
+    store.put("tenant-a", "admin", "secret", "payroll numbers")
+    store.put("tenant-b", "public", "other", "payroll elsewhere")
+
+    hits = store.search_scoped("tenant-a", ["public"], "payroll")
+
+    assert [h.doc.doc_id for h in hits] == [pub.doc_id]
+
+
+def test_search_scoped_requires_every_query_term():
+    store = InMemoryStore()
+    both = store.put("t1", "public", "a", "quarterly payroll report")
+    store.put("t1", "public", "b", "quarterly roadmap")
+
+    hits = store.search_scoped("t1", ["public"], "Quarterly PAYROLL")
+
+    assert [h.doc.doc_id for h in hits] == [both.doc_id]
+    assert store.search_scoped("t1", ["public"], "missing") == []
+
+
+def test_search_scoped_honors_limit():
+    store = InMemoryStore()
+    for i in range(5):
+        store.put("t1", "public", f"d{i}", "shared term")
+
+    assert len(store.search_scoped("t1", ["public"], "shared", limit=2)) == 2
+
+
+def test_partitions_are_per_tenant_with_o1_stats():
+    store = InMemoryStore()
+    store.put("tenant-a", "public", "t", "abc")
+    store.put("tenant-a", "admin", "t", "defg")
+    store.put("tenant-b", "public", "t", "x")
+
+    assert set(store.partitions) == {"tenant-a", "tenant-b"}
+    assert set(store.partitions["tenant-a"]) == {"public", "admin"}
+    stats = store.tenant_stats("tenant-a")
+    assert stats.doc_count == 2
+    assert stats.bytes == len("tabc") + len("tdefg")
+    assert store.tenant_stats("nobody").doc_count == 0
+
+    scoped = store.list_scoped("tenant-a", ["public"])
+    assert [d.body for d in scoped] == ["abc"]
+
+
+def test_search_scoped_ranks_by_bm25():
+    store = InMemoryStore()
+    weak = store.put("t1", "public", "w", "payroll " + "filler " * 50)
+    strong = store.put("t1", "public", "s", "payroll payroll payroll summary")
+
+    hits = store.search_scoped("t1", ["public"], "payroll")
+
+    assert [h.doc.doc_id for h in hits] == [strong.doc_id, weak.doc_id]
+    assert hits[0].score > hits[1].score > 0
+
+
+def test_query_returns_top_k_results():
+    client = TestClient(app)
+    headers = {"X-User": "u", "X-Tenant": "tenant-topk", "X-Role": "intern"}
+    admin = {**headers, "X-Role": "admin"}
+    for i in range(5):
+        client.post(
+            "/ingest",
+            headers=admin,
+            json={"title": f"d{i}", "body": "ranked doc", "classification": "public"},
+        )
+
+    r = client.post("/query", headers=headers, json={"query": "ranked", "top_k": 3})
+
+    assert r.status_code == 200
+    assert len(r.json()["results"]) == 3
+
+
+def test_stored_documents_are_compact_records_with_model_conversion():
+    store = InMemoryStore()
+    a = store.put("tenant-" + "a", "pub" + "lic", "t", "body one")
+    b = store.put("tenant-" + "a", "pub" + "lic", "t", "body two")
+
+    assert not hasattr(a, "__dict__")
+    assert a.tenant_id is b.tenant_id
+    assert a.class_code == b.class_code and a.classification == "public"
+
+    model = a.to_model()
+    assert (model.doc_id, model.tenant_id, model.classification, model.body) == (
+        a.doc_id,
+        "tenant-a",
+        "public",
+        "body one",
+    )
+
+
+def test_first_seen_classifications_get_distinct_codes_across_threads():
+    names = [f"race-{i}" for i in range(16)]
+    docs = {}
+    start = threading.Barrier(len(names))
+
+    def build(name):
+        start.wait()
+        docs[name] = StoredDocument("d", "t", name, "title", "body")
+
+    threads = [threading.Thread(target=build, args=(n,)) for n in names]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert {n: d.classification for n, d in docs.items()} == {n: n for n in names}
@@ -0,0 +1,120 @@
+import sys
+import threading
+
+import pytest
+
+from app.store import InMemoryStore
+
+WRITERS = 4
+READERS = 8
+BATCHES = 25  # per writer
+BATCH = 6  # documents per batch, split over two classifications
+READS = 100  # per reader; bounded work keeps the test fast under any scheduling
+SCOPE = ["public", "admin"]
+
+
+@pytest.fixture(autouse=True)
+def frequent_thread_switches():
+    # Switch threads every few bytecodes so readers land mid-write.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def _batch(writer: int, n: int):
+    marker = f"w{writer}b{n}"
+    return marker, [
+        (SCOPE[i % 2], f"{marker} {i}", f"common {marker} text {i}")
+        for i in range(BATCH)
+    ]
+
+
+def test_concurrent_ingest_and_query_stay_consistent():
+    store = InMemoryStore()
+    errors = []
+    reads = [0] * READERS
+
+    def writer(w):
+        try:
+            for n in range(BATCHES):
+                store.put_many("t1", _batch(w, n)[1])
+                store.put("t2", "public", "other", "common text")
+        except Exception as e:
+            errors.append(e)
+
+    def reader(r):
+        last_total = 0
+        try:
+            while reads[r] < READS:
+                # A batch is visible in all of its partitions or in none.
+                marker = f"w{r % WRITERS}b{reads[r] % BATCHES}"
+                hits = store.search_scoped("t1", SCOPE, marker)
+                assert len(hits) in (0, BATCH), (marker, len(hits))
+
+                # Documents only ever appear, and only in their own scope.
+                docs = store.list_scoped("t1", SCOPE)
+                assert len(docs) >= last_total
+                assert all(d.tenant_id == "t1" for d in docs)
+                last_total = len(docs)
+
+                top = store.search_scoped("t1", ["public"], "common text", limit=5)
+                assert all(h.doc.classification == "public" for h in top)
+                assert [h.rank_key for h in top] == sorted(
+                    (h.rank_key for h in top), reverse=True
+                )
+                reads[r] += 1
+        except Exception as e:
+            errors.append(e)
+
+    writers = [threading.Thread(target=writer, args=(w,)) for w in range(WRITERS)]
+    readers = [threading.Thread(target=reader, args=(r,)) for r in range(READERS)]
+    for t in writers + readers:
+        t.start()
+    for t in writers + readers:
+        t.join()
+
+    assert errors == []
+    total = WRITERS * BATCHES * BATCH
+    assert store.tenant_stats("t1").doc_count == total
+    assert len(store.search_scoped("t1", SCOPE, "common")) == total
+    assert len(store.search_scoped("t2", SCOPE, "common")) == WRITERS * BATCHES
+    seqs = [d.seq for d in store.list_scoped("t1", SCOPE)]
+    assert len(set(seqs)) == total
+    for w in range(WRITERS):
+        for n in range(BATCHES):
+            marker, _ = _batch(w, n)
+            assert len(store.search_scoped("t1", SCOPE, marker)) == BATCH
+
+
+def test_readers_do_not_wait_for_writers():
+    store = InMemoryStore()
+    store.put("t1", "public", "t", "payroll")
+    results = []
+
+    # Hold the writer lock, as a long batch would; reads must still finish.
+    with store._publish_lock:
+        reader = threading.Thread(
+            target=lambda: results.append(
+                store.search_scoped("t1", ["public"], "payroll")
+            )
+        )
+        reader.start()
+        reader.join(timeout=5)
+        assert not reader.is_alive()
+    assert len(results[0]) == 1
+
+
+def test_segments_stay_logarithmic_and_searchable():
+    store = InMemoryStore()
+    docs = [store.put("t1", "public", f"d{i}", f"shared term{i}") for i in range(100)]
+
+    part = store.partitions["t1"]["public"]
+    assert len(part.segments) <= 7  # log2(100)
+    assert part.doc_count == 100
+    assert [d.doc_id for d in part.iter_docs()] == [d.doc_id for d in docs]
+    assert part.get(docs[37].doc_id) is docs[37]
+    assert len(part.merged().postings["shared"]) == 100
+    assert [h.doc.doc_id for h in store.search_scoped("t1", ["public"], "term42")] == [
+        docs[42].doc_id
+    ]